@@ -8,23 +8,30 @@ binaries=[],
 hiddenimports=[],
 hookspath=[],
 runtime_hooks=[],
-excludes=[],
+excludes=['pandas'],
 win_no_prefer_redirects=False,
 win_private_assemblies=False,
 cipher=block_cipher,
 noarchive=False)
 pyz = PYZ(a.pure, a.zipped_data,
 cipher=block_cipher)
+# One-folder build: the executable starts from the files in dist/multi_arm_agent instead of
+# extracting a one-file archive to a temporary directory on every launch
 exe = EXE(pyz,
 a.scripts,
-a.binaries,
-a.zipfiles,
-a.datas,
 [],
+exclude_binaries=True,
 name='multi_arm_agent',
 debug=False,
 bootloader_ignore_signals=False,
 strip=False,
 upx=True,
+upx_exclude=[])
+coll = COLLECT(exe,
+a.binaries,
+a.zipfiles,
+a.datas,
+strip=False,
+upx=True,
 upx_exclude=[],
-runtime_tmpdir=None)
\ No newline at end of file
+name='multi_arm_agent')
\ No newline at end of file
@@ -2,7 +2,9 @@
 echo ==============================================
 echo         Incepe procesul de executie...
 echo ==============================================
-start multi_arm_agent.exe
+rem Executabilul este construit de build_exe.bat in dist\multi_arm_agent (build one-folder)
+set AGENT_EXE=%~dp0..\multi_arm_agent\multi_arm_agent.exe
+start "" "%AGENT_EXE%"
 
 rem Verifica daca procesul s-a incheiat cu succes
 if %errorlevel% equ 0 (
@@ -16,7 +18,7 @@ if %errorlevel% equ 0 (
 )
 
 rem Verifica daca fisierul executabil exista
-if exist "multi_arm_agent.exe" (
+if exist "%AGENT_EXE%" (
 	echo =======================================
     echo      Fisierul executabil exista.
 	echo =======================================
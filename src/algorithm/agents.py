@@ -1,14 +1,43 @@
 import logging
+import math
 import numpy as np
 
-from src.load_logging_configuration import load_logging_config
+from src.algorithm.kernels import average_rewards, ucb1_values, thompson_arms, gaussian_posterior, accumulate_batch, \
+    window_statistics, PULL_OFFSET, DEFAULT_WINDOW_SIZE, DEFAULT_DISCOUNT, MIN_DISCOUNT_SCALE
+from src.algorithm.ucb_index import UCBTournamentTree
+from src.load_logging_configuration import load_logging_config, DEFAULT_LOG_INTERVAL
+
+# Number of decisions of UCB1Agent.select_many whose UCB values are computed at once
+SELECT_MANY_CHUNK = 256
+
+
+def _feedback_arrays(arms, rewards, num_arms) :
+    """
+    Validates a batch of feedback events.
+    :return: Tuple (arms, rewards) as 1-D NumPy arrays.
+    """
+    arms = np.asarray(arms)
+    rewards = np.asarray(rewards, dtype=float)
+    if arms.ndim != 1 or arms.shape != rewards.shape :
+        raise ValueError(f"arms and rewards must be 1-D arrays of the same length, got shapes "
+                         f"{arms.shape} and {rewards.shape}")
+    if len(arms) and not np.issubdtype(arms.dtype, np.integer) :
+        raise ValueError(f"Arm indices must be integers, got {arms.dtype}")
+    if len(arms) and (arms.min() < 0 or arms.max() >= num_arms) :
+        raise ValueError(f"Invalid arm index in batch: {arms.min() if arms.min() < 0 else arms.max()}")
+
+    return arms, rewards
 
 
 class UCB1Agent :
-    def __init__(self, no_arm) :
+    # The decisions draw no random numbers, so the replay evaluation may hold one until it matches the log
+    deterministic = True
+
+    def __init__(self, no_arm, log_interval=DEFAULT_LOG_INTERVAL) :
         """
         Initializes a UCB1 agent with a given number of arms.
         :param no_arm: Number of arms in the bandit.
+        :param log_interval: Decisions and updates are logged once every log_interval steps.
 
         Initializes two arrays: total_rewards and num_pulls, both of size no_arm, to zero.
         These arrays will track the total rewards and number of times each arm has been pulled, respectively.
@@ -34,6 +63,10 @@ class UCB1Agent :
 
             # Timestep to keep track of the number of iterations
             self.timestep = 0
+
+            # Number of updates, used to sample the update logs
+            self.num_updates = 0
+            self.log_interval = log_interval
         except Exception as e :
             self.logger.error(f"Error during UCB1Agent initialization due to: {str(e)}")
             raise e
@@ -52,19 +85,18 @@ class UCB1Agent :
             # Increment timestep
             self.timestep += 1
 
-            # Calculate exploration bonus using UCB1 formula
-            # the formula involves dividing by the number of times an arm has been pulled (self.num_pulls).
+            # Calculate UCB values for each arm: the average reward plus the exploration bonus sqrt(2 log t / n).
+            # The formula involves dividing by the number of times an arm has been pulled (self.num_pulls).
             # If an arm has never been pulled, this value would be zero, leading to a division by zero error.
-            # Adding a small number like 1e-6 ensures that the denominator is never zero, thus avoiding this error.
-            exploration_bonus = np.sqrt(2 * np.log(self.timestep) / (self.num_pulls + 1e-6))
-
-            # Calculate UCB values for each arm
-            ucb_values = self.total_rewards / (self.num_pulls + 1e-6) + exploration_bonus
+            # The kernel adds a small number (1e-6) to ensure that the denominator is never zero.
+            # The batched agents use the same kernel row-wise.
+            ucb_values = ucb1_values(self.total_rewards, self.num_pulls, self.timestep)
 
             # Select arm with the highest UCB value
             selected_arm = np.argmax(ucb_values)
 
-            self.logger.info(f"UCB1 Agent selected arm: {selected_arm}")
+            if self.timestep % self.log_interval == 0 :
+                self.logger.info(f"UCB1 Agent selected arm: {selected_arm} at step {self.timestep}")
 
             return selected_arm
         except Exception as e :
@@ -90,19 +122,73 @@ class UCB1Agent :
             self.total_rewards[arm] += reward
             self.num_pulls[arm] += 1
 
-            self.logger.info(f"UCB1 Agent updated for arm {arm}: Total Rewards={self.total_rewards[arm]}, "
-                             f"Num Pulls={self.num_pulls[arm]}")
+            self.num_updates += 1
+            if self.num_updates % self.log_interval == 0 :
+                self.logger.info(f"UCB1 Agent updated for arm {arm}: Total Rewards={self.total_rewards[arm]}, "
+                                 f"Num Pulls={self.num_pulls[arm]}")
         except Exception as e :
             self.logger.error(f"Error during UCB1 agent update due to: {str(e)}")
             raise e
 
+    def update_batch(self, arms, rewards) :
+        """
+        Updates the agent's knowledge with a batch of delayed feedback events at once.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+
+        Gives the same statistics as calling update(arm, reward) for every event, with one vectorized
+        accumulation instead of a Python loop, and logs once per batch.
+        """
+        try :
+            arms, rewards = _feedback_arrays(arms, rewards, self.num_arms)
+            accumulate_batch(self.total_rewards, self.num_pulls, arms, rewards)
+
+            previous_updates = self.num_updates
+            self.num_updates += len(arms)
+            if self.num_updates // self.log_interval > previous_updates // self.log_interval :
+                self.logger.info(f"UCB1 Agent updated with a batch of {len(arms)} rewards, "
+                                 f"{self.num_updates} updates so far")
+        except Exception as e :
+            self.logger.error(f"Error during UCB1 agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, k) :
+        """
+        Selects k arms against a frozen snapshot of the statistics, as when serving k requests
+        before their rewards are known.
+        :param k: Number of decisions.
+        :return: Array of k arms, identical to calling select_arm() k times without any update in between.
+
+        Every decision advances the timestep, so the exploration bonus of decision j uses t + j. The
+        UCB values of a chunk of decisions are computed as one (chunk x K) array.
+        """
+        try :
+            selected_arms = np.empty(k, dtype=np.int64)
+            for start in range(0, k, SELECT_MANY_CHUNK) :
+                stop = min(start + SELECT_MANY_CHUNK, k)
+                timesteps = np.arange(self.timestep + start + 1, self.timestep + stop + 1)[:, None]
+                selected_arms[start:stop] = np.argmax(ucb1_values(self.total_rewards, self.num_pulls, timesteps),
+                                                      axis=1)
+
+            previous_timestep = self.timestep
+            self.timestep += k
+            if self.timestep // self.log_interval > previous_timestep // self.log_interval :
+                self.logger.info(f"UCB1 Agent selected {k} arms at step {self.timestep}")
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {k} arms: {str(e)}")
+            raise e
+
 
 class EpsilonGreedyAgent :
-    def __init__(self, no_arm, eps) :
+    def __init__(self, no_arm, eps, log_interval=DEFAULT_LOG_INTERVAL, rng=None) :
         """
         Initializes an Epsilon-Greedy agent with a given number of arms and exploration rate.
         :param no_arm: Number of arms in the bandit.
         :param eps: Exploration rate (probability of exploration).
+        :param log_interval: Decisions are aggregated and logged once every log_interval steps.
+        :param rng: np.random.Generator used for the exploration draws. The global NumPy RNG is used if omitted.
         """
         try :
             load_logging_config()
@@ -116,11 +202,20 @@ class EpsilonGreedyAgent :
             # Exploration rate
             self.epsilon = eps
 
+            # Both expose random() and choice(), so the draws are the same code for either source
+            self.rng = rng if rng is not None else np.random
+
             # Array to store total rewards for each arm
             self.total_rewards = np.zeros(no_arm)
 
             # Array to store the number of pulls for each arm
             self.num_pulls = np.zeros(no_arm)
+
+            # Counters used to aggregate the decision logs over log_interval steps
+            self.num_selections = 0
+            self.num_explorations = 0
+            self.num_updates = 0
+            self.log_interval = log_interval
         except Exception as e :
             self.logger.error(f"Error during EpsilonGreedyAgent initialization due to: {str(e)}")
             raise e
@@ -131,20 +226,26 @@ class EpsilonGreedyAgent :
         :return: The selected arm.
         """
         try :
+            self.num_selections += 1
+
             # Explore with probability epsilon
-            if np.random.rand() < self.epsilon :
-                selected_arm = np.random.choice(self.num_arms)
-                self.logger.info(f"Epsilon-Greedy Agent exploring: Selected arm randomly: {selected_arm}")
+            if self.rng.random() < self.epsilon :
+                selected_arm = self.rng.choice(self.num_arms)
+                self.num_explorations += 1
             else :
                 # Exploit the arm with the highest average reward.
                 # Calculates the average reward for each arm.
-                # To avoid division by zero, `1e-6` (a small number) is added to `self.num_pulls`. This ensures numerical stability.
-                avg_rewards = self.total_rewards / (self.num_pulls + 1e-6)
-                selected_arm = np.argmax(avg_rewards)
+                # To avoid division by zero, the kernel adds `1e-6` (a small number) to `self.num_pulls`. This ensures numerical stability.
+                selected_arm = np.argmax(average_rewards(self.total_rewards, self.num_pulls))
 
-                self.logger.info(
-                    f"Epsilon-Greedy Agent exploiting: Selected arm based on highest average reward: {selected_arm}")
-                self.logger.info(f"Epsilon-Greedy Agent - Average rewards: {avg_rewards}")
+            # Log an aggregate of the last log_interval decisions instead of every single one
+            if self.num_selections % self.log_interval == 0 :
+                self.logger.info(f"Epsilon-Greedy Agent explored {self.num_explorations} times in the last "
+                                 f"{self.log_interval} selections; selected arm {selected_arm} at step "
+                                 f"{self.num_selections}")
+                self.logger.info(f"Epsilon-Greedy Agent - Average rewards: "
+                                 f"{average_rewards(self.total_rewards, self.num_pulls)}")
+                self.num_explorations = 0
 
             return selected_arm
         except Exception as e :
@@ -164,8 +265,817 @@ class EpsilonGreedyAgent :
             # Increments the count of how many times the arm has been pulled.
             self.num_pulls[arm] += 1
 
-            self.logger.info(f"Epsilon-Greedy Agent updated for arm {arm}: Total Rewards={self.total_rewards[arm]}, "
-                             f"Num Pulls={self.num_pulls[arm]}\n")
+            self.num_updates += 1
+            if self.num_updates % self.log_interval == 0 :
+                self.logger.info(f"Epsilon-Greedy Agent updated for arm {arm}: "
+                                 f"Total Rewards={self.total_rewards[arm]}, Num Pulls={self.num_pulls[arm]}\n")
         except Exception as e :
             self.logger.error(f"Error during Epsilon Greedy agent update due to: {str(e)}")
             raise e
+
+    def update_batch(self, arms, rewards) :
+        """
+        Updates the agent's knowledge with a batch of delayed feedback events at once.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+        """
+        try :
+            arms, rewards = _feedback_arrays(arms, rewards, self.num_arms)
+            accumulate_batch(self.total_rewards, self.num_pulls, arms, rewards)
+
+            previous_updates = self.num_updates
+            self.num_updates += len(arms)
+            if self.num_updates // self.log_interval > previous_updates // self.log_interval :
+                self.logger.info(f"Epsilon-Greedy Agent updated with a batch of {len(arms)} rewards, "
+                                 f"{self.num_updates} updates so far")
+        except Exception as e :
+            self.logger.error(f"Error during Epsilon Greedy agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, k) :
+        """
+        Selects k arms against a frozen snapshot of the statistics.
+        :param k: Number of decisions.
+        :return: Array of k arms. Every decision explores independently with probability epsilon,
+                 otherwise it exploits the arm with the highest average reward of the snapshot.
+        """
+        try :
+            selected_arms = np.full(k, np.argmax(average_rewards(self.total_rewards, self.num_pulls)))
+
+            explore = self.rng.random(k) < self.epsilon
+            num_explore = int(np.count_nonzero(explore))
+            if num_explore :
+                selected_arms[explore] = self.rng.choice(self.num_arms, size=num_explore)
+
+            previous_selections = self.num_selections
+            self.num_selections += k
+            self.num_explorations += num_explore
+            if self.num_selections // self.log_interval > previous_selections // self.log_interval :
+                self.logger.info(f"Epsilon-Greedy Agent explored {self.num_explorations} times since the last "
+                                 f"report; selected {k} arms at step {self.num_selections}")
+                self.num_explorations = 0
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {k} arms due to: {str(e)}")
+            raise e
+
+
+class ThompsonSamplingAgent :
+    def __init__(self, no_arm, log_interval=DEFAULT_LOG_INTERVAL, rng=None) :
+        """
+        Initializes a Gaussian Thompson Sampling agent with a given number of arms.
+        :param no_arm: Number of arms in the bandit.
+        :param log_interval: Decisions and updates are logged once every log_interval steps.
+        :param rng: np.random.Generator used for the posterior draws. A fresh one is created if omitted.
+
+        The mean reward of every arm has a N(0, 1) prior, matching how the bandit draws its true means,
+        and the rewards have unit-variance noise. After n pulls with total reward S, the posterior of an
+        arm is N(S / (n + 1), 1 / (n + 1)), so the agent only stores the same sums and counts as UCB1.
+        """
+        try :
+            load_logging_config()
+            self.logger = logging.getLogger('staging')
+
+            # Number of arms
+            self.num_arms = no_arm
+
+            # Array to store total rewards for each arm
+            self.total_rewards = np.zeros(no_arm)
+
+            # Array to store the number of pulls for each arm
+            self.num_pulls = np.zeros(no_arm)
+
+            self.rng = rng if rng is not None else np.random.default_rng()
+
+            # Counters used to sample the logs
+            self.timestep = 0
+            self.num_updates = 0
+            self.log_interval = log_interval
+        except Exception as e :
+            self.logger.error(f"Error during ThompsonSamplingAgent initialization due to: {str(e)}")
+            raise e
+
+    def select_arm(self) :
+        """
+        Selects an arm based on Gaussian Thompson Sampling.
+        :return: The selected arm.
+
+        Draws one sample from the posterior of every arm, with a single vectorized normal sample of
+        length K, and selects the arm with the highest draw.
+        """
+        try :
+            self.timestep += 1
+
+            selected_arm = thompson_arms(self.total_rewards, self.num_pulls, self.rng)
+
+            if self.timestep % self.log_interval == 0 :
+                self.logger.info(f"Thompson Sampling Agent selected arm: {selected_arm} at step {self.timestep}")
+                self.logger.info(f"Thompson Sampling Agent - Posterior means: "
+                                 f"{gaussian_posterior(self.total_rewards, self.num_pulls)[0]}")
+
+            return selected_arm
+        except Exception as e :
+            self.logger.error(f"Error during arm selection due to: {str(e)}")
+            raise e
+
+    def update(self, arm, reward) :
+        """
+        Updates the agent's knowledge after pulling an arm and receiving a reward.
+        :param arm: The arm that was pulled.
+        :param reward: The received reward.
+        """
+        try :
+            # Check if the arm index is valid
+            if arm < 0 or arm >= self.num_arms :
+                raise ValueError(f"Invalid arm index: {arm}")
+
+            # Update total rewards and number of pulls for the selected arm
+            self.total_rewards[arm] += reward
+            self.num_pulls[arm] += 1
+
+            self.num_updates += 1
+            if self.num_updates % self.log_interval == 0 :
+                self.logger.info(f"Thompson Sampling Agent updated for arm {arm}: "
+                                 f"Total Rewards={self.total_rewards[arm]}, Num Pulls={self.num_pulls[arm]}")
+        except Exception as e :
+            self.logger.error(f"Error during Thompson Sampling agent update due to: {str(e)}")
+            raise e
+
+    def update_batch(self, arms, rewards) :
+        """
+        Updates the agent's knowledge with a batch of delayed feedback events at once.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+        """
+        try :
+            arms, rewards = _feedback_arrays(arms, rewards, self.num_arms)
+            accumulate_batch(self.total_rewards, self.num_pulls, arms, rewards)
+
+            previous_updates = self.num_updates
+            self.num_updates += len(arms)
+            if self.num_updates // self.log_interval > previous_updates // self.log_interval :
+                self.logger.info(f"Thompson Sampling Agent updated with a batch of {len(arms)} rewards, "
+                                 f"{self.num_updates} updates so far")
+        except Exception as e :
+            self.logger.error(f"Error during Thompson Sampling agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, k) :
+        """
+        Selects k arms against a frozen snapshot of the posterior, with one (k x K) normal sample.
+        :param k: Number of decisions.
+        :return: Array of k arms.
+        """
+        try :
+            selected_arms = thompson_arms(self.total_rewards, self.num_pulls, self.rng, size=k)
+
+            previous_timestep = self.timestep
+            self.timestep += k
+            if self.timestep // self.log_interval > previous_timestep // self.log_interval :
+                self.logger.info(f"Thompson Sampling Agent selected {k} arms at step {self.timestep}")
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {k} arms due to: {str(e)}")
+            raise e
+
+
+class LargeArmUCB1Agent(UCB1Agent) :
+    def __init__(self, no_arm, log_interval=DEFAULT_LOG_INTERVAL) :
+        """
+        UCB1 agent for very large numbers of arms.
+        :param no_arm: Number of arms in the bandit.
+        :param log_interval: Decisions and updates are logged once every log_interval steps.
+
+        Makes the same choices as UCB1Agent, but keeps the UCB values in a kinetic tournament tree
+        (see UCBTournamentTree) instead of recomputing and scanning all of them on every step, so that
+        selection costs close to O(log K) instead of O(K). Ties are broken towards the lowest arm index,
+        as in UCB1Agent; arms whose values only differ by rounding may be ordered differently.
+        """
+        super().__init__(no_arm, log_interval=log_interval)
+
+        try :
+            self.index = UCBTournamentTree(no_arm)
+        except Exception as e :
+            self.logger.error(f"Error during LargeArmUCB1Agent initialization due to: {str(e)}")
+            raise e
+
+    def select_arm(self) :
+        """
+        Selects an arm based on the UCB1 strategy, using the tournament tree.
+        :return: The selected arm.
+        """
+        try :
+            # Increment timestep
+            self.timestep += 1
+
+            # The UCB values are lines in sqrt(log t); only the nodes whose winner may have changed are recomputed
+            self.index.advance(math.sqrt(math.log(self.timestep)))
+            selected_arm = self.index.best()
+
+            if self.timestep % self.log_interval == 0 :
+                self.logger.info(f"Large-arm UCB1 Agent selected arm: {selected_arm} at step {self.timestep}")
+
+            return selected_arm
+        except Exception as e :
+            self.logger.error(f"Error during arm selection: {str(e)}")
+            raise e
+
+    def update(self, arm, reward) :
+        """
+        Updates the agent's knowledge and the line of the pulled arm in the tournament tree.
+        :param arm: The arm that was pulled.
+        :param reward: The received reward.
+        """
+        super().update(arm, reward)
+
+        try :
+            # Same offset as in UCB1Agent.select_arm
+            pulls = float(self.num_pulls[arm]) + PULL_OFFSET
+            self.index.set_arm(arm, float(self.total_rewards[arm]) / pulls, math.sqrt(2 / pulls))
+        except Exception as e :
+            self.logger.error(f"Error during Large-arm UCB1 agent update due to: {str(e)}")
+            raise e
+
+    def update_batch(self, arms, rewards) :
+        """
+        Updates the agent's knowledge with a batch of feedback events and the lines of the pulled arms.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+        """
+        super().update_batch(arms, rewards)
+
+        try :
+            for arm in np.unique(arms).tolist() :
+                pulls = float(self.num_pulls[arm]) + PULL_OFFSET
+                self.index.set_arm(arm, float(self.total_rewards[arm]) / pulls, math.sqrt(2 / pulls))
+        except Exception as e :
+            self.logger.error(f"Error during Large-arm UCB1 agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, k) :
+        """
+        Selects k arms against a frozen snapshot of the statistics, using the tournament tree.
+        :param k: Number of decisions.
+        :return: Array of k arms, identical to calling select_arm() k times without any update in between.
+        """
+        try :
+            selected_arms = np.empty(k, dtype=np.int64)
+            for j in range(k) :
+                self.index.advance(math.sqrt(math.log(self.timestep + j + 1)))
+                selected_arms[j] = self.index.best()
+
+            previous_timestep = self.timestep
+            self.timestep += k
+            if self.timestep // self.log_interval > previous_timestep // self.log_interval :
+                self.logger.info(f"Large-arm UCB1 Agent selected {k} arms at step {self.timestep}")
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {k} arms: {str(e)}")
+            raise e
+
+
+class SlidingWindowUCBAgent :
+    # The decisions draw no random numbers, so the replay evaluation may hold one until it matches the log
+    deterministic = True
+
+    def __init__(self, no_arm, window_size=DEFAULT_WINDOW_SIZE, log_interval=DEFAULT_LOG_INTERVAL) :
+        """
+        Initializes a Sliding-Window UCB agent for bandits whose true means change over time.
+        :param no_arm: Number of arms in the bandit.
+        :param window_size: Number of most recent rewards W the statistics are computed over.
+        :param log_interval: Decisions and updates are logged once every log_interval steps.
+
+        total_rewards and num_pulls only cover the last W updates. The pulled arms and rewards of these
+        updates are kept in two ring buffers of length W: every update adds the new reward and subtracts
+        the one it evicts, so a step costs O(1) whatever the window size, and the memory never grows
+        beyond the window, however long the run.
+        """
+        try :
+            if no_arm < 2 :
+                raise ValueError("SlidingWindowUCBAgent requires at least 2 arms.")
+            if window_size < 1 :
+                raise ValueError(f"Invalid window size: {window_size}")
+
+            load_logging_config()
+            self.logger = logging.getLogger('staging')
+
+            # Number of arms
+            self.num_arms = no_arm
+            self.window_size = window_size
+
+            # Total rewards and number of pulls of each arm within the window
+            self.total_rewards = np.zeros(no_arm)
+            self.num_pulls = np.zeros(no_arm)
+
+            # Ring buffers of the last window_size updates; -1 marks a slot that was never written
+            self._window_arms = np.full(window_size, -1, dtype=np.int32)
+            self._window_rewards = np.zeros(window_size)
+            self._position = 0
+
+            # Timestep to keep track of the number of iterations
+            self.timestep = 0
+
+            # Number of updates, used to sample the update logs
+            self.num_updates = 0
+            self.log_interval = log_interval
+        except Exception as e :
+            self.logger.error(f"Error during SlidingWindowUCBAgent initialization due to: {str(e)}")
+            raise e
+
+    def select_arm(self) :
+        """
+        Selects an arm based on the Sliding-Window UCB strategy.
+        :return: The selected arm.
+
+        Same values as UCB1 computed over the window: the windowed average reward plus the exploration
+        bonus sqrt(2 log min(t, W) / n), where n is the number of pulls of the arm within the window.
+        Arms that were not pulled within the window get a very large bonus and are tried again.
+        """
+        try :
+            self.timestep += 1
+
+            ucb_values = ucb1_values(self.total_rewards, self.num_pulls, min(self.timestep, self.window_size))
+            selected_arm = np.argmax(ucb_values)
+
+            if self.timestep % self.log_interval == 0 :
+                self.logger.info(f"Sliding-Window UCB Agent selected arm: {selected_arm} at step {self.timestep}")
+
+            return selected_arm
+        except Exception as e :
+            self.logger.error(f"Error during arm selection: {str(e)}")
+            raise e
+
+    def update(self, arm, reward) :
+        """
+        Updates the windowed statistics after pulling an arm and receiving a reward.
+        :param arm: The arm that was pulled.
+        :param reward: The received reward.
+        """
+        try :
+            if arm < 0 or arm >= self.num_arms :
+                raise ValueError(f"Invalid arm index: {arm}")
+
+            position = self._position
+
+            # Remove the oldest reward of the window before its slot is overwritten
+            evicted_arm = self._window_arms[position]
+            if evicted_arm >= 0 :
+                self.total_rewards[evicted_arm] -= self._window_rewards[position]
+                self.num_pulls[evicted_arm] -= 1
+
+            self._window_arms[position] = arm
+            self._window_rewards[position] = reward
+            self.total_rewards[arm] += reward
+            self.num_pulls[arm] += 1
+
+            self._advance_position(1)
+
+            self.num_updates += 1
+            if self.num_updates % self.log_interval == 0 :
+                self.logger.info(f"Sliding-Window UCB Agent updated for arm {arm}: "
+                                 f"Total Rewards={self.total_rewards[arm]}, Num Pulls={self.num_pulls[arm]}")
+        except Exception as e :
+            self.logger.error(f"Error during Sliding-Window UCB agent update due to: {str(e)}")
+            raise e
+
+    def update_batch(self, arms, rewards) :
+        """
+        Updates the windowed statistics with a batch of delayed feedback events at once.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+
+        Gives the same statistics as calling update(arm, reward) for every event: the rewards evicted by
+        the batch are subtracted and the new ones added with one vectorized accumulation each.
+        """
+        try :
+            arms, rewards = _feedback_arrays(arms, rewards, self.num_arms)
+
+            if len(arms) >= self.window_size :
+                # The batch replaces the whole window; its last W events start the ring buffers again
+                self._window_arms[:] = arms[-self.window_size :]
+                self._window_rewards[:] = rewards[-self.window_size :]
+                self._position = 0
+                self.total_rewards[:], self.num_pulls[:] = window_statistics(self._window_arms,
+                                                                             self._window_rewards, self.num_arms)
+            elif len(arms) :
+                positions = (self._position + np.arange(len(arms))) % self.window_size
+                # Remove the oldest rewards of the window before their slots are overwritten
+                written = self._window_arms[positions] >= 0
+                evicted_arms = self._window_arms[positions][written]
+                evicted_rewards = self._window_rewards[positions][written]
+                self.total_rewards -= np.bincount(evicted_arms, weights=evicted_rewards, minlength=self.num_arms)
+                self.num_pulls -= np.bincount(evicted_arms, minlength=self.num_arms)
+
+                self._window_arms[positions] = arms
+                self._window_rewards[positions] = rewards
+                accumulate_batch(self.total_rewards, self.num_pulls, arms, rewards)
+
+                self._advance_position(len(arms))
+
+            previous_updates = self.num_updates
+            self.num_updates += len(arms)
+            if self.num_updates // self.log_interval > previous_updates // self.log_interval :
+                self.logger.info(f"Sliding-Window UCB Agent updated with a batch of {len(arms)} rewards, "
+                                 f"{self.num_updates} updates so far")
+        except Exception as e :
+            self.logger.error(f"Error during Sliding-Window UCB agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, k) :
+        """
+        Selects k arms against a frozen snapshot of the windowed statistics.
+        :param k: Number of decisions.
+        :return: Array of k arms, identical to calling select_arm() k times without any update in between.
+        """
+        try :
+            selected_arms = np.empty(k, dtype=np.int64)
+            for start in range(0, k, SELECT_MANY_CHUNK) :
+                stop = min(start + SELECT_MANY_CHUNK, k)
+                timesteps = np.minimum(np.arange(self.timestep + start + 1, self.timestep + stop + 1),
+                                       self.window_size)[:, None]
+                selected_arms[start:stop] = np.argmax(ucb1_values(self.total_rewards, self.num_pulls, timesteps),
+                                                      axis=1)
+
+            previous_timestep = self.timestep
+            self.timestep += k
+            if self.timestep // self.log_interval > previous_timestep // self.log_interval :
+                self.logger.info(f"Sliding-Window UCB Agent selected {k} arms at step {self.timestep}")
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {k} arms: {str(e)}")
+            raise e
+
+    def _advance_position(self, count) :
+        """
+        Moves the write position of the ring buffers by count slots. Whenever it wraps around, the window
+        is full and its sums are recomputed from the buffers (O(W + K) once per W updates, so O(1) amortized),
+        which bounds the rounding error of the incremental additions and subtractions.
+        """
+        position = self._position + count
+        self._position = position % self.window_size
+        if position >= self.window_size :
+            self.total_rewards[:], self.num_pulls[:] = window_statistics(self._window_arms, self._window_rewards,
+                                                                         self.num_arms)
+
+
+class DiscountedUCBAgent :
+    # The decisions draw no random numbers, so the replay evaluation may hold one until it matches the log
+    deterministic = True
+
+    def __init__(self, no_arm, discount=DEFAULT_DISCOUNT, log_interval=DEFAULT_LOG_INTERVAL) :
+        """
+        Initializes a Discounted UCB agent for bandits whose true means change over time.
+        :param no_arm: Number of arms in the bandit.
+        :param discount: Discount factor gamma in (0, 1): a reward received s steps ago has weight gamma^s.
+        :param log_interval: Decisions and updates are logged once every log_interval steps.
+
+        Decaying every arm on every step would cost O(K) per update. Instead, the discounted sums are stored
+        divided by a scale (gamma^t): an update only shrinks the scale and adds reward / scale to the pulled
+        arm, in O(1). The scale is folded back into the stored sums once it becomes very small (see
+        MIN_DISCOUNT_SCALE). total_rewards and num_pulls return the actual discounted statistics.
+        """
+        try :
+            if no_arm < 2 :
+                raise ValueError("DiscountedUCBAgent requires at least 2 arms.")
+            if not (0 < discount < 1) :
+                raise ValueError(f"Invalid discount factor: {discount}")
+
+            load_logging_config()
+            self.logger = logging.getLogger('staging')
+
+            # Number of arms
+            self.num_arms = no_arm
+            self.discount = discount
+
+            # Discounted total rewards and number of pulls of each arm, divided by _scale
+            self._scaled_rewards = np.zeros(no_arm)
+            self._scaled_pulls = np.zeros(no_arm)
+            self._scale = 1.0
+
+            # Discounted number of updates: sum over past updates of gamma^s, at most 1 / (1 - gamma)
+            self.discounted_steps = 0.0
+
+            # Timestep to keep track of the number of iterations
+            self.timestep = 0
+
+            # Number of updates, used to sample the update logs
+            self.num_updates = 0
+            self.log_interval = log_interval
+        except Exception as e :
+            self.logger.error(f"Error during DiscountedUCBAgent initialization due to: {str(e)}")
+            raise e
+
+    @property
+    def total_rewards(self) :
+        """
+        :return: Discounted total reward of every arm.
+        """
+        return self._scaled_rewards * self._scale
+
+    @property
+    def num_pulls(self) :
+        """
+        :return: Discounted number of pulls of every arm.
+        """
+        return self._scaled_pulls * self._scale
+
+    def select_arm(self) :
+        """
+        Selects an arm based on the Discounted UCB strategy.
+        :return: The selected arm.
+
+        Same values as UCB1 computed on the discounted statistics: the discounted average reward plus the
+        exploration bonus sqrt(2 log n / N), where N is the discounted number of pulls of the arm and n the
+        discounted number of updates of all arms.
+        """
+        try :
+            self.timestep += 1
+
+            selected_arm = np.argmax(self._ucb_values())
+
+            if self.timestep % self.log_interval == 0 :
+                self.logger.info(f"Discounted UCB Agent selected arm: {selected_arm} at step {self.timestep}")
+
+            return selected_arm
+        except Exception as e :
+            self.logger.error(f"Error during arm selection: {str(e)}")
+            raise e
+
+    def update(self, arm, reward) :
+        """
+        Discounts all past rewards by one step and adds the received reward.
+        :param arm: The arm that was pulled.
+        :param reward: The received reward.
+        """
+        try :
+            if arm < 0 or arm >= self.num_arms :
+                raise ValueError(f"Invalid arm index: {arm}")
+
+            self._shrink_scale(self.discount)
+            self._scaled_rewards[arm] += reward / self._scale
+            self._scaled_pulls[arm] += 1 / self._scale
+            self.discounted_steps = self.discounted_steps * self.discount + 1
+
+            self.num_updates += 1
+            if self.num_updates % self.log_interval == 0 :
+                self.logger.info(f"Discounted UCB Agent updated for arm {arm}: "
+                                 f"Total Rewards={self.total_rewards[arm]}, Num Pulls={self.num_pulls[arm]}")
+        except Exception as e :
+            self.logger.error(f"Error during Discounted UCB agent update due to: {str(e)}")
+            raise e
+
+    def update_batch(self, arms, rewards) :
+        """
+        Updates the discounted statistics with a batch of delayed feedback events at once.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+
+        Gives the same statistics as calling update(arm, reward) for every event: event j of a batch of
+        m events is weighted by gamma^(m - 1 - j) and the whole batch is added with one accumulation.
+        """
+        try :
+            arms, rewards = _feedback_arrays(arms, rewards, self.num_arms)
+
+            if len(arms) :
+                # Weights of the events at the end of the batch; the oldest ones may underflow to zero
+                weights = self.discount ** np.arange(len(arms) - 1, -1, -1, dtype=float)
+
+                self._shrink_scale(self.discount ** len(arms))
+                self._scaled_rewards += np.bincount(arms, weights=weights * rewards,
+                                                    minlength=self.num_arms) / self._scale
+                self._scaled_pulls += np.bincount(arms, weights=weights, minlength=self.num_arms) / self._scale
+                self.discounted_steps = self.discounted_steps * self.discount ** len(arms) + weights.sum()
+
+            previous_updates = self.num_updates
+            self.num_updates += len(arms)
+            if self.num_updates // self.log_interval > previous_updates // self.log_interval :
+                self.logger.info(f"Discounted UCB Agent updated with a batch of {len(arms)} rewards, "
+                                 f"{self.num_updates} updates so far")
+        except Exception as e :
+            self.logger.error(f"Error during Discounted UCB agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, k) :
+        """
+        Selects k arms against a frozen snapshot of the discounted statistics.
+        :param k: Number of decisions.
+        :return: Array of k arms, identical to calling select_arm() k times without any update in between.
+
+        The values only depend on the discounted statistics, so all k decisions pick the same arm.
+        """
+        try :
+            selected_arms = np.full(k, np.argmax(self._ucb_values()), dtype=np.int64)
+
+            previous_timestep = self.timestep
+            self.timestep += k
+            if self.timestep // self.log_interval > previous_timestep // self.log_interval :
+                self.logger.info(f"Discounted UCB Agent selected {k} arms at step {self.timestep}")
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {k} arms: {str(e)}")
+            raise e
+
+    def _ucb_values(self) :
+        """
+        :return: Discounted UCB value of every arm. Before the first update n is 0, so log n is clamped at 0.
+        """
+        return ucb1_values(self.total_rewards, self.num_pulls, max(self.discounted_steps, 1.0))
+
+    def _shrink_scale(self, factor) :
+        """
+        Multiplies the scale by factor, which discounts every stored statistic at once. Once the scale is
+        below MIN_DISCOUNT_SCALE, it is folded into the stored statistics and reset to 1.
+        """
+        scale = self._scale * factor
+        if scale < MIN_DISCOUNT_SCALE :
+            self._scaled_rewards *= scale
+            self._scaled_pulls *= scale
+            scale = 1.0
+        self._scale = scale
+
+
+class LinUCBAgent :
+    # Tells the simulation loop to pass the context of the bandit to select_arm
+    contextual = True
+
+    def __init__(self, no_arm, dimension, alpha=1.0, regularization=1.0, log_interval=DEFAULT_LOG_INTERVAL) :
+        """
+        Initializes a LinUCB agent (disjoint linear model per arm) for contextual bandits.
+        :param no_arm: Number of arms in the bandit.
+        :param dimension: Dimension d of the contexts.
+        :param alpha: Width of the confidence bound, in standard deviations of the reward estimate.
+        :param regularization: Ridge parameter lambda; every design matrix starts at lambda * I.
+        :param log_interval: Decisions and updates are logged once every log_interval steps.
+
+        Arm a estimates its parameters by ridge regression, theta_a = A_a^-1 b_a, with the design matrix
+        A_a = lambda * I + sum x x^T and b_a = sum r x over the contexts x in which it was pulled. Only the
+        inverses A_a^-1 are stored, as one (K x d x d) array, and they are kept up to date with rank-1
+        Sherman-Morrison updates, in O(d^2) per step instead of an O(d^3) inversion.
+        """
+        try :
+            if no_arm < 2 :
+                raise ValueError("LinUCBAgent requires at least 2 arms.")
+            if dimension < 1 or regularization <= 0 :
+                raise ValueError(f"Invalid dimension {dimension} or regularization {regularization}")
+
+            load_logging_config()
+            self.logger = logging.getLogger('staging')
+
+            # Number of arms and context dimension
+            self.num_arms = no_arm
+            self.dimension = dimension
+            self.alpha = alpha
+
+            # Inverse design matrix, reward-weighted context sum and parameter estimate of every arm
+            self.inverse_design = np.empty((no_arm, dimension, dimension))
+            self.inverse_design[:] = np.eye(dimension) / regularization
+            self.weighted_contexts = np.zeros((no_arm, dimension))
+            self.theta = np.zeros((no_arm, dimension))
+
+            # Number of pulls of every arm, for the logs
+            self.num_pulls = np.zeros(no_arm)
+
+            # Context of the last selection, used by update(arm, reward)
+            self._last_context = None
+
+            # Counters used to sample the logs
+            self.timestep = 0
+            self.num_updates = 0
+            self.log_interval = log_interval
+        except Exception as e :
+            self.logger.error(f"Error during LinUCBAgent initialization due to: {str(e)}")
+            raise e
+
+    def scores(self, contexts) :
+        """
+        :param contexts: Context of shape (d,), or (m x d) for m decisions at once.
+        :return: LinUCB score of every arm, theta_a . x + alpha * sqrt(x^T A_a^-1 x), of shape (K,) or (m x K).
+
+        The products A_a^-1 x of all arms and all contexts are computed as one (K d x d) by (d x m) matrix
+        product over the stacked inverses, which streams the K x d x d array once per call.
+        """
+        contexts = np.asarray(contexts, dtype=float)
+        matrix = contexts.reshape(-1, self.dimension).T
+        stacked_inverses = self.inverse_design.reshape(-1, self.dimension)
+        products = (stacked_inverses @ matrix).reshape(self.num_arms, self.dimension, -1)
+        variances = np.einsum('kdm,dm->mk', products, matrix)
+        values = (self.theta @ matrix).T + self.alpha * np.sqrt(np.maximum(variances, 0.0))
+
+        return values[0] if contexts.ndim == 1 else values
+
+    def select_arm(self, context) :
+        """
+        Selects the arm with the highest LinUCB score for the context.
+        :param context: Context vector of shape (d,).
+        :return: The selected arm.
+        """
+        try :
+            self.timestep += 1
+
+            self._last_context = np.asarray(context, dtype=float)
+            selected_arm = np.argmax(self.scores(self._last_context))
+
+            if self.timestep % self.log_interval == 0 :
+                self.logger.info(f"LinUCB Agent selected arm: {selected_arm} at step {self.timestep}")
+
+            return selected_arm
+        except Exception as e :
+            self.logger.error(f"Error during arm selection: {str(e)}")
+            raise e
+
+    def update(self, arm, reward, context=None) :
+        """
+        Updates the model of the pulled arm.
+        :param arm: The arm that was pulled.
+        :param reward: The received reward.
+        :param context: Context in which the arm was pulled; by default the context of the last select_arm,
+                        which is required after select_many.
+        """
+        try :
+            if arm < 0 or arm >= self.num_arms :
+                raise ValueError(f"Invalid arm index: {arm}")
+            if context is None :
+                if self._last_context is None :
+                    raise ValueError("No context to update with: pass the context of the pulled arm.")
+                context = self._last_context
+
+            self._update_arm(arm, reward, np.asarray(context, dtype=float))
+
+            self.num_updates += 1
+            if self.num_updates % self.log_interval == 0 :
+                self.logger.info(f"LinUCB Agent updated for arm {arm}: Num Pulls={self.num_pulls[arm]}")
+        except Exception as e :
+            self.logger.error(f"Error during LinUCB agent update due to: {str(e)}")
+            raise e
+
+    def update_batch(self, arms, rewards, contexts) :
+        """
+        Updates the agent with a batch of delayed feedback events.
+        :param arms: Pulled arm of every event.
+        :param rewards: Received reward of every event.
+        :param contexts: (m x d) context of every event.
+
+        Gives the same model as calling update(arm, reward, context) for every event, in O(d^2) per event.
+        """
+        try :
+            arms, rewards = _feedback_arrays(arms, rewards, self.num_arms)
+            contexts = np.asarray(contexts, dtype=float)
+            if contexts.shape != (len(arms), self.dimension) :
+                raise ValueError(f"contexts must have shape {(len(arms), self.dimension)}, got {contexts.shape}")
+
+            for arm, reward, context in zip(arms.tolist(), rewards.tolist(), contexts) :
+                self._update_arm(arm, reward, context)
+
+            previous_updates = self.num_updates
+            self.num_updates += len(arms)
+            if self.num_updates // self.log_interval > previous_updates // self.log_interval :
+                self.logger.info(f"LinUCB Agent updated with a batch of {len(arms)} rewards, "
+                                 f"{self.num_updates} updates so far")
+        except Exception as e :
+            self.logger.error(f"Error during LinUCB agent batch update due to: {str(e)}")
+            raise e
+
+    def select_many(self, contexts) :
+        """
+        Selects one arm per context against a frozen snapshot of the models.
+        :param contexts: (m x d) contexts of m decisions.
+        :return: Array of m arms, identical to calling select_arm(context) for every context without any
+                 update in between; all contexts are scored with one matrix product.
+        """
+        try :
+            contexts = np.asarray(contexts, dtype=float)
+            selected_arms = np.argmax(self.scores(contexts), axis=1)
+            # None of these decisions is the one a context-free update() refers to, so it must fail instead
+            # of silently using the context of an earlier select_arm
+            self._last_context = None
+
+            previous_timestep = self.timestep
+            self.timestep += len(contexts)
+            if self.timestep // self.log_interval > previous_timestep // self.log_interval :
+                self.logger.info(f"LinUCB Agent selected {len(contexts)} arms at step {self.timestep}")
+
+            return selected_arms
+        except Exception as e :
+            self.logger.error(f"Error during selection of {len(contexts)} arms: {str(e)}")
+            raise e
+
+    def _update_arm(self, arm, reward, context) :
+        """
+        Adds one observation to the model of an arm with a Sherman-Morrison update:
+        (A + x x^T)^-1 = A^-1 - (A^-1 x)(A^-1 x)^T / (1 + x^T A^-1 x), since A^-1 is symmetric.
+        The correction is written as the outer product of one vector with itself, so the inverse stays
+        exactly symmetric however many updates are applied.
+        """
+        inverse = self.inverse_design[arm]
+        product = inverse @ context
+        correction = product / np.sqrt(1.0 + context @ product)
+        inverse -= np.outer(correction, correction)
+
+        self.weighted_contexts[arm] += reward * context
+        self.theta[arm] = inverse @ self.weighted_contexts[arm]
+        self.num_pulls[arm] += 1
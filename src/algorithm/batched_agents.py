@@ -0,0 +1,319 @@
+import numpy as np
+
+from src.algorithm.kernels import ucb1_values, epsilon_greedy_arms, thompson_arms, accumulate, window_statistics, \
+    DEFAULT_WINDOW_SIZE, DEFAULT_DISCOUNT, MIN_DISCOUNT_SCALE
+
+# Default storage types of the population state. With float32 sums the state of every agent takes
+# 8 bytes per arm; the default float64 sums keep the exact arithmetic of the single agents (12 bytes per arm).
+DEFAULT_SUM_DTYPE = np.float64
+DEFAULT_COUNT_DTYPE = np.int32
+
+
+# The batched agents store the state of N agents of one strategy in contiguous (N x K) arrays, one row per
+# agent. The rows can be independent replications of the same agent (see VectorizedSimulation) or a
+# population of different configurations, e.g. thousands of epsilon values or seeds evaluated against the
+# same bandit in one pass (see src.simulation.population_evaluation).
+
+class BatchedUCB1Agent :
+    def __init__(self, num_agents, no_arm, sum_dtype=DEFAULT_SUM_DTYPE, count_dtype=DEFAULT_COUNT_DTYPE) :
+        """
+        Initializes N UCB1 agents whose state is stored in 2-D arrays (N x K).
+        :param num_agents: Number of agents (rows).
+        :param no_arm: Number of arms in the bandit.
+        :param sum_dtype: Floating point type of the total rewards.
+        :param count_dtype: Integer type of the number of pulls.
+
+        Row r of total_rewards and num_pulls holds exactly the state a single UCB1Agent would hold,
+        so one vectorized step advances all agents at once.
+        """
+        if no_arm < 2 :
+            raise ValueError("BatchedUCB1Agent requires at least 2 arms.")
+        if num_agents < 1 :
+            raise ValueError("BatchedUCB1Agent requires at least 1 agent.")
+
+        self.num_agents = num_agents
+        self.num_arms = no_arm
+
+        # Per-agent total rewards and number of pulls for each arm
+        self.total_rewards = np.zeros((num_agents, no_arm), dtype=sum_dtype)
+        self.num_pulls = np.zeros((num_agents, no_arm), dtype=count_dtype)
+
+        # All agents advance in lockstep, so a single timestep is shared
+        self.timestep = 0
+
+        # Row indices reused for fancy indexing on every update
+        self._rows = np.arange(num_agents)
+
+    def select_arms(self) :
+        """
+        Selects one arm per agent based on the UCB1 strategy.
+        :return: Array of shape (N,) with the selected arm of each agent.
+
+        Uses the same kernel as UCB1Agent.select_arm and the same tie-breaking (lowest arm index), row-wise.
+        """
+        self.timestep += 1
+
+        return np.argmax(ucb1_values(self.total_rewards, self.num_pulls, self.timestep), axis=1)
+
+    def update(self, arms, rewards) :
+        """
+        Updates every agent after pulling its selected arm.
+        :param arms: Array of shape (N,) with the pulled arm of each agent.
+        :param rewards: Array of shape (N,) with the received rewards.
+        """
+        accumulate(self.total_rewards, self.num_pulls, self._rows, arms, rewards)
+
+
+class BatchedEpsilonGreedyAgent :
+    def __init__(self, num_agents, no_arm, eps, rng=None, sum_dtype=DEFAULT_SUM_DTYPE,
+                 count_dtype=DEFAULT_COUNT_DTYPE) :
+        """
+        Initializes N Epsilon-Greedy agents whose state is stored in 2-D arrays (N x K).
+        :param num_agents: Number of agents (rows).
+        :param no_arm: Number of arms in the bandit.
+        :param eps: Exploration rate, either one value shared by all agents or one value per agent.
+        :param rng: np.random.Generator used for exploration decisions. A fresh one is created if omitted.
+        :param sum_dtype: Floating point type of the total rewards.
+        :param count_dtype: Integer type of the number of pulls.
+        """
+        if num_agents < 1 :
+            raise ValueError("BatchedEpsilonGreedyAgent requires at least 1 agent.")
+
+        epsilons = np.asarray(eps, dtype=float)
+        if epsilons.ndim not in (0, 1) or (epsilons.ndim == 1 and epsilons.shape != (num_agents,)) :
+            raise ValueError(f"eps must be a scalar or have shape {(num_agents,)}")
+        if np.any((epsilons < 0) | (epsilons > 1)) :
+            raise ValueError(f"Invalid value for epsilon: {eps}")
+
+        self.num_agents = num_agents
+        self.num_arms = no_arm
+        self.epsilon = epsilons
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Per-agent total rewards and number of pulls for each arm
+        self.total_rewards = np.zeros((num_agents, no_arm), dtype=sum_dtype)
+        self.num_pulls = np.zeros((num_agents, no_arm), dtype=count_dtype)
+
+        # Row indices reused for fancy indexing on every update
+        self._rows = np.arange(num_agents)
+
+    def select_arms(self) :
+        """
+        Selects one arm per agent based on the Epsilon-Greedy strategy.
+        :return: Array of shape (N,) with the selected arm of each agent.
+
+        Each agent explores with its own probability epsilon (uniformly random arm) and otherwise
+        exploits the arm with the highest average reward, exactly like EpsilonGreedyAgent.select_arm.
+        """
+        return epsilon_greedy_arms(self.total_rewards, self.num_pulls, self.epsilon, self.rng)
+
+    def update(self, arms, rewards) :
+        """
+        Updates every agent after pulling its selected arm.
+        :param arms: Array of shape (N,) with the pulled arm of each agent.
+        :param rewards: Array of shape (N,) with the received rewards.
+        """
+        accumulate(self.total_rewards, self.num_pulls, self._rows, arms, rewards)
+
+
+class BatchedThompsonSamplingAgent :
+    def __init__(self, num_agents, no_arm, rng=None, sum_dtype=DEFAULT_SUM_DTYPE, count_dtype=DEFAULT_COUNT_DTYPE) :
+        """
+        Initializes N Gaussian Thompson Sampling agents whose state is stored in 2-D arrays (N x K).
+        :param num_agents: Number of agents (rows).
+        :param no_arm: Number of arms in the bandit.
+        :param rng: np.random.Generator used for the posterior draws. A fresh one is created if omitted.
+        :param sum_dtype: Floating point type of the total rewards.
+        :param count_dtype: Integer type of the number of pulls.
+        """
+        if num_agents < 1 :
+            raise ValueError("BatchedThompsonSamplingAgent requires at least 1 agent.")
+
+        self.num_agents = num_agents
+        self.num_arms = no_arm
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # Per-agent total rewards and number of pulls for each arm
+        self.total_rewards = np.zeros((num_agents, no_arm), dtype=sum_dtype)
+        self.num_pulls = np.zeros((num_agents, no_arm), dtype=count_dtype)
+
+        # Row indices reused for fancy indexing on every update
+        self._rows = np.arange(num_agents)
+
+    def select_arms(self) :
+        """
+        Selects one arm per agent based on Gaussian Thompson Sampling.
+        :return: Array of shape (N,) with the selected arm of each agent.
+
+        The posterior draws of all agents and all arms come from one (N x K) standard normal sample.
+        """
+        return thompson_arms(self.total_rewards, self.num_pulls, self.rng)
+
+    def update(self, arms, rewards) :
+        """
+        Updates every agent after pulling its selected arm.
+        :param arms: Array of shape (N,) with the pulled arm of each agent.
+        :param rewards: Array of shape (N,) with the received rewards.
+        """
+        accumulate(self.total_rewards, self.num_pulls, self._rows, arms, rewards)
+
+
+class BatchedSlidingWindowUCBAgent :
+    def __init__(self, num_agents, no_arm, window_size=DEFAULT_WINDOW_SIZE, sum_dtype=DEFAULT_SUM_DTYPE,
+                 count_dtype=DEFAULT_COUNT_DTYPE) :
+        """
+        Initializes N Sliding-Window UCB agents whose state is stored in 2-D arrays (N x K).
+        :param num_agents: Number of agents (rows).
+        :param no_arm: Number of arms in the bandit.
+        :param window_size: Number of most recent rewards W the statistics are computed over.
+        :param sum_dtype: Floating point type of the total rewards.
+        :param count_dtype: Integer type of the number of pulls.
+
+        The last W pulled arms and rewards of all agents are kept in (W x N) ring buffers, so the state
+        takes W x N x 12 bytes on top of the (N x K) statistics, whatever the number of steps.
+        """
+        if no_arm < 2 :
+            raise ValueError("BatchedSlidingWindowUCBAgent requires at least 2 arms.")
+        if num_agents < 1 :
+            raise ValueError("BatchedSlidingWindowUCBAgent requires at least 1 agent.")
+        if window_size < 1 :
+            raise ValueError(f"Invalid window size: {window_size}")
+
+        self.num_agents = num_agents
+        self.num_arms = no_arm
+        self.window_size = window_size
+
+        # Per-agent total rewards and number of pulls for each arm within the window
+        self.total_rewards = np.zeros((num_agents, no_arm), dtype=sum_dtype)
+        self.num_pulls = np.zeros((num_agents, no_arm), dtype=count_dtype)
+
+        # Ring buffers of the last window_size steps, one row per step; all agents advance in lockstep,
+        # so the write position and the timestep are shared
+        self._window_arms = np.zeros((window_size, num_agents), dtype=np.int32)
+        self._window_rewards = np.zeros((window_size, num_agents), dtype=sum_dtype)
+        self._position = 0
+        self._full = False
+        self.timestep = 0
+
+        # Row indices reused for fancy indexing on every update
+        self._rows = np.arange(num_agents)
+
+    def select_arms(self) :
+        """
+        Selects one arm per agent based on the Sliding-Window UCB strategy.
+        :return: Array of shape (N,) with the selected arm of each agent.
+
+        Uses the same values as SlidingWindowUCBAgent.select_arm, row-wise.
+        """
+        self.timestep += 1
+
+        return np.argmax(ucb1_values(self.total_rewards, self.num_pulls, min(self.timestep, self.window_size)),
+                         axis=1)
+
+    def update(self, arms, rewards) :
+        """
+        Updates every agent after pulling its selected arm, evicting the step that left the window.
+        :param arms: Array of shape (N,) with the pulled arm of each agent.
+        :param rewards: Array of shape (N,) with the received rewards.
+        """
+        position = self._position
+        if self._full :
+            # Each row is touched exactly once, so plain fancy indexing is safe here
+            evicted_arms = self._window_arms[position]
+            self.total_rewards[self._rows, evicted_arms] -= self._window_rewards[position]
+            self.num_pulls[self._rows, evicted_arms] -= 1
+
+        self._window_arms[position] = arms
+        self._window_rewards[position] = rewards
+        accumulate(self.total_rewards, self.num_pulls, self._rows, arms, rewards)
+
+        position += 1
+        if position == self.window_size :
+            # Once per pass over the window, the sums are recomputed to bound the rounding error
+            position = 0
+            self._full = True
+            self.total_rewards[:], self.num_pulls[:] = window_statistics(self._window_arms, self._window_rewards,
+                                                                         self.num_arms)
+        self._position = position
+
+
+class BatchedDiscountedUCBAgent :
+    def __init__(self, num_agents, no_arm, discount=DEFAULT_DISCOUNT, sum_dtype=DEFAULT_SUM_DTYPE) :
+        """
+        Initializes N Discounted UCB agents whose state is stored in 2-D arrays (N x K).
+        :param num_agents: Number of agents (rows).
+        :param no_arm: Number of arms in the bandit.
+        :param discount: Discount factor gamma in (0, 1), shared by all agents.
+        :param sum_dtype: Floating point type of the discounted total rewards and number of pulls.
+
+        As in DiscountedUCBAgent, the statistics are stored divided by a scale shared by all agents,
+        so an update costs O(N) instead of decaying all N x K statistics. The scale is folded back into the
+        statistics before 1 / scale could overflow sum_dtype.
+        """
+        if no_arm < 2 :
+            raise ValueError("BatchedDiscountedUCBAgent requires at least 2 arms.")
+        if num_agents < 1 :
+            raise ValueError("BatchedDiscountedUCBAgent requires at least 1 agent.")
+        if not (0 < discount < 1) :
+            raise ValueError(f"Invalid discount factor: {discount}")
+        if not np.issubdtype(sum_dtype, np.floating) :
+            raise ValueError(f"sum_dtype must be a floating point type, got {np.dtype(sum_dtype).name}")
+
+        self.num_agents = num_agents
+        self.num_arms = no_arm
+        self.discount = discount
+
+        # With float32 sums 1 / MIN_DISCOUNT_SCALE would overflow; sqrt(tiny) keeps 1 / scale far below the maximum
+        self._min_scale = max(MIN_DISCOUNT_SCALE, float(np.finfo(sum_dtype).tiny) ** 0.5)
+
+        # Per-agent discounted total rewards and number of pulls for each arm, divided by _scale
+        self._scaled_rewards = np.zeros((num_agents, no_arm), dtype=sum_dtype)
+        self._scaled_pulls = np.zeros((num_agents, no_arm), dtype=sum_dtype)
+        self._scale = 1.0
+
+        # All agents update in lockstep, so the discounted number of updates is shared
+        self.discounted_steps = 0.0
+
+        # Row indices reused for fancy indexing on every update
+        self._rows = np.arange(num_agents)
+
+    @property
+    def total_rewards(self) :
+        """
+        :return: (N x K) discounted total reward of every arm of every agent.
+        """
+        return self._scaled_rewards * self._scale
+
+    @property
+    def num_pulls(self) :
+        """
+        :return: (N x K) discounted number of pulls of every arm of every agent.
+        """
+        return self._scaled_pulls * self._scale
+
+    def select_arms(self) :
+        """
+        Selects one arm per agent based on the Discounted UCB strategy.
+        :return: Array of shape (N,) with the selected arm of each agent.
+
+        Uses the same values as DiscountedUCBAgent.select_arm, row-wise.
+        """
+        return np.argmax(ucb1_values(self.total_rewards, self.num_pulls, max(self.discounted_steps, 1.0)), axis=1)
+
+    def update(self, arms, rewards) :
+        """
+        Discounts the statistics of every agent by one step and adds the reward of its pulled arm.
+        :param arms: Array of shape (N,) with the pulled arm of each agent.
+        :param rewards: Array of shape (N,) with the received rewards.
+        """
+        scale = self._scale * self.discount
+        if scale < self._min_scale :
+            self._scaled_rewards *= scale
+            self._scaled_pulls *= scale
+            scale = 1.0
+        self._scale = scale
+
+        # Each row is touched exactly once, so plain fancy indexing is safe here
+        self._scaled_rewards[self._rows, arms] += rewards / scale
+        self._scaled_pulls[self._rows, arms] += 1 / scale
+        self.discounted_steps = self.discounted_steps * self.discount + 1
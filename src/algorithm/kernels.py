@@ -0,0 +1,143 @@
+import numpy as np
+
+# Added to the number of pulls so that arms that were never pulled do not cause a division by zero
+PULL_OFFSET = 1e-6
+
+# Default window of the sliding-window agents (number of most recent rewards they keep)
+DEFAULT_WINDOW_SIZE = 1000
+
+# Default discount factor of the discounted agents (weight of a reward after one more step)
+DEFAULT_DISCOUNT = 0.999
+
+# The discounted agents store their statistics divided by a scale that shrinks by the discount factor on
+# every step. Once the scale falls below this bound it is folded back into the statistics (O(K)),
+# which happens about once every 230 / (1 - discount) steps and keeps 1 / scale far from overflowing.
+MIN_DISCOUNT_SCALE = 1e-100
+
+
+# The kernels below work on the state of a single agent (1-D arrays of length K) as well as on the
+# state of a population of agents (2-D arrays of shape N x K, one row per agent), so the single agents
+# in agents.py and the batched agents in batched_agents.py share exactly the same arithmetic.
+
+def average_rewards(total_rewards, num_pulls) :
+    """
+    :param total_rewards: Total reward of every arm.
+    :param num_pulls: Number of pulls of every arm.
+    :return: Average reward of every arm.
+    """
+    return total_rewards / (num_pulls + PULL_OFFSET)
+
+
+def ucb1_values(total_rewards, num_pulls, timestep) :
+    """
+    :param total_rewards: Total reward of every arm.
+    :param num_pulls: Number of pulls of every arm.
+    :param timestep: Current timestep (at least 1).
+    :return: UCB1 value of every arm: average reward plus the exploration bonus sqrt(2 log t / n).
+    """
+    denominator = num_pulls + PULL_OFFSET
+    return total_rewards / denominator + np.sqrt(2 * np.log(timestep) / denominator)
+
+
+def epsilon_greedy_arms(total_rewards, num_pulls, epsilons, rng) :
+    """
+    Selects one arm per row with the Epsilon-Greedy strategy.
+    :param total_rewards: (N x K) total reward of every arm of every agent.
+    :param num_pulls: (N x K) number of pulls of every arm of every agent.
+    :param epsilons: Exploration rate, either a scalar or one value per agent.
+    :param rng: np.random.Generator used for the exploration decisions.
+    :return: Array of shape (N,) with the selected arm of every agent.
+    """
+    num_agents, num_arms = total_rewards.shape
+    selected_arms = np.argmax(average_rewards(total_rewards, num_pulls), axis=1)
+
+    explore = rng.random(num_agents) < epsilons
+    num_explore = np.count_nonzero(explore)
+    if num_explore :
+        selected_arms[explore] = rng.integers(0, num_arms, size=num_explore)
+
+    return selected_arms
+
+
+def gaussian_posterior(total_rewards, num_pulls) :
+    """
+    Posterior of the mean reward of every arm under a N(0, 1) prior and unit-variance reward noise.
+    :param total_rewards: Total reward of every arm.
+    :param num_pulls: Number of pulls of every arm.
+    :return: Tuple (posterior means, posterior standard deviations): sum / (n + 1) and 1 / sqrt(n + 1).
+    """
+    precision = num_pulls + 1.0
+    return total_rewards / precision, 1.0 / np.sqrt(precision)
+
+
+def thompson_arms(total_rewards, num_pulls, rng, size=None) :
+    """
+    Selects arms with Gaussian Thompson Sampling: one posterior draw per arm, then the best draw.
+    :param total_rewards: Total reward of every arm, (K,) for one agent or (N x K) for a population.
+    :param num_pulls: Number of pulls of every arm, same shape.
+    :param rng: np.random.Generator used for the posterior draws.
+    :param size: Optional number of independent decisions of a single agent, drawn against the same posterior.
+    :return: Selected arm (one agent), or array of selected arms (one per row, or one per decision).
+
+    All draws of a step come from a single vectorized standard normal sample of the full state shape.
+    """
+    means, deviations = gaussian_posterior(total_rewards, num_pulls)
+    shape = means.shape if size is None else (size,) + means.shape
+    draws = means + deviations * rng.standard_normal(shape)
+
+    return np.argmax(draws, axis=-1)
+
+
+def accumulate(total_rewards, num_pulls, rows, arms, rewards) :
+    """
+    Adds one reward per row to the statistics of the pulled arm.
+    :param total_rewards: (N x K) total reward of every arm of every agent, updated in place.
+    :param num_pulls: (N x K) number of pulls of every arm of every agent, updated in place.
+    :param rows: Row indices (0..N-1), each appearing exactly once.
+    :param arms: Pulled arm of every row.
+    :param rewards: Received reward of every row.
+    """
+    # Each row is touched exactly once, so plain fancy indexing is safe here
+    total_rewards[rows, arms] += rewards
+    num_pulls[rows, arms] += 1
+
+
+def accumulate_batch(total_rewards, num_pulls, arms, rewards) :
+    """
+    Adds a batch of rewards of a single agent, in which the same arm may appear many times.
+    :param total_rewards: Total reward of every arm (length K), updated in place.
+    :param num_pulls: Number of pulls of every arm (length K), updated in place.
+    :param arms: Pulled arm of every event.
+    :param rewards: Received reward of every event.
+    """
+    num_arms = len(total_rewards)
+    if len(arms) * 8 >= num_arms :
+        # Large batches: one pass over the events and one over the arms
+        total_rewards += np.bincount(arms, weights=rewards, minlength=num_arms)
+        num_pulls += np.bincount(arms, minlength=num_arms)
+    else :
+        # Small batches against many arms: avoids allocating two arrays of length K
+        np.add.at(total_rewards, arms, rewards)
+        np.add.at(num_pulls, arms, 1)
+
+
+def window_statistics(window_arms, window_rewards, num_arms) :
+    """
+    Recomputes the statistics of a full sliding window from scratch.
+    :param window_arms: Ring buffer of the pulled arms, (W,) for one agent or (W x N) for a population.
+    :param window_rewards: Ring buffer of the received rewards, same shape.
+    :param num_arms: Number of arms K.
+    :return: Tuple (total rewards, number of pulls) of every arm within the window, (K,) or (N x K).
+
+    The sliding-window agents update their sums in O(1) per step by adding the new reward and subtracting
+    the evicted one; calling this once per pass over the window bounds the accumulated rounding error.
+    """
+    if window_arms.ndim == 1 :
+        return (np.bincount(window_arms, weights=window_rewards, minlength=num_arms),
+                np.bincount(window_arms, minlength=num_arms).astype(float))
+
+    num_agents = window_arms.shape[1]
+    cells = (window_arms + num_arms * np.arange(num_agents)).ravel()
+    shape = (num_agents, num_arms)
+    return (np.bincount(cells, weights=window_rewards.ravel(), minlength=num_agents * num_arms).reshape(shape),
+            np.bincount(cells, minlength=num_agents * num_arms).reshape(shape))
@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+from src.algorithm.agents import UCB1Agent, EpsilonGreedyAgent, ThompsonSamplingAgent, SlidingWindowUCBAgent, \
+    DiscountedUCBAgent
+from src.algorithm.batched_agents import BatchedUCB1Agent, BatchedEpsilonGreedyAgent, BatchedThompsonSamplingAgent, \
+    BatchedSlidingWindowUCBAgent, BatchedDiscountedUCBAgent
+
+# A strategy that can be run by the GUI, the vectorized engine, the sweeps and the benchmarks:
+# name - key of the strategy in results, run directories and command line options,
+# label - legend label and check button text in the GUI,
+# create_agent - function (no_arm, epsilon, rng=None) returning a single agent exposing select_arm() and
+#                update(arm, reward); randomized agents draw from rng when one is given,
+# create_batched_agent - function (num_agents, no_arm, epsilon, rng) returning a batched agent exposing
+#                        select_arms() and update(arms, rewards),
+# uses_epsilon - whether the results depend on epsilon; sweeps share the runs of the other strategies
+#                across every epsilon of the grid.
+Strategy = namedtuple('Strategy', ['name', 'label', 'create_agent', 'create_batched_agent', 'uses_epsilon'])
+
+# Registered strategies in registration order. The vectorized engine derives the RNG stream of a strategy
+# from its position in this order, so new strategies must be appended to keep earlier results reproducible.
+_strategies = {}
+
+
+def register_strategy(name, label, create_agent, create_batched_agent, uses_epsilon=False) :
+    """
+    Registers a strategy so that it shows up in the GUI, the engine and the benchmarks.
+    :return: The registered Strategy.
+    """
+    if name in _strategies :
+        raise ValueError(f"Strategy already registered: {name}")
+
+    strategy = Strategy(name, label, create_agent, create_batched_agent, uses_epsilon)
+    _strategies[name] = strategy
+    return strategy
+
+
+def get_strategy(name) :
+    """
+    :return: The Strategy registered under name.
+    """
+    try :
+        return _strategies[name]
+    except KeyError :
+        raise ValueError(f"Unknown strategy: {name}") from None
+
+
+def strategy_names() :
+    """
+    :return: Tuple of the names of the registered strategies, in registration order.
+    """
+    return tuple(_strategies)
+
+
+def strategy_index(name) :
+    """
+    :return: Position of the strategy in registration order.
+    """
+    get_strategy(name)
+    return strategy_names().index(name)
+
+
+register_strategy('ucb1', 'UCB1',
+                  lambda no_arm, epsilon, rng=None : UCB1Agent(no_arm),
+                  lambda num_agents, no_arm, epsilon, rng : BatchedUCB1Agent(num_agents, no_arm))
+
+register_strategy('epsilon_greedy', 'Epsilon-Greedy',
+                  lambda no_arm, epsilon, rng=None : EpsilonGreedyAgent(no_arm, eps=epsilon, rng=rng),
+                  lambda num_agents, no_arm, epsilon, rng : BatchedEpsilonGreedyAgent(num_agents, no_arm, epsilon,
+                                                                                      rng=rng),
+                  uses_epsilon=True)
+
+register_strategy('thompson_sampling', 'Thompson Sampling',
+                  lambda no_arm, epsilon, rng=None : ThompsonSamplingAgent(no_arm, rng=rng),
+                  lambda num_agents, no_arm, epsilon, rng : BatchedThompsonSamplingAgent(num_agents, no_arm, rng=rng))
+
+register_strategy('sliding_window_ucb', 'Sliding-Window UCB',
+                  lambda no_arm, epsilon, rng=None : SlidingWindowUCBAgent(no_arm),
+                  lambda num_agents, no_arm, epsilon, rng : BatchedSlidingWindowUCBAgent(num_agents, no_arm))
+
+register_strategy('discounted_ucb', 'Discounted UCB',
+                  lambda no_arm, epsilon, rng=None : DiscountedUCBAgent(no_arm),
+                  lambda num_agents, no_arm, epsilon, rng : BatchedDiscountedUCBAgent(num_agents, no_arm))
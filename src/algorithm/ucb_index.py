@@ -0,0 +1,109 @@
+import math
+
+from src.algorithm.kernels import PULL_OFFSET
+
+# Exploration slope of an arm that has never been pulled, sqrt(2 / (0 + 1e-6)), as in UCB1Agent
+UNPULLED_SLOPE = math.sqrt(2 / PULL_OFFSET)
+
+
+class UCBTournamentTree :
+    def __init__(self, no_arm) :
+        """
+        Kinetic tournament tree over the UCB1 values of all arms.
+        :param no_arm: Number of arms.
+
+        With s = sqrt(log t), the UCB1 value of an arm is a line in s:
+            mean + sqrt(2 log t / n) = mean + sqrt(2 / n) * s
+        and between two pulls of the arm neither the mean nor the slope change. Every internal node
+        stores the winner (highest value) of its two children at the current s, and the value of s at
+        which that winner can be overtaken, the certificate. Because s only grows, a node only has to be
+        recomputed when s passes one of the certificates below it, or when the arm of a leaf below it is
+        pulled. Selecting the best arm therefore costs O(log K) per step amortized instead of O(K).
+
+        Ties are broken in favour of the lowest arm index, like np.argmax. Values are compared as
+        mean + slope * s, which can differ in the last bits from the direct formula, so arms whose UCB
+        values are equal up to rounding may be ordered differently than by an exact scan.
+        """
+        if no_arm < 1 :
+            raise ValueError(f"Invalid number of arms: {no_arm}")
+
+        size = 1
+        while size < no_arm :
+            size *= 2
+        self.size = size
+
+        # Padding leaves can never win: their value is -inf for every s
+        self.means = [0.0] * no_arm + [-math.inf] * (size - no_arm)
+        self.slopes = [UNPULLED_SLOPE] * no_arm + [0.0] * (size - no_arm)
+
+        # Heap layout: node 1 is the root, the leaf of arm i is node size + i
+        self.winners = [0] * size + list(range(size))
+        self.certificates = [math.inf] * (2 * size)
+
+        self.s = 0.0
+        for node in range(size - 1, 0, -1) :
+            self._compute(node)
+
+    def _compute(self, node) :
+        """
+        Recomputes the winner and the certificate of an internal node from its children at the current s.
+        """
+        left = 2 * node
+        a = self.winners[left]
+        b = self.winners[left + 1]
+        means = self.means
+        slopes = self.slopes
+        s = self.s
+
+        # Arms of the left subtree have lower indices, so the left winner keeps ties
+        if means[b] + slopes[b] * s > means[a] + slopes[a] * s :
+            winner, loser = b, a
+        else :
+            winner, loser = a, b
+        self.winners[node] = winner
+
+        # The loser overtakes the winner at the s where their lines cross, if its slope is steeper
+        if slopes[loser] > slopes[winner] :
+            failure = (means[winner] - means[loser]) / (slopes[loser] - slopes[winner])
+        else :
+            failure = math.inf
+
+        certificates = self.certificates
+        certificates[node] = min(failure, certificates[left], certificates[left + 1])
+
+    def _refresh(self, node) :
+        # Leaves never expire and subtrees whose certificates are still valid are skipped
+        if node >= self.size or self.certificates[node] > self.s :
+            return
+        self._refresh(2 * node)
+        self._refresh(2 * node + 1)
+        self._compute(node)
+
+    def advance(self, s) :
+        """
+        Moves the tree to a new value of s = sqrt(log t), which must not decrease.
+        """
+        self.s = s
+        if self.certificates[1] <= s :
+            self._refresh(1)
+
+    def set_arm(self, arm, mean, slope) :
+        """
+        Updates the line of one arm after it was pulled and recomputes the path to the root.
+        :param arm: The pulled arm.
+        :param mean: Its new average reward.
+        :param slope: Its new exploration slope sqrt(2 / n).
+        """
+        self.means[arm] = mean
+        self.slopes[arm] = slope
+
+        node = (self.size + arm) // 2
+        while node :
+            self._compute(node)
+            node //= 2
+
+    def best(self) :
+        """
+        :return: The arm with the highest UCB value at the current s.
+        """
+        return self.winners[1]
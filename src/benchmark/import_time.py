@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark of the headless entry point.
+
+Usage (from the repository root):
+
+    python -m src.benchmark.import_time --budget-ms 250
+
+Imports the headless entry point (src.cli by default) in fresh interpreters and reports the best import
+time over several runs, measured from inside the interpreter so that the interpreter start-up itself is
+not counted. Exits with status 1 if the import takes longer than the budget, or if it pulls in any of the
+GUI-only modules (tkinter, matplotlib, mplcursors) or pandas. With --profile, the slowest modules of
+`python -X importtime` are listed as well.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULE = 'src.cli'
+DEFAULT_BUDGET_MS = 250.0
+DEFAULT_REPEATS = 5
+
+# Top-level modules that must never be imported by the headless path
+FORBIDDEN_MODULES = ('tkinter', 'matplotlib', 'mplcursors', 'pandas')
+
+# Executed in the child interpreter: times the import and lists the forbidden modules it loaded
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({forbidden!r}))
+print(json.dumps({{'seconds' : elapsed, 'forbidden' : loaded}}))
+'''
+
+# Repository root, so that `src` is importable whatever the working directory
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def measure_import(module=DEFAULT_MODULE, repeats=DEFAULT_REPEATS) :
+    """
+    Imports a module in `repeats` fresh interpreters.
+    :return: Tuple (best import time in seconds, sorted list of forbidden modules that were loaded).
+    """
+    code = _PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)
+    times = []
+    forbidden = set()
+    for _ in range(repeats) :
+        output = subprocess.run([sys.executable, '-c', code], cwd=_ROOT, check=True, capture_output=True,
+                                text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        forbidden.update(result['forbidden'])
+
+    return min(times), sorted(forbidden)
+
+
+def slowest_imports(module=DEFAULT_MODULE, count=15) :
+    """
+    :return: List of (cumulative microseconds, module name) of the slowest imports, from python -X importtime.
+    """
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=_ROOT, check=True,
+                            capture_output=True, text=True).stderr
+
+    entries = []
+    for line in stderr.splitlines() :
+        # Lines look like "import time:  self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit() :
+            continue
+        entries.append((int(parts[1]), parts[2].strip()))
+
+    return sorted(entries, reverse=True)[:count]
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Check the cold-start import time of the headless path.")
+    parser.add_argument('--module', default=DEFAULT_MODULE, help="Module to import.")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="Import time budget.")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Number of fresh interpreters.")
+    parser.add_argument('--profile', action='store_true', help="List the slowest imports.")
+    args = parser.parse_args(argv)
+
+    seconds, forbidden = measure_import(args.module, args.repeats)
+    print(f"import {args.module}: {seconds * 1e3:.1f} ms (best of {args.repeats}, budget {args.budget_ms:.0f} ms)")
+
+    if args.profile :
+        for cumulative, name in slowest_imports(args.module) :
+            print(f"{cumulative / 1e3:>10.1f} ms  {name}")
+
+    failed = False
+    if forbidden :
+        print(f"FAIL: importing {args.module} loads {', '.join(forbidden)}")
+        failed = True
+    if seconds * 1e3 > args.budget_ms :
+        print(f"FAIL: import time over budget by {seconds * 1e3 - args.budget_ms:.1f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__' :
+    main()
@@ -0,0 +1,260 @@
+"""
+Throughput benchmark for the agents and the bandit, with JSON baselines and regression detection.
+
+Usage (from the repository root):
+
+    python -m src.benchmark.throughput --output output/benchmarks/current.json
+    python -m src.benchmark.throughput --baseline output/benchmarks/baseline.json --tolerance 0.2
+
+Every case is run over a grid of arm counts and iteration counts and reports steps per second and
+per-step latency percentiles. With --baseline the results are compared against a previous run and the
+process exits with status 1 if any case got slower than the tolerance allows.
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from src.algorithm.agents import LargeArmUCB1Agent
+from src.algorithm.strategy_registry import get_strategy, strategy_names
+from src.load_logging_configuration import load_logging_config
+from src.model.batched_multi_armed_bandit import BatchedMultiArmedBandit
+from src.model.multi_armed_bandit import MultiArmedBandit
+
+DEFAULT_ARMS = (2, 10, 100, 1000, 10000, 100000)
+DEFAULT_ITERATIONS = (1000, 10000)
+DEFAULT_REPLICATIONS = 100
+DEFAULT_EPSILON = 0.1
+
+# Cells whose arms x iterations exceed this budget are skipped, so the default grid stays within minutes
+DEFAULT_MAX_ARM_STEPS = 10 ** 9
+
+LATENCY_PERCENTILES = (50, 90, 99)
+DEFAULT_REPEATS = 3
+
+
+def _time_steps(step, iterations) :
+    """
+    Times every call of step().
+    :return: Tuple (total seconds, per-step latencies in nanoseconds).
+    """
+    latencies = np.empty(iterations, dtype=np.int64)
+    clock = time.perf_counter_ns
+
+    start = clock()
+    for i in range(iterations) :
+        step_start = clock()
+        step()
+        latencies[i] = clock() - step_start
+    total = (clock() - start) / 1e9
+
+    return total, latencies
+
+
+def _bench_agent(create_agent) :
+    def bench(arms, iterations, replications) :
+        agent = create_agent(arms)
+        bandit = MultiArmedBandit(arms, reward_source='presampled', seed=0)
+
+        def step() :
+            arm = agent.select_arm()
+            agent.update(arm, bandit.pull_arm(arm))
+
+        return _time_steps(step, iterations)
+
+    return bench
+
+
+def _bench_pull_arm(reward_source) :
+    def bench(arms, iterations, replications) :
+        bandit = MultiArmedBandit(arms, reward_source=reward_source, seed=0)
+        pulled = np.random.default_rng(0).integers(0, arms, size=iterations).tolist()
+        position = iter(pulled)
+
+        return _time_steps(lambda : bandit.pull_arm(next(position)), iterations)
+
+    return bench
+
+
+def _bench_batched(create_agent) :
+    def bench(arms, iterations, replications) :
+        rng = np.random.default_rng(0)
+        agent = create_agent(replications, arms, rng)
+        bandit = BatchedMultiArmedBandit(replications, arms, rng=rng)
+
+        def step() :
+            selected = agent.select_arms()
+            agent.update(selected, bandit.pull_arms(selected))
+
+        return _time_steps(step, iterations)
+
+    return bench
+
+
+def _bench_update_batch(create_agent) :
+    def bench(arms, iterations, replications) :
+        # Every call ingests a batch of `replications` delayed feedback events
+        agent = create_agent(arms)
+        rng = np.random.default_rng(0)
+        pulled = rng.integers(0, arms, size=replications)
+        rewards = rng.normal(size=replications)
+
+        return _time_steps(lambda : agent.update_batch(pulled, rewards), iterations)
+
+    return bench
+
+
+# Benchmark cases: name -> (function(arms, iterations, replications), steps counted per call)
+# Batched cases advance every replication per call, so their throughput is counted in agent-steps;
+# the update_batch cases ingest `replications` feedback events per call and are counted in events.
+CASES = {
+    'large_arm_ucb1_agent' : (_bench_agent(LargeArmUCB1Agent), 'single'),
+    'pull_arm_normal' : (_bench_pull_arm('normal'), 'single'),
+    'pull_arm_presampled' : (_bench_pull_arm('presampled'), 'single'),
+    'pull_arm_common' : (_bench_pull_arm('common'), 'single'),
+}
+
+# Every registered strategy is benchmarked as a single agent, through update_batch and as a batched agent
+for _strategy in map(get_strategy, strategy_names()) :
+    _create_agent = functools.partial(lambda strategy, arms : strategy.create_agent(arms, DEFAULT_EPSILON), _strategy)
+    _create_batched_agent = functools.partial(lambda strategy, replications, arms, rng :
+                                              strategy.create_batched_agent(replications, arms, DEFAULT_EPSILON, rng),
+                                              _strategy)
+    CASES[f'{_strategy.name}_agent'] = (_bench_agent(_create_agent), 'single')
+    CASES[f'{_strategy.name}_update_batch'] = (_bench_update_batch(_create_agent), 'replications')
+    CASES[f'batched_{_strategy.name}'] = (_bench_batched(_create_batched_agent), 'replications')
+
+
+def run_benchmarks(cases, arms_grid, iterations_grid, replications=DEFAULT_REPLICATIONS,
+                   max_arm_steps=DEFAULT_MAX_ARM_STEPS, repeats=DEFAULT_REPEATS) :
+    """
+    Runs every case over the grid.
+    :param repeats: Number of times every cell is run; the fastest run is kept, which filters out
+                    most of the noise caused by other processes.
+    :return: List of result dictionaries.
+    """
+    logger = logging.getLogger('staging')
+    results = []
+
+    for case in cases :
+        function, unit = CASES[case]
+        for arms in arms_grid :
+            for iterations in iterations_grid :
+                work = arms * iterations * (replications if unit == 'replications' else 1)
+                if work > max_arm_steps :
+                    logger.warning(f"Skipping {case} with {arms} arms and {iterations} iterations")
+                    continue
+
+                total, latencies = min((function(arms, iterations, replications) for _ in range(repeats)),
+                                       key=lambda run : run[0])
+                steps = iterations * (replications if unit == 'replications' else 1)
+                percentiles = np.percentile(latencies, LATENCY_PERCENTILES) / 1e3
+
+                result = {
+                    'case' : case,
+                    'arms' : arms,
+                    'iterations' : iterations,
+                    'replications' : replications if unit == 'replications' else 1,
+                    'steps_per_second' : steps / total,
+                }
+                for level, value in zip(LATENCY_PERCENTILES, percentiles) :
+                    result[f'p{level}_us'] = float(value)
+                results.append(result)
+
+                print(f"{case:<24} arms={arms:<7} iterations={iterations:<7} "
+                      f"{result['steps_per_second']:>14,.0f} steps/s  p50={result['p50_us']:.1f}us  "
+                      f"p99={result['p99_us']:.1f}us")
+
+    return results
+
+
+def environment_info() :
+    return {
+        'python' : sys.version.split()[0],
+        'numpy' : np.__version__,
+        'platform' : platform.platform(),
+        'processor' : platform.processor(),
+    }
+
+
+def _case_key(entry) :
+    return entry['case'], entry['arms'], entry['iterations'], entry['replications']
+
+
+def compare_with_baseline(results, baseline, tolerance) :
+    """
+    Compares the throughput of every case with the baseline.
+    :param results: Current results.
+    :param baseline: Results of the baseline run.
+    :param tolerance: Allowed relative slowdown, e.g. 0.2 for 20%.
+    :return: List of (result, baseline result, relative change) for every regression.
+
+    Cases are matched on their replications too, since the steps per second of the batched cases depend on them.
+    """
+    reference = {_case_key(entry) : entry for entry in baseline}
+    regressions = []
+
+    for result in results :
+        previous = reference.get(_case_key(result))
+        if previous is None :
+            continue
+
+        change = result['steps_per_second'] / previous['steps_per_second'] - 1
+        if change < -tolerance :
+            regressions.append((result, previous, change))
+
+    return regressions
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Benchmark the throughput of the agents and of the bandit.")
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--arms', nargs='+', type=int, default=list(DEFAULT_ARMS))
+    parser.add_argument('--iterations', nargs='+', type=int, default=list(DEFAULT_ITERATIONS))
+    parser.add_argument('--replications', type=int, default=DEFAULT_REPLICATIONS,
+                        help="Replications of the batched cases.")
+    parser.add_argument('--max-arm-steps', type=float, default=DEFAULT_MAX_ARM_STEPS,
+                        help="Skip grid cells whose arms x steps exceed this budget.")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Runs per cell; the fastest is kept.")
+    parser.add_argument('--output', help="Write the results to this JSON file (usable as a baseline).")
+    parser.add_argument('--baseline', help="Compare against this JSON baseline.")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative slowdown.")
+    args = parser.parse_args(argv)
+
+    # Decision logs are sampled, but keep the console quiet while measuring. The configuration is
+    # loaded first, otherwise the first agent would load it and restore the INFO level.
+    load_logging_config()
+    logging.getLogger('staging').setLevel(logging.WARNING)
+
+    results = run_benchmarks(args.cases, args.arms, args.iterations, args.replications, args.max_arm_steps,
+                             args.repeats)
+
+    if args.output :
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as output_file :
+            json.dump({'environment' : environment_info(), 'results' : results}, output_file, indent=2)
+
+    if args.baseline :
+        with open(args.baseline, 'r') as baseline_file :
+            baseline = json.load(baseline_file)['results']
+
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for result, previous, change in regressions :
+            print(f"REGRESSION {result['case']} arms={result['arms']} iterations={result['iterations']}: "
+                  f"{previous['steps_per_second']:,.0f} -> {result['steps_per_second']:,.0f} steps/s "
+                  f"({change:+.1%})")
+        if regressions :
+            return 1
+        print(f"No regression beyond {args.tolerance:.0%} against {args.baseline}")
+
+    return 0
+
+
+if __name__ == '__main__' :
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Headless entry point: runs the simulation of one input file without the GUI.
+
+Usage (from the repository root):
+
+    python -m src.cli input/input1.txt --strategies ucb1 thompson_sampling --seed 42 --run-dir output/runs/cli
+
+It runs the same agents and the same loop as the GUI and prints the final metrics of every strategy.
+Only NumPy is imported (PyYAML once the logging configuration is loaded); tkinter and matplotlib are
+never imported on this path, see src/benchmark/import_time.py.
+"""
+import argparse
+import logging
+import time
+
+from src.algorithm.agents import LinUCBAgent
+from src.algorithm.strategy_registry import get_strategy, strategy_names
+from src.model.contextual_bandit import ContextualBandit
+from src.model.input_file import read_input_file
+from src.model.multi_armed_bandit import MultiArmedBandit, REWARD_SOURCES, DRIFT_MODES
+from src.model.results_store import ResultsWriter
+from src.simulation.metrics_recorder import MetricsRecorder
+from src.simulation.simulation_loop import run_simulation_loop
+
+
+def run(file_path, strategies=None, seed=None, reward_source='common', run_dir=None, drift='stationary',
+        drift_scale=0.01, change_interval=10000, context_dimension=None) :
+    """
+    Runs the simulation of one input file.
+    :param file_path: 3-line input file (arms, iterations, epsilon).
+    :param strategies: Names of the strategies to run (all registered strategies by default).
+    :param seed: Seed of the bandit.
+    :param reward_source: Reward source of the bandit, one of REWARD_SOURCES.
+    :param run_dir: Optional run directory the trajectories are written to, readable with "Open Run".
+    :param drift: Drift mode of the true means, one of DRIFT_MODES.
+    :param drift_scale: Standard deviation of the per-iteration steps of the 'random_walk' drift.
+    :param change_interval: Number of iterations between two changes of the 'piecewise' drift.
+    :param context_dimension: If given, the agents face a ContextualBandit with contexts of this dimension
+                              (the drift options are then ignored) and a LinUCBAgent runs next to the strategies.
+    :return: Dictionary mapping every strategy name to its MetricsRecorder.
+    """
+    no_arms, num_iterations, epsilon = read_input_file(file_path)
+
+    agents = {name : get_strategy(name).create_agent(no_arms, epsilon) for name in strategies or strategy_names()}
+    if context_dimension is None :
+        bandit = MultiArmedBandit(no_arms, reward_source=reward_source, seed=seed, drift=drift,
+                                  drift_scale=drift_scale, change_interval=change_interval)
+    else :
+        bandit = ContextualBandit(no_arms, context_dimension, seed=seed)
+        agents['linucb'] = LinUCBAgent(no_arms, context_dimension)
+    recorders = {name : MetricsRecorder(num_iterations, bandit.true_means) for name in agents}
+
+    results_writer = None
+    if run_dir is not None :
+        results_writer = ResultsWriter(run_dir, agents, num_iterations,
+                                       metadata={'input_file' : file_path, 'no_arms' : no_arms, 'epsilon' : epsilon,
+                                                 'seed' : seed, 'reward_source' : reward_source, 'drift' : drift,
+                                                 'drift_scale' : drift_scale, 'change_interval' : change_interval,
+                                                 'context_dimension' : context_dimension})
+
+    completed = run_simulation_loop(bandit, agents, recorders, num_iterations, results_writer=results_writer)
+    if results_writer is not None :
+        results_writer.close(completed)
+
+    return recorders
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Run the bandit simulation of one input file without the GUI.")
+    parser.add_argument('input_file', help="3-line input file (arms, iterations, epsilon).")
+    parser.add_argument('--strategies', nargs='+', default=None, choices=strategy_names(),
+                        help="Strategies to run (default: all registered).")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the bandit.")
+    parser.add_argument('--reward-source', default='common', choices=REWARD_SOURCES, help="Reward noise source.")
+    parser.add_argument('--run-dir', default=None, help="Write the trajectories to this run directory.")
+    parser.add_argument('--drift', default='stationary', choices=DRIFT_MODES, help="Drift of the true means.")
+    parser.add_argument('--drift-scale', type=float, default=0.01,
+                        help="Per-iteration standard deviation of the 'random_walk' drift.")
+    parser.add_argument('--change-interval', type=int, default=10000,
+                        help="Iterations between two changes of the 'piecewise' drift.")
+    parser.add_argument('--context-dimension', type=int, default=None,
+                        help="Run against a contextual bandit with contexts of this dimension, adding LinUCB.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    start_time = time.perf_counter()
+    recorders = run(args.input_file, args.strategies, args.seed, args.reward_source, args.run_dir, args.drift,
+                    args.drift_scale, args.change_interval, args.context_dimension)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{'strategy':<20}{'average estimate':>18}{'average reward':>16}{'regret':>12}{'optimal arm':>13}")
+    for name, recorder in recorders.items() :
+        last = recorder.step - 1
+        print(f"{name:<20}{recorder.average_estimate[last]:>18.4f}{recorder.average_reward[last]:>16.4f}"
+              f"{recorder.cumulative_regret[last]:>12.2f}{recorder.optimal_arm_rate[last]:>13.1%}")
+    print(f"{recorders[next(iter(recorders))].step} iterations in {elapsed:.2f} seconds")
+
+
+if __name__ == '__main__' :
+    main()
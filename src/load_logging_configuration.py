@@ -1,16 +1,58 @@
+import atexit
 import logging.config
-import yaml
+import logging.handlers
+import os
+import queue
+import sys
 
+# Per-step decision logs of the agents and of the simulation loop are only emitted every N steps
+DEFAULT_LOG_INTERVAL = 1000
+
+# Candidate locations of the configuration file, resolved independently of the working directory: the
+# parent of the executable's directory (dist/logging_config.yml for dist/multi_arm_agent) when running the frozen
+# executable, the repository root otherwise, and finally the parent of the working directory
+CONFIG_PATHS = tuple(
+    ([os.path.join(os.path.dirname(sys.executable), '..', 'logging_config.yml')] if getattr(sys, 'frozen', False)
+     else [os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logging_config.yml')])
+    + ['../logging_config.yml'])
+
+# The configuration is applied once per process; later calls are no-ops
+_configured = False
+
+# Background listeners that write the queued records to the configured handlers
+_listeners = []
+
+
+def load_logging_config(use_queue=True) :
+    """
+    Loads logging_config.yml once per process.
+    :param use_queue: When True, every configured logger hands its records to a QueueHandler and a
+                      background QueueListener writes them to the original handlers, so logging calls
+                      on the simulation path never wait for the console or the log file.
+    """
+    global _configured
+
+    if _configured :
+        return
+
+    # PyYAML is only needed here, so importing the package does not pay for it
+    import yaml
 
-def load_logging_config() :
     try :
-        # Load the configuration from the YAML file
-        with open('../logging_config.yml', 'r') as config_file :
+        # Load the configuration from the first YAML file found
+        config_path = next((path for path in CONFIG_PATHS if os.path.isfile(path)), CONFIG_PATHS[0])
+        with open(config_path, 'r') as config_file :
             # Read and parse the YAML configuration
             config = yaml.safe_load(config_file.read())
             # Configure the logging using the dictionary-based configuration
             logging.config.dictConfig(config)
 
+        if use_queue :
+            logger_names = [''] + list(config.get('loggers', {}))
+            _start_queue_listeners([logging.getLogger(name) for name in logger_names])
+
+        _configured = True
+
     except FileNotFoundError as e :
         # Handle the case when the configuration file is not found
         raise RuntimeError("Error: Logging configuration file not found:", e)
@@ -20,3 +62,38 @@ def load_logging_config() :
     except Exception as e :
         # Handle other exceptions that might occur during configuration loading
         raise RuntimeError("An error occurred during logging configuration:", e)
+
+
+def _start_queue_listeners(loggers) :
+    """
+    Moves the handlers of each logger behind a queue served by a background thread.
+    :param loggers: Loggers whose handlers are moved.
+
+    Each logger gets its own queue and listener, so records keep going only to the handlers
+    that logging_config.yml assigns to that logger.
+    """
+    for logger in loggers :
+        handlers = list(logger.handlers)
+        if not handlers :
+            continue
+
+        record_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(record_queue, *handlers, respect_handler_level=True)
+
+        for handler in handlers :
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(record_queue))
+
+        listener.start()
+        _listeners.append(listener)
+
+    if _listeners :
+        atexit.register(stop_logging_listeners)
+
+
+def stop_logging_listeners() :
+    """
+    Flushes the queued records and stops the background listeners.
+    """
+    while _listeners :
+        _listeners.pop().stop()
@@ -1,10 +1,12 @@
-from tkinter import Tk
 import logging
 
-from src.model.gui.bandit_simulation_gui import BanditSimulationGUI
-
 
 def main_driver() :
+    # The GUI stack (tkinter, and matplotlib once a plot is drawn) is only imported when the GUI starts;
+    # the headless entry point is src/cli.py
+    from tkinter import Tk
+    from src.model.gui.bandit_simulation_gui import BanditSimulationGUI
+
     root = Tk()
     app = BanditSimulationGUI(root)
     root.geometry("670x600")
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+# This class holds R independent copies of a MultiArmedBandit in a single (R x K) array of true means,
+# so that one reward can be sampled for every replication with a single vectorized call.
+class BatchedMultiArmedBandit :
+    def __init__(self, num_replications, no_arm, rng=None, true_means=None) :
+        """
+            Initializes R independent bandits with the given number of arms.
+
+            :param num_replications: Number of independent replications (rows).
+            :param no_arm: Number of arms in each bandit.
+            :param rng: np.random.Generator used to draw the true means and the reward noise.
+            :param true_means: Optional (R x K) array of true means. Pass the true_means of another
+                               BatchedMultiArmedBandit to let several agents face the same bandits
+                               while sampling their reward noise from their own stream.
+        """
+        self.num_replications = num_replications
+        self.num_arms = no_arm
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        if true_means is None :
+            # Same distribution as MultiArmedBandit: every mean is drawn from N(0, 1)
+            true_means = self.rng.normal(0, 1, (num_replications, no_arm))
+        elif true_means.shape != (num_replications, no_arm) :
+            raise ValueError(f"true_means must have shape {(num_replications, no_arm)}, got {true_means.shape}")
+        self.true_means = true_means
+
+        # Row indices reused for fancy indexing on every pull
+        self._rows = np.arange(num_replications)
+
+    def pull_arms(self, arms) :
+        """
+            Pulls one arm in every replication and samples the rewards.
+
+            :param arms: Array of shape (R,) with the arm to pull in each replication.
+            :return: Array of shape (R,) with rewards drawn from N(true_means[r, arms[r]], 1).
+        """
+        return self.true_means[self._rows, arms] + self.rng.standard_normal(self.num_replications)
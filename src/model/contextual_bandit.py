@@ -0,0 +1,83 @@
+import logging
+
+import numpy as np
+
+
+# This class simulates a contextual bandit with linear rewards: every iteration reveals a context vector x,
+# and pulling arm a returns theta[a] . x plus standard normal noise.
+class ContextualBandit :
+    # The expected rewards change with every context, so the simulation loop advances the bandit after
+    # every iteration and hands the new best arm to the recorders
+    stationary = False
+
+    def __init__(self, no_arm, dimension, seed=None) :
+        """
+            Initializes the bandit with a given number of arms and context dimension.
+
+            :param no_arm: Number of arms in the bandit.
+            :param dimension: Dimension d of the contexts.
+            :param seed: Seed of the np.random.Generator used for the arm parameters, the contexts and the noise.
+
+            The parameters theta[a] are drawn from N(0, I / d) and the contexts from N(0, I), so that the
+            expected reward theta[a] . x of an arm is N(0, 1) distributed, like the true means of MultiArmedBandit.
+        """
+        try :
+            if no_arm < 1 or dimension < 1 :
+                raise ValueError(f"Invalid bandit size: {no_arm} arms, dimension {dimension}")
+
+            self.num_arms = no_arm
+            self.dimension = dimension
+            self.rng = np.random.default_rng(seed)
+
+            # (K x d) parameters of the arms
+            self.theta = self.rng.normal(0, 1 / np.sqrt(dimension), (no_arm, dimension))
+
+            # Current context, expected reward of every arm for it and best arm, updated in place by advance()
+            self.context = np.empty(dimension)
+            self.true_means = np.empty(no_arm)
+            self._noise = np.empty(no_arm)
+            self.iteration = 0
+            self._draw_context()
+        except Exception as e :
+            logging.error(f"Error during ContextualBandit initialization due to: {str(e)}")
+            raise e
+
+    def _draw_context(self) :
+        """
+            Draws the context of the current iteration, the expected rewards of the arms for it with the best
+            of them, and the noise of every arm. The noise is drawn once per iteration, so every agent pulling the same arm in the same
+            iteration receives the same reward (common random numbers).
+        """
+        self.context[:] = self.rng.standard_normal(self.dimension)
+        np.dot(self.theta, self.context, out=self.true_means)
+        self.best_arm = int(self.true_means.argmax())
+        self.best_mean = float(self.true_means[self.best_arm])
+        self._noise[:] = self.rng.standard_normal(self.num_arms)
+
+    def advance(self) :
+        """
+            Moves the bandit to the next iteration, with a new context.
+
+            :return: True, since the expected rewards change with every context.
+        """
+        self.iteration += 1
+        self._draw_context()
+        return True
+
+    def pull_arm(self, arm, stream=0) :
+        """
+            Pulls an arm for the current context.
+
+            :param arm: The arm to be pulled.
+            :param stream: Identifier of the consumer pulling the arm, accepted for compatibility with
+                           MultiArmedBandit; every stream sees the same noise within an iteration.
+            :return: The sampled reward.
+        """
+        try :
+            if arm < 0 or arm >= self.num_arms :
+                raise ValueError(f"Invalid arm index: {arm}")
+
+            return self.true_means[arm] + self._noise[arm]
+        except Exception as e :
+            logging.error(f"Error during arm pulling due to: {str(e)}")
+            raise e
@@ -1,21 +1,36 @@
 import logging
 
-import mplcursors
 import numpy as np
-import matplotlib.pyplot as plt
-from tkinter import Label, Button, Entry, filedialog, messagebox
+from tkinter import Label, Button, Entry, Checkbutton, Frame, BooleanVar, filedialog, messagebox
 
-import pandas as pd
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
+import queue
 
 
 from tkinter import Menu
 import time
 
-from src.algorithm.agents import UCB1Agent, EpsilonGreedyAgent
+from src.algorithm.strategy_registry import get_strategy, strategy_names
 from src.load_logging_configuration import load_logging_config
+from src.model.gui.decimation import min_max_decimate
+from src.model.gui.simulation_worker import SimulationWorker
+from src.model.input_file import read_input_file
 from src.model.multi_armed_bandit import MultiArmedBandit
+from src.model.results_store import ResultsWriter, ResultsReader
+from src.simulation.metrics_recorder import MetricsRecorder
+from src.simulation.profiler import PhaseProfiler
+
+# Milliseconds between two polls of the worker queue
+POLL_INTERVAL_MS = 50
+
+# Approximate number of progress messages streamed by the worker during a run
+PROGRESS_UPDATES = 200
+
+# One iteration out of this many is profiled phase by phase (see src.simulation.profiler); 0 disables profiling
+PROFILE_SAMPLE_INTERVAL = 0
+
+# Directory receiving saved plots and run directories
+OUTPUT_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), '../../../output')
 
 
 class BanditSimulationGUI :
@@ -30,7 +45,20 @@ class BanditSimulationGUI :
         self.epsilon = None
         self.num_iterations = None
         self.iteration_time = None
-        self.execution_times = []
+
+        # Metrics recorders of the last run, keyed by agent name
+        self.metrics_recorders = {}
+
+        # Background worker of the running simulation and the state of its streamed plot
+        self.worker = None
+        self.file_menu = None
+        self.curves = {}
+        self.lines = {}
+        self.line_indices = {}
+        self.num_points = 0
+        self.data_low = np.inf
+        self.data_high = -np.inf
+        self.background = None
 
         """
         Initializes the BanditSimulationGUI.
@@ -57,15 +85,47 @@ class BanditSimulationGUI :
         self.button_browse = Button(root, text="Browse", command=self.browse_file)
         self.button_browse.grid(row=0, column=2, pady=5, sticky='w')
 
+        # Menu bar with the "File" menu
+        self.create_menu()
+
+        # One check button per registered strategy, selecting the agents compared by the next run
+        self.strategy_frame = Frame(root)
+        self.strategy_frame.grid(row=1, column=0, pady=10, sticky='e')
+        self.strategy_vars = {}
+        for name in strategy_names() :
+            self.strategy_vars[name] = BooleanVar(value=True)
+            Checkbutton(self.strategy_frame, text=get_strategy(name).label,
+                        variable=self.strategy_vars[name]).pack(side='left')
+
         # Button to run the simulation
         self.button_run_simulation = Button(root, text="Run Simulation", command=self.run_simulation)
         self.button_run_simulation.grid(row=1, column=1, pady=10)
 
-        # Figure and canvas for the plot
-        self.figure, self.ax = plt.subplots()
-        self.canvas = FigureCanvasTkAgg(self.figure, master=root)
+        # Button to cancel the running simulation
+        self.button_cancel_simulation = Button(root, text="Cancel", command=self.cancel_simulation,
+                                               state='disabled')
+        self.button_cancel_simulation.grid(row=1, column=2, pady=10, sticky='w')
+
+        # Figure and canvas for the plot, created with the first plot so that the window opens
+        # without loading matplotlib
+        self.figure = None
+        self.ax = None
+        self.canvas = None
+        self.canvas_widget = None
+
+    def create_canvas(self) :
+        """
+        Imports matplotlib and creates the figure and its Tk canvas, on first use.
+        """
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure()
+        self.ax = self.figure.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.root)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.grid(row=2, column=0, columnspan=3, padx=10, pady=10, sticky='nsew')
+        self.canvas.mpl_connect('draw_event', self.on_draw)
 
     def browse_file(self) :
         """
@@ -92,113 +152,306 @@ class BanditSimulationGUI :
         Runs the bandit simulation based on the provided data file.
 
         Reads the number of arms, total iterations, and epsilon from the data file,
-        creates a multi-armed bandit and agents, simulates iterations, and plots the results.
+        creates a multi-armed bandit and agents, and hands the simulation to a background worker.
+        The plot is updated while the worker streams its progress, see poll_simulation.
         """
         try :
+            if self.worker is not None and self.worker.is_alive() :
+                raise RuntimeError("A simulation is already running.")
+
             # Get the file path from the entry field
             file_path = self.entry_path.get()
 
-            # Check if the file has a '.txt' extension
-            if not file_path.lower().endswith('.txt') :
-                raise ValueError("Invalid file format. Please select a '.txt' file.")
+            # Read the number of arms, total iterations, and epsilon from the data file
+            self.no_arms, self.num_iterations, self.epsilon = read_input_file(file_path)
             self.logger.info("Running bandit simulation based on the provided data file.")
 
-            # Create a menu bar
-            menubar = Menu(self.root)
-            self.root.config(menu=menubar)
+            # Create a fresh menu bar
+            self.create_menu()
 
-            # Add a "File" menu
-            file_menu = Menu(menubar, tearoff=0)
-            menubar.add_cascade(label="File", menu=file_menu)
+            # Create the multi-armed bandit. With common random numbers all agents see the same noise
+            # for the same (arm, pull count), so the plotted difference between them is less noisy
+            seed = np.random.SeedSequence().entropy
+            bandit = MultiArmedBandit(self.no_arms, reward_source='common', seed=seed)
 
-            # Read the number of arms, total iterations, and epsilon from the data file
-            with open(file_path, 'r') as file :
-                # Verify and parse the structure of the file
-                try :
-                    self.no_arms = int(file.readline().strip())
-                    self.num_iterations = int(file.readline().strip())
-                    self.epsilon = float(file.readline().strip())
-                except ValueError as ve :
-                    raise ValueError("Invalid file structure. Please make sure the file contains valid data.") from ve
-
-            # Create the multi-armed bandit
-            bandit = MultiArmedBandit(self.no_arms)
-
-            # Create the agents
-            ucb1_agent = UCB1Agent(self.no_arms)
-            epsilon_greedy_agent = EpsilonGreedyAgent(self.no_arms, eps=self.epsilon)
-
-            # Lists to store average rewards
-            avg_rewards_ucb1 = []
-            avg_rewards_epsilon_greedy = []
+            # Create one agent per selected strategy
+            selected = [name for name in strategy_names() if self.strategy_vars[name].get()]
+            if not selected :
+                raise ValueError("Select at least one strategy.")
+            agents = {name : get_strategy(name).create_agent(self.no_arms, self.epsilon) for name in selected}
+
+            # Recorders with trajectory buffers preallocated for the whole run
+            self.metrics_recorders = {name : MetricsRecorder(self.num_iterations, bandit.true_means)
+                                      for name in agents}
 
             self.logger.info(f"Number of arms: {self.no_arms}")
             self.logger.info(f"Number of iterations: {self.num_iterations}")
             self.logger.info(f"Epsilon value: {self.epsilon}\n")
 
-            start_time_iteration = time.time()
-            # Simulate iterations
-            for i in range(self.num_iterations) :
-                # Select arms for each agent
-                arm_ucb1 = ucb1_agent.select_arm()
-                arm_epsilon_greedy = epsilon_greedy_agent.select_arm()
+            self.prepare_plot(agents)
 
-                # Simulate pulling arms and obtaining rewards
-                reward_ucb1 = bandit.pull_arm(arm_ucb1)
-                reward_epsilon_greedy = bandit.pull_arm(arm_epsilon_greedy)
+            # Trajectories are streamed to a run directory that can be reopened later with "Open Run"
+            timestamp = time.strftime("%Y.%m.%d_%H.%M.%S")
+            results_writer = ResultsWriter(os.path.join(OUTPUT_DIR, 'runs', f'Run_{timestamp}'), agents,
+                                           self.num_iterations,
+                                           metadata={'input_file' : file_path, 'no_arms' : self.no_arms,
+                                                     'epsilon' : self.epsilon, 'seed' : seed,
+                                                     'reward_source' : bandit.reward_source})
+
+            # Simulate the iterations on a background thread so the window stays responsive
+            self.worker = SimulationWorker(bandit, agents, self.metrics_recorders, self.num_iterations,
+                                           progress_interval=max(1, self.num_iterations // PROGRESS_UPDATES),
+                                           results_writer=results_writer,
+                                           profiler=PhaseProfiler(PROFILE_SAMPLE_INTERVAL)
+                                           if PROFILE_SAMPLE_INTERVAL else None)
+            self.worker.start()
+
+            self.button_run_simulation.config(state='disabled')
+            self.button_cancel_simulation.config(state='normal')
+            self.root.after(POLL_INTERVAL_MS, self.poll_simulation)
 
-                # Update agents with obtained rewards
-                ucb1_agent.update(arm_ucb1, reward_ucb1)
-                epsilon_greedy_agent.update(arm_epsilon_greedy, reward_epsilon_greedy)
+        except Exception as e :
+            error_message = f"An error occurred during the simulation due to: {str(e)}"
+            self.logger.error(error_message)
+            # Display an error box
+            messagebox.showerror("Error", error_message)
+
+    def create_menu(self) :
+        """
+        Creates the menu bar with a "File" menu holding the "Open Run" option.
+        """
+        menubar = Menu(self.root)
+        self.root.config(menu=menubar)
 
-                # Calculate average rewards and add them to the list
-                avg_rewards_ucb1.append(np.mean(ucb1_agent.total_rewards / (ucb1_agent.num_pulls + 1e-6)))
-                avg_rewards_epsilon_greedy.append(
-                    np.mean(epsilon_greedy_agent.total_rewards / (epsilon_greedy_agent.num_pulls + 1e-6)))
+        self.file_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="File", menu=self.file_menu)
+        self.file_menu.add_command(label="Open Run", command=self.open_run)
 
-                end_time = time.time()
+    def open_run(self) :
+        """
+        Reopens a run saved in a run directory and plots its average reward curves.
+        The columns are memory-mapped, so only the parts needed for the plot are read from disk.
+        """
+        try :
+            if self.worker is not None and self.worker.is_alive() :
+                raise RuntimeError("A simulation is already running.")
 
-                # Calculate and log the iteration time
-                iteration_time = end_time - start_time_iteration
-                self.execution_times.append(iteration_time)
-                self.logger.info(f"Iteration {i + 1} took {iteration_time:.6f} seconds")
+            run_dir = filedialog.askdirectory(initialdir=os.path.join(OUTPUT_DIR, 'runs'))
+            if not run_dir :
+                return
 
-            # Adjust the length of the lists to reflect the total number of iterations
-            total_iterations = self.num_iterations * self.no_arms
-            avg_rewards_ucb1 = avg_rewards_ucb1[:total_iterations]
-            avg_rewards_epsilon_greedy = avg_rewards_epsilon_greedy[:total_iterations]
+            reader = ResultsReader(run_dir)
+            metadata = reader.metadata
+            self.no_arms = metadata.get('no_arms')
+            self.epsilon = metadata.get('epsilon')
+            self.num_iterations = metadata['num_iterations']
+            self.logger.info(f"Opened run: {run_dir}")
 
-            # Clear the axis before adding new lines
-            self.ax.clear()
+            self.create_menu()
+            self.prepare_plot(reader.agent_names)
 
-            line_ucb1, = self.ax.plot(avg_rewards_ucb1, label='UCB1')
-            line_epsilon_greedy, = self.ax.plot(avg_rewards_epsilon_greedy, label='Epsilon-Greedy')
+            self.curves = {name : reader.column(name, 'running_mean') for name in reader.agent_names}
+            self.num_points = reader.num_steps
+            for values in self.curves.values() :
+                if len(values) :
+                    self.data_low = min(self.data_low, values.min())
+                    self.data_high = max(self.data_high, values.max())
 
-            # Set the labels for X and Y axes
-            self.ax.set_xlabel('Iterations')
-            self.ax.set_ylabel('Average Reward')
+            self.update_lines()
+            self.finish_simulation()
 
-            # Set the legend to show labels for each line
-            self.ax.legend()
+        except Exception as e :
+            error_message = f"An error occurred while opening the run due to: {str(e)}"
+            self.logger.error(error_message)
+            # Display an error box
+            messagebox.showerror("Error", error_message)
+
+    def prepare_plot(self, agents) :
+        """
+        Clears the axis and creates one empty, animated line per agent, ready to be filled incrementally.
+        :param agents: Names of the agents of the run (a dictionary keyed by name works too).
+        """
+        if self.canvas is None :
+            self.create_canvas()
+
+        # Clear the axis before adding new lines
+        self.ax.clear()
+
+        self.curves = {name : np.zeros(self.num_iterations) for name in agents}
+        self.num_points = 0
+        self.data_low = np.inf
+        self.data_high = -np.inf
+        self.lines = {}
+        self.line_indices = {}
+        for name in agents :
+            # Animated lines are left out of full redraws and drawn on top of the cached background (blitting)
+            self.lines[name], = self.ax.plot([], [], label=self.agent_label(name), animated=True)
+
+        # The x-range is known up front, so only the y-range can require a full redraw
+        self.ax.set_xlim(0, self.num_iterations)
+        self.ax.set_ylim(-1, 1)
 
-            # Add interactive data cursors to the plot
-            mplcursors.cursor(hover=True).connect("add", lambda selection : self.show_cursor_data(selection, line_ucb1,
-                                                                                                  line_epsilon_greedy))
+        # Set the labels for X and Y axes
+        self.ax.set_xlabel('Iterations')
+        self.ax.set_ylabel('Average Reward')
 
-            # Refresh the canvas
+        # Set the legend to show labels for each line
+        self.ax.legend()
+
+        # Clearing the axis drops its callbacks, so zoom/pan tracking is connected again for every run
+        self.ax.callbacks.connect('xlim_changed', self.on_xlim_changed)
+
+        # Full draw, which also caches the background through on_draw
+        self.canvas.draw()
+
+    @staticmethod
+    def agent_label(name) :
+        """
+        :return: Legend label of an agent: the label of its registered strategy, or its name for runs
+                 saved with agents that are not registered strategies (e.g. 'linucb' of a contextual run).
+        """
+        try :
+            return get_strategy(name).label
+        except ValueError :
+            return name
+
+    def on_draw(self, event) :
+        """
+        Caches the static background after every full redraw (including window resizes) and draws
+        the animated lines on top of it.
+        """
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.lines.values() :
+            if line.get_animated() :
+                self.ax.draw_artist(line)
+
+    def poll_simulation(self) :
+        """
+        Drains the messages of the worker, updates the lines with the new data and reschedules itself
+        with root.after until the worker reports that it is done.
+        """
+        finished = False
+        received = False
+        error_message = None
+
+        try :
+            while True :
+                message = self.worker.messages.get_nowait()
+                if message[0] == 'progress' :
+                    _, start, stop, curves = message
+                    for name, values in curves.items() :
+                        self.curves[name][start:stop] = values
+                        # Track the y-range incrementally, so the full curves never need to be scanned
+                        if len(values) :
+                            self.data_low = min(self.data_low, values.min())
+                            self.data_high = max(self.data_high, values.max())
+                    self.num_points = stop
+                    received = True
+                elif message[0] == 'done' :
+                    finished = True
+                    self.logger.info(f"Simulation finished after {message[1]} iterations")
+                else :
+                    finished = True
+                    error_message = message[1]
+        except queue.Empty :
+            pass
+
+        try :
+            if received :
+                self.update_lines()
+        except Exception as e :
+            self.logger.error(f"An error occurred while updating the plot due to: {str(e)}")
+
+        if finished :
+            self.finish_simulation(error_message)
+        else :
+            self.root.after(POLL_INTERVAL_MS, self.poll_simulation)
+
+    def update_lines(self) :
+        """
+        Redraws the lines with blitting: only the lines are redrawn on top of the cached background,
+        unless the data left the current y-range, in which case the axis is rescaled with a full redraw.
+        """
+        if self.num_points == 0 :
+            return
+
+        self.decimate_lines()
+
+        low, high = self.ax.get_ylim()
+        if self.data_low < low or self.data_high > high :
+            margin = 0.1 * max(self.data_high - self.data_low, 1e-3)
+            self.ax.set_ylim(min(low, self.data_low - margin), max(high, self.data_high + margin))
             self.canvas.draw()
+        else :
+            self.canvas.restore_region(self.background)
+            for line in self.lines.values() :
+                self.ax.draw_artist(line)
+            self.canvas.blit(self.ax.bbox)
 
-            # Add the "Save Plot" option to the menu
-            file_menu.add_command(label="Save Plot", command=self.save_plot)
+    def decimate_lines(self) :
+        """
+        Sets the data of every line to a min/max decimation of the visible part of its full-resolution
+        curve, with one bucket per horizontal pixel of the axis. The kept iteration indices are stored
+        in line_indices so hovering can map a point of a line back to its iteration.
+        """
+        x_min, x_max = self.ax.get_xlim()
+        num_buckets = max(1, int(self.ax.bbox.width))
 
+        for name, line in self.lines.items() :
+            indices = min_max_decimate(self.curves[name], np.floor(x_min), min(self.num_points, np.ceil(x_max) + 1),
+                                       num_buckets)
+            self.line_indices[name] = indices
+            line.set_data(indices, self.curves[name][indices])
 
+    def on_xlim_changed(self, ax) :
+        """
+        Re-decimates the lines from the full-resolution data after a zoom or a pan.
+        """
+        try :
+            if self.num_points > 0 :
+                self.decimate_lines()
+                self.canvas.draw_idle()
         except Exception as e :
-            error_message = f"An error occurred during the simulation due to: {str(e)}"
+            self.logger.error(f"An error occurred while updating the plot due to: {str(e)}")
+
+    def cancel_simulation(self) :
+        """
+        Stops the running simulation; the iterations completed so far stay on the plot.
+        """
+        if self.worker is not None and self.worker.is_alive() :
+            self.logger.info("Cancelling the running simulation.")
+            self.worker.cancel()
+            self.button_cancel_simulation.config(state='disabled')
+
+    def finish_simulation(self, error_message=None) :
+        """
+        Turns the streamed lines into regular ones, enables hovering and saving, and resets the buttons.
+        :param error_message: Error reported by the worker, if any.
+        """
+        self.button_run_simulation.config(state='normal')
+        self.button_cancel_simulation.config(state='disabled')
+
+        if error_message is not None :
+            error_message = f"An error occurred during the simulation due to: {error_message}"
             self.logger.error(error_message)
             # Display an error box
             messagebox.showerror("Error", error_message)
+            return
+
+        for line in self.lines.values() :
+            line.set_animated(False)
+
+        # Add interactive data cursors to the plot
+        import mplcursors
+        mplcursors.cursor(self.ax, hover=True).connect("add", self.show_cursor_data)
+
+        # Refresh the canvas
+        self.canvas.draw()
+
+        # Add the "Save Plot" option to the menu
+        self.file_menu.add_command(label="Save Plot", command=self.save_plot)
 
-    def show_cursor_data(self, sel, line_ucb1, line_epsilon_greedy) :
+    def show_cursor_data(self, sel) :
         """
         Display additional information on the plot when hovering over data points.
         """
@@ -206,7 +459,13 @@ class BanditSimulationGUI :
             # Clear previous hover labels
             self.clear_hover_labels()
 
+            # The lines only hold a decimated subset of the points, so the position on the line
+            # is mapped back to the iteration index in the full series
             index = sel.target.index
+            for name, line in self.lines.items() :
+                if line is sel.artist and name in self.line_indices :
+                    index = int(self.line_indices[name][int(round(index))])
+                    break
 
             # Calculate the arm, iteration number, and epsilon based on the index
             arm = index % self.no_arms
@@ -254,7 +513,7 @@ class BanditSimulationGUI :
     def save_plot(self) :
         try :
             # Save the plot to an output directory
-            output_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), '../../../output')
+            output_dir = OUTPUT_DIR
             if not os.path.exists(output_dir) :
                 os.makedirs(output_dir)
 
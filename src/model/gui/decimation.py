@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def min_max_decimate(values, start, stop, num_buckets) :
+    """
+    Selects a shape-preserving subset of a series for plotting.
+    :param values: Full-resolution 1-D array.
+    :param start: First index of the visible range.
+    :param stop: End (exclusive) of the visible range.
+    :param num_buckets: Number of buckets, typically the width of the axis in pixels.
+    :return: Sorted array of indices into values.
+
+    The visible range is split into num_buckets buckets of equal size and the positions of the
+    minimum and the maximum of every bucket are kept, together with the first and last point.
+    At one bucket per pixel the rendered line is visually identical to the full series, while
+    the number of points depends only on the width of the axis and not on the length of the data.
+    """
+    start = max(0, int(start))
+    stop = min(len(values), int(stop))
+    num_buckets = max(1, int(num_buckets))
+
+    count = stop - start
+    if count <= 0 :
+        return np.empty(0, dtype=np.int64)
+
+    # Nothing to gain when the range already has no more than two points per bucket
+    if count <= 2 * num_buckets :
+        return np.arange(start, stop)
+
+    bucket_size = -(-count // num_buckets)
+    num_full = count // bucket_size
+    full_stop = start + num_full * bucket_size
+
+    buckets = values[start:full_stop].reshape(num_full, bucket_size)
+    offsets = start + np.arange(num_full) * bucket_size
+    selected = [offsets + buckets.argmin(axis=1), offsets + buckets.argmax(axis=1), [start, stop - 1]]
+
+    # Last, partially filled bucket
+    if full_stop < stop :
+        tail = values[full_stop:stop]
+        selected.append([full_stop + tail.argmin(), full_stop + tail.argmax()])
+
+    return np.unique(np.concatenate(selected).astype(np.int64))
@@ -0,0 +1,72 @@
+import logging
+import os
+import queue
+import threading
+
+from src.simulation.simulation_loop import run_simulation_loop
+
+
+class SimulationWorker(threading.Thread) :
+    def __init__(self, bandit, agents, recorders, num_iterations, progress_interval=1000, results_writer=None,
+                 profiler=None) :
+        """
+        Runs a simulation on a background thread and streams its progress through a queue.
+        :param bandit: The MultiArmedBandit the agents pull from.
+        :param agents: Dictionary mapping agent names to agents.
+        :param recorders: Dictionary mapping the same names to their MetricsRecorder.
+        :param num_iterations: Number of iterations to simulate.
+        :param progress_interval: Number of iterations between two progress messages.
+        :param results_writer: Optional ResultsWriter the trajectories are streamed to; closed at the end of the run.
+        :param profiler: Optional PhaseProfiler. Its summary is logged at the end of the run and, with a
+                         results_writer, its Chrome trace is saved as trace.json in the run directory.
+
+        Messages put on the queue are tuples:
+        ('progress', start, stop, curves) - curves maps every agent name to a copy of its average reward
+                                            for the iterations [start, stop)
+        ('done', completed)               - the run finished or was cancelled after `completed` iterations
+        ('error', message)                - the run failed
+        """
+        super().__init__(daemon=True)
+
+        self.bandit = bandit
+        self.agents = agents
+        self.recorders = recorders
+        self.num_iterations = num_iterations
+        self.progress_interval = progress_interval
+        self.results_writer = results_writer
+        self.profiler = profiler
+
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._streamed = 0
+
+    def cancel(self) :
+        """
+        Asks the worker to stop after the current iteration.
+        """
+        self.cancel_event.set()
+
+    def _stream_progress(self, completed) :
+        # Only the new part of every curve is copied and sent to the GUI thread
+        start, self._streamed = self._streamed, completed
+        curves = {name : recorder.average_estimate[start:completed].copy()
+                  for name, recorder in self.recorders.items()}
+        self.messages.put(('progress', start, completed, curves))
+
+    def run(self) :
+        try :
+            completed = run_simulation_loop(self.bandit, self.agents, self.recorders, self.num_iterations,
+                                            progress_callback=self._stream_progress,
+                                            progress_interval=self.progress_interval,
+                                            cancel_event=self.cancel_event,
+                                            results_writer=self.results_writer,
+                                            profiler=self.profiler)
+            if self.results_writer is not None :
+                self.results_writer.close(completed)
+            if self.profiler is not None :
+                logging.getLogger('staging').info(self.profiler.summary())
+                if self.results_writer is not None :
+                    self.profiler.export_chrome_trace(os.path.join(self.results_writer.run_dir, 'trace.json'))
+            self.messages.put(('done', completed))
+        except Exception as e :
+            self.messages.put(('error', str(e)))
@@ -0,0 +1,21 @@
+def read_input_file(file_path) :
+    """
+    Reads the number of arms, total iterations, and epsilon from a simulation input file.
+    :param file_path: Path to a '.txt' file whose first three lines hold the number of arms,
+                      the number of iterations and the epsilon value.
+    :return: Tuple (no_arms, num_iterations, epsilon).
+    """
+    # Check if the file has a '.txt' extension
+    if not str(file_path).lower().endswith('.txt') :
+        raise ValueError("Invalid file format. Please select a '.txt' file.")
+
+    with open(file_path, 'r') as file :
+        # Verify and parse the structure of the file
+        try :
+            no_arms = int(file.readline().strip())
+            num_iterations = int(file.readline().strip())
+            epsilon = float(file.readline().strip())
+        except ValueError as ve :
+            raise ValueError("Invalid file structure. Please make sure the file contains valid data.") from ve
+
+    return no_arms, num_iterations, epsilon
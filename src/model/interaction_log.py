@@ -0,0 +1,194 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+# Per-event columns of an interaction log, with their on-disk dtype. propensity is the probability with
+# which the logging policy chose the logged arm. Logs of contextual decisions also hold a (N x d) 'context'
+# column of CONTEXT_DTYPE.
+LOG_COLUMNS = {
+    'arm' : np.int32,
+    'reward' : np.float64,
+    'propensity' : np.float64,
+}
+CONTEXT_DTYPE = np.float32
+
+METADATA_FILE = 'metadata.json'
+
+# Number of events read or written at once by the chunked readers and writers
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def _column_path(log_dir, column) :
+    return os.path.join(log_dir, f'{column}.bin')
+
+
+class InteractionLogWriter :
+    def __init__(self, log_dir, num_arms, dimension=None, metadata=None) :
+        """
+        Creates a log directory holding one raw binary file per column, appended to in chunks.
+        :param log_dir: Directory of the log; created if needed.
+        :param num_arms: Number of arms of the logged decisions.
+        :param dimension: Dimension of the contexts, or None for context-free decisions.
+        :param metadata: Dictionary written to the metadata.json sidecar (source, logging policy, ...).
+
+        Unlike ResultsWriter, the number of events does not have to be known in advance: every append()
+        extends the column files, and metadata.json records how many events are complete on disk.
+        """
+        os.makedirs(log_dir, exist_ok=True)
+
+        self.log_dir = log_dir
+        self.num_arms = num_arms
+        self.dimension = dimension
+        self.num_events = 0
+
+        self.columns = dict(LOG_COLUMNS)
+        if dimension is not None :
+            self.columns['context'] = CONTEXT_DTYPE
+
+        self.metadata = dict(metadata or {})
+        self.metadata.update({
+            'num_arms' : num_arms,
+            'dimension' : dimension,
+            'columns' : {column : np.dtype(dtype).name for column, dtype in self.columns.items()},
+            'num_events' : 0,
+        })
+        self._write_metadata()
+
+        self._files = {column : open(_column_path(log_dir, column), 'wb') for column in self.columns}
+
+    def _write_metadata(self) :
+        with open(os.path.join(self.log_dir, METADATA_FILE), 'w') as metadata_file :
+            json.dump(self.metadata, metadata_file, indent=2, default=str)
+
+    def append(self, arms, rewards, propensities, contexts=None) :
+        """
+        Appends a chunk of events.
+        :param arms: Logged arm of every event.
+        :param rewards: Observed reward of every event.
+        :param propensities: Probability of the logged arm under the logging policy, in (0, 1].
+        :param contexts: (n x d) context of every event, required if and only if the log has a dimension.
+        """
+        arms = np.asarray(arms, dtype=LOG_COLUMNS['arm'])
+        count = len(arms)
+        chunk = {
+            'arm' : arms,
+            'reward' : np.asarray(rewards, dtype=LOG_COLUMNS['reward']),
+            'propensity' : np.asarray(propensities, dtype=LOG_COLUMNS['propensity']),
+        }
+        if self.dimension is not None :
+            if contexts is None :
+                raise ValueError("This log holds contexts; every chunk needs them.")
+            chunk['context'] = np.asarray(contexts, dtype=CONTEXT_DTYPE).reshape(count, self.dimension)
+
+        if any(len(values) != count for values in chunk.values()) :
+            raise ValueError("Every column of a chunk must have one value per event.")
+        if count and (arms.min() < 0 or arms.max() >= self.num_arms) :
+            raise ValueError(f"Invalid arm index in chunk: {arms.min() if arms.min() < 0 else arms.max()}")
+        if count and not np.all((chunk['propensity'] > 0) & (chunk['propensity'] <= 1)) :
+            raise ValueError("Propensities must be in (0, 1].")
+
+        for column, values in chunk.items() :
+            self._files[column].write(np.ascontiguousarray(values).tobytes())
+        self.num_events += count
+
+    def flush(self) :
+        """
+        Flushes the column files and records how many events are complete on disk.
+        """
+        for column_file in self._files.values() :
+            column_file.flush()
+
+        self.metadata['num_events'] = self.num_events
+        self._write_metadata()
+
+    def close(self) :
+        """
+        Flushes everything and closes the column files.
+        """
+        self.flush()
+        for column_file in self._files.values() :
+            column_file.close()
+        self._files = {}
+
+
+class InteractionLog :
+    def __init__(self, log_dir) :
+        """
+        Opens a log written by InteractionLogWriter as read-only memory maps, without loading any column.
+        :param log_dir: Directory of the log.
+
+        Several processes opening the same log share its pages through the operating system's page cache.
+        """
+        with open(os.path.join(log_dir, METADATA_FILE), 'r') as metadata_file :
+            self.metadata = json.load(metadata_file)
+
+        self.log_dir = log_dir
+        self.num_arms = self.metadata['num_arms']
+        self.dimension = self.metadata['dimension']
+        self.num_events = self.metadata['num_events']
+
+        self.columns = {}
+        for column, dtype in self.metadata['columns'].items() :
+            shape = (self.num_events,) if column != 'context' else (self.num_events, self.dimension)
+            if self.num_events == 0 :
+                self.columns[column] = np.zeros(shape, dtype=dtype)
+            else :
+                self.columns[column] = np.memmap(_column_path(log_dir, column), dtype=dtype, mode='r', shape=shape)
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE) :
+        """
+        Iterates over the log in order, one chunk at a time.
+        :return: Generator of dictionaries mapping every column to an in-memory copy of the events of one chunk,
+                 so at most chunk_size events of the log are held in memory at any time.
+        """
+        for start in range(0, self.num_events, chunk_size) :
+            stop = min(start + chunk_size, self.num_events)
+            yield {column : np.array(values[start:stop]) for column, values in self.columns.items()}
+
+
+def import_csv(csv_path, log_dir, num_arms, chunk_size=DEFAULT_CHUNK_SIZE) :
+    """
+    Converts a CSV log into an interaction log, streaming it in chunks.
+    :param csv_path: CSV file with a header row and the columns arm, reward, propensity, and optionally
+                     context_0 ... context_{d-1}.
+    :param log_dir: Directory of the interaction log to write.
+    :param num_arms: Number of arms of the logged decisions.
+    :param chunk_size: Number of rows converted at once.
+    :return: Number of imported events.
+    """
+    with open(csv_path, 'r', newline='') as csv_file :
+        reader = csv.reader(csv_file)
+        header = next(reader)
+        try :
+            arm_index, reward_index, propensity_index = (header.index(name) for name in LOG_COLUMNS)
+        except ValueError :
+            raise ValueError(f"The CSV header must name the columns {list(LOG_COLUMNS)}, got {header}") from None
+        context_indices = [index for index, name in enumerate(header) if name.startswith('context_')]
+
+        writer = InteractionLogWriter(log_dir, num_arms, dimension=len(context_indices) or None,
+                                      metadata={'source' : os.path.abspath(csv_path)})
+        rows = []
+        for row in reader :
+            rows.append(row)
+            if len(rows) == chunk_size :
+                _append_rows(writer, rows, arm_index, reward_index, propensity_index, context_indices)
+                rows = []
+        _append_rows(writer, rows, arm_index, reward_index, propensity_index, context_indices)
+        writer.close()
+
+    return writer.num_events
+
+
+def _append_rows(writer, rows, arm_index, reward_index, propensity_index, context_indices) :
+    """
+    Appends parsed CSV rows to an interaction log writer.
+    """
+    if not rows :
+        return
+
+    values = np.array(rows, dtype=float)
+    writer.append(values[:, arm_index].astype(np.int64), values[:, reward_index], values[:, propensity_index],
+                  values[:, context_indices] if context_indices else None)
+    writer.flush()
@@ -1,32 +1,126 @@
 import numpy as np
 import logging
 
+from src.model.reward_streams import BlockNoiseStream, CommonRandomNumbers, DEFAULT_BLOCK_SIZE
+
+# Supported reward sources:
+# 'normal'     - one np.random.normal call per pull on the global NumPy RNG (original behaviour)
+# 'presampled' - noise handed out from blocks pre-drawn from a seeded np.random.Generator
+# 'common'     - common random numbers: every stream sees the same noise for the same (arm, pull count)
+REWARD_SOURCES = ('normal', 'presampled', 'common')
+
+# Supported drift modes of the true means, applied by advance() once per iteration:
+# 'stationary'   - the true means never change (original behaviour)
+# 'random_walk'  - every mean moves by an independent N(0, drift_scale^2) step
+# 'piecewise'    - every change_interval iterations, all means are redrawn from N(0, 1)
+DRIFT_MODES = ('stationary', 'random_walk', 'piecewise')
+
 
 # This class simulates a multi-armed bandit problem, where each arm of the bandit provides a reward drawn from a normal distribution.
 class MultiArmedBandit :
-    def __init__(self, no_arm) :
+    def __init__(self, no_arm, reward_source='normal', seed=None, block_size=DEFAULT_BLOCK_SIZE, drift='stationary',
+                 drift_scale=0.01, change_interval=10000) :
         """
             The constructor initializes the bandit with a given number of arms and sets up the mean rewards for each arm, sampled from a normal distribution.
 
             :param no_arm: Number of arms in the bandit.
+            :param reward_source: One of REWARD_SOURCES, selects how the reward noise is generated.
+            :param seed: Seed of the np.random.Generator used by the 'presampled' and 'common' sources
+                         (true means included). Ignored by the 'normal' source, which uses the global RNG.
+            :param block_size: Number of noise values drawn per refill by the 'presampled' and 'common' sources.
+            :param drift: One of DRIFT_MODES, selects how the true means change over time.
+            :param drift_scale: Standard deviation of the per-iteration steps of the 'random_walk' mode.
+            :param change_interval: Number of iterations between two changes of the 'piecewise' mode.
         """
         try :
+            if reward_source not in REWARD_SOURCES :
+                raise ValueError(f"Invalid reward source: {reward_source}")
+            if drift not in DRIFT_MODES :
+                raise ValueError(f"Invalid drift mode: {drift}")
+            if change_interval < 1 :
+                raise ValueError(f"Invalid change interval: {change_interval}")
+
             # This line sets the number of arms (num_arms) for the bandit instance to the value provided in no_arm.
             self.num_arms = no_arm
+            self.reward_source = reward_source
+
+            if reward_source == 'normal' :
+                # Generates a list of true_means for each arm. Each mean is drawn from a normal distribution with a mean of 0 and a standard deviation of 1.
+                # The length of this list is equal to the number of arms (no_arm).
+                # These means represent the expected reward for each arm.
+                self.true_means = np.random.normal(0, 1, no_arm)
+            else :
+                # The true means and the noise come from independent children of the same seed
+                means_sequence, noise_sequence = np.random.SeedSequence(seed).spawn(2)
+                self.true_means = np.random.default_rng(means_sequence).normal(0, 1, no_arm)
+
+                # Plain Python floats make the per-pull lookup cheaper than indexing the NumPy array
+                self._true_means_list = self.true_means.tolist()
 
-            # Generates a list of true_means for each arm. Each mean is drawn from a normal distribution with a mean of 0 and a standard deviation of 1.
-            # The length of this list is equal to the number of arms (no_arm).
-            # These means represent the expected reward for each arm.
-            self.true_means = np.random.normal(0, 1, no_arm)
+                if reward_source == 'presampled' :
+                    self._noise_stream = BlockNoiseStream(np.random.default_rng(noise_sequence), block_size)
+                else :
+                    # The block is split across the arms, so one refill of every arm draws block_size values
+                    self._common_noise = CommonRandomNumbers(no_arm, noise_sequence, max(1, block_size // no_arm))
+                    # Per-stream pull counts, created on the first pull of each stream
+                    self._stream_pulls = {}
+
+            # The drift has its own stream (the third child of the seed), so the means and the noise of a
+            # seed are the same whichever drift mode is used
+            self.drift = drift
+            self.drift_scale = drift_scale
+            self.change_interval = change_interval
+            self.iteration = 0
+            self._drift_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(3)[2])
+            self._update_best_arm()
         except Exception as e :
             logging.error(f"Error during MultiArmedBandit initialization due to: {str(e)}")
             raise e
 
-    def pull_arm(self, arm) :
+    @property
+    def stationary(self) :
+        """
+            :return: True if the true means never change, so that the simulation loop can skip advance().
+        """
+        return self.drift == 'stationary'
+
+    def advance(self) :
+        """
+            Moves the bandit to the next iteration, changing the true means according to the drift mode.
+
+            :return: True if the true means changed. They are updated in place, so views of true_means stay valid,
+                     and best_arm and best_mean are updated with them.
+        """
+        self.iteration += 1
+
+        if self.drift == 'random_walk' :
+            self.true_means += self._drift_rng.normal(0, self.drift_scale, self.num_arms)
+        elif self.drift == 'piecewise' and self.iteration % self.change_interval == 0 :
+            self.true_means[:] = self._drift_rng.normal(0, 1, self.num_arms)
+        else :
+            return False
+
+        if self.reward_source != 'normal' :
+            self._true_means_list = self.true_means.tolist()
+        self._update_best_arm()
+        return True
+
+    def _update_best_arm(self) :
+        """
+            Finds the arm with the highest true mean once per change, so that the recorders of every agent
+            can take it as is instead of scanning the true means themselves.
+        """
+        self.best_arm = int(np.argmax(self.true_means))
+        self.best_mean = float(self.true_means[self.best_arm])
+
+    def pull_arm(self, arm, stream=0) :
         """
             Method simulates the action of pulling an arm and receiving a reward based on the underlying distribution of that arm.
 
             :param arm: The arm to be pulled.
+            :param stream: Identifier of the consumer pulling the arm. Only used by the 'common' reward source,
+                           where each stream keeps its own pull counts so that different agents see the same
+                           noise for the same (arm, pull count).
             :return: The sampled reward.
         """
         try :
@@ -34,6 +128,17 @@ class MultiArmedBandit :
             if arm < 0 or arm >= self.num_arms :
                 raise ValueError(f"Invalid arm index: {arm}")
 
+            if self.reward_source == 'presampled' :
+                return self._true_means_list[arm] + self._noise_stream.draw()
+
+            if self.reward_source == 'common' :
+                pulls = self._stream_pulls.get(stream)
+                if pulls is None :
+                    pulls = self._stream_pulls[stream] = [0] * self.num_arms
+                pull_index = pulls[arm]
+                pulls[arm] = pull_index + 1
+                return self._true_means_list[arm] + self._common_noise.noise(arm, pull_index)
+
             # Samples a reward for the specified arm.
             # The reward is drawn from a normal distribution with the mean equal to the true mean of that arm (self.true_means[arm])
             # and a standard deviation of 1.
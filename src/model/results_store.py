@@ -0,0 +1,147 @@
+import json
+import os
+
+import numpy as np
+
+# Per-step columns stored for every agent of a run, with their on-disk dtype.
+# running_mean is the average reward curve plotted by the GUI and regret is the cumulative regret.
+COLUMNS = {
+    'chosen_arm' : np.int32,
+    'reward' : np.float64,
+    'running_mean' : np.float64,
+    'regret' : np.float64,
+    'step_latency' : np.float64,
+}
+
+# MetricsRecorder attribute holding each column
+RECORDER_ATTRIBUTES = {
+    'chosen_arm' : 'arms',
+    'reward' : 'rewards',
+    'running_mean' : 'average_estimate',
+    'regret' : 'cumulative_regret',
+    'step_latency' : 'step_latency',
+}
+
+METADATA_FILE = 'metadata.json'
+
+
+def _column_path(run_dir, name, column) :
+    return os.path.join(run_dir, f'{name}.{column}.npy')
+
+
+class ResultsWriter :
+    def __init__(self, run_dir, agent_names, num_iterations, metadata=None) :
+        """
+        Creates a run directory holding one memory-mapped '.npy' file per agent and column.
+        :param run_dir: Directory of the run; created if needed.
+        :param agent_names: Names of the agents of the run.
+        :param num_iterations: Number of steps, used to preallocate every column on disk.
+        :param metadata: Dictionary written to the metadata.json sidecar (input file, K, epsilon, seed, ...).
+
+        Columns are written in chunks with write(), so a run never needs more memory than one chunk
+        and the files on disk can be read while the run is still going.
+        """
+        os.makedirs(run_dir, exist_ok=True)
+
+        self.run_dir = run_dir
+        self.agent_names = list(agent_names)
+        self.num_iterations = num_iterations
+        self.completed_steps = 0
+
+        self.metadata = dict(metadata or {})
+        self.metadata.update({
+            'num_iterations' : num_iterations,
+            'agents' : self.agent_names,
+            'columns' : {column : np.dtype(dtype).name for column, dtype in COLUMNS.items()},
+            'completed_steps' : 0,
+        })
+        self._write_metadata()
+
+        self._columns = {
+            name : {
+                column : np.lib.format.open_memmap(_column_path(run_dir, name, column), mode='w+', dtype=dtype,
+                                                   shape=(num_iterations,))
+                for column, dtype in COLUMNS.items()
+            }
+            for name in self.agent_names
+        }
+
+    def _write_metadata(self) :
+        with open(os.path.join(self.run_dir, METADATA_FILE), 'w') as metadata_file :
+            json.dump(self.metadata, metadata_file, indent=2, default=str)
+
+    def write(self, name, start, stop, columns) :
+        """
+        Writes the steps [start, stop) of one agent.
+        :param name: Name of the agent.
+        :param start: First step of the chunk.
+        :param stop: End (exclusive) of the chunk.
+        :param columns: Dictionary mapping column names to arrays of length stop - start.
+        """
+        for column, values in columns.items() :
+            self._columns[name][column][start:stop] = values
+
+    def write_recorder(self, name, recorder, start, stop) :
+        """
+        Writes the steps [start, stop) of one agent from its MetricsRecorder.
+        """
+        self.write(name, start, stop, {column : getattr(recorder, attribute)[start:stop]
+                                       for column, attribute in RECORDER_ATTRIBUTES.items()})
+
+    def flush(self, completed_steps) :
+        """
+        Flushes the memory maps and records how many steps are complete on disk.
+        :param completed_steps: Number of steps written for every agent so far.
+        """
+        for columns in self._columns.values() :
+            for values in columns.values() :
+                values.flush()
+
+        self.completed_steps = completed_steps
+        self.metadata['completed_steps'] = completed_steps
+        self._write_metadata()
+
+    def close(self, completed_steps) :
+        """
+        Flushes everything and releases the memory maps.
+        """
+        self.flush(completed_steps)
+        self._columns = {}
+
+
+class ResultsReader :
+    def __init__(self, run_dir) :
+        """
+        Opens a run written by ResultsWriter without loading any column.
+        :param run_dir: Directory of the run.
+        """
+        with open(os.path.join(run_dir, METADATA_FILE), 'r') as metadata_file :
+            self.metadata = json.load(metadata_file)
+
+        self.run_dir = run_dir
+        self.agent_names = self.metadata['agents']
+        self.num_steps = self.metadata['completed_steps']
+        self._columns = {}
+
+    def column(self, name, column) :
+        """
+        :param name: Name of the agent.
+        :param column: One of COLUMNS.
+        :return: Read-only memory map over the completed steps of the column. Data is only read from
+                 disk for the parts that are actually accessed.
+        """
+        key = (name, column)
+        if key not in self._columns :
+            if name not in self.agent_names :
+                raise KeyError(f"Unknown agent: {name}")
+            if column not in COLUMNS :
+                raise KeyError(f"Unknown column: {column}")
+            self._columns[key] = np.load(_column_path(self.run_dir, name, column), mmap_mode='r')[:self.num_steps]
+
+        return self._columns[key]
+
+    def read(self, name, column, start=0, stop=None) :
+        """
+        :return: In-memory copy of the steps [start, stop) of one column.
+        """
+        return np.array(self.column(name, column)[start:stop])
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Number of standard normal values drawn per refill
+DEFAULT_BLOCK_SIZE = 65536
+
+
+# Hands out standard normal noise from a buffer that is pre-drawn in large blocks,
+# so each pull only costs a list lookup instead of a call into the NumPy RNG.
+class BlockNoiseStream :
+    def __init__(self, rng, block_size=DEFAULT_BLOCK_SIZE) :
+        """
+            :param rng: np.random.Generator the blocks are drawn from.
+            :param block_size: Number of values drawn per refill.
+        """
+        if block_size < 1 :
+            raise ValueError(f"Invalid block size: {block_size}")
+
+        self.rng = rng
+        self.block_size = block_size
+        self._buffer = []
+        self._position = 0
+
+    def _refill(self) :
+        # tolist() converts the whole block once, so single values are plain Python floats afterwards
+        self._buffer = self.rng.standard_normal(self.block_size).tolist()
+        self._position = 0
+
+    def draw(self) :
+        """
+            :return: The next standard normal value of the stream.
+        """
+        if self._position == len(self._buffer) :
+            self._refill()
+
+        value = self._buffer[self._position]
+        self._position += 1
+        return value
+
+
+# Common random numbers: the noise of the k-th pull of arm a is the same value for every consumer
+# (e.g. the UCB1 and the Epsilon-Greedy agent), which removes the reward noise from the difference
+# between the consumers and therefore reduces the variance of their comparison.
+class CommonRandomNumbers :
+    def __init__(self, no_arm, seed_sequence, block_size=4096) :
+        """
+            :param no_arm: Number of arms in the bandit.
+            :param seed_sequence: np.random.SeedSequence from which one child stream per arm is derived.
+            :param block_size: Number of values drawn per arm and per refill.
+
+            Every arm has its own child stream, so the value for (arm, pull_index) does not depend on
+            the order in which the consumers pull the arms. Per-arm noise is only materialized up to the
+            highest pull count reached, rounded up to the block size.
+        """
+        if block_size < 1 :
+            raise ValueError(f"Invalid block size: {block_size}")
+
+        self.num_arms = no_arm
+        self.seed_sequence = seed_sequence
+        self.block_size = block_size
+
+        # Generators and buffers are created lazily, on the first pull of each arm
+        self._rngs = [None] * no_arm
+        self._noise = [[] for _ in range(no_arm)]
+
+    def _extend(self, arm, pull_index) :
+        if self._rngs[arm] is None :
+            child = np.random.SeedSequence(self.seed_sequence.entropy,
+                                           spawn_key=self.seed_sequence.spawn_key + (arm,))
+            self._rngs[arm] = np.random.default_rng(child)
+
+        noise = self._noise[arm]
+        while len(noise) <= pull_index :
+            noise.extend(self._rngs[arm].standard_normal(self.block_size).tolist())
+
+    def noise(self, arm, pull_index) :
+        """
+            :param arm: The pulled arm.
+            :param pull_index: Zero-based number of previous pulls of this arm by the consumer.
+            :return: The standard normal value shared by every consumer for (arm, pull_index).
+        """
+        noise = self._noise[arm]
+        if pull_index >= len(noise) :
+            self._extend(arm, pull_index)
+
+        return noise[pull_index]
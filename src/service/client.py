@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+
+from src.service.protocol import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE_BYTES, encode, decode
+
+
+class DecisionClient :
+    def __init__(self, reader, writer) :
+        """
+        Pipelined client of the decision service. Use DecisionClient.connect to create one.
+
+        Any number of coroutines can share one client: every request is written immediately with its own
+        id, without waiting for the responses of the previous ones, and a background task matches the
+        responses to the waiting callers.
+        """
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._pending = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None) :
+        """
+        Connects to a server on a TCP port, or on a Unix socket if a path is given.
+        """
+        if unix_socket is not None :
+            reader, writer = await asyncio.open_unix_connection(unix_socket, limit=MAX_LINE_BYTES)
+        else :
+            reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_BYTES)
+
+        return cls(reader, writer)
+
+    async def _receive(self) :
+        try :
+            while True :
+                line = await self._reader.readline()
+                if not line :
+                    raise ConnectionError("Connection closed by the decision service")
+                response = decode(line)
+                future = self._pending.pop(response.get('id'), None)
+                if future is None or future.done() :
+                    continue
+                if 'error' in response :
+                    future.set_exception(RuntimeError(response['error']))
+                else :
+                    future.set_result(response)
+        except Exception as e :
+            for future in self._pending.values() :
+                if not future.done() :
+                    future.set_exception(e if isinstance(e, ConnectionError) else ConnectionError(str(e)))
+            self._pending.clear()
+
+    async def request(self, message) :
+        """
+        Sends one request and waits for its response.
+        :param message: Request without 'id'.
+        :return: Response dictionary.
+        """
+        if self._receiver.done() :
+            raise ConnectionError("Connection to the decision service is closed")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode({'id' : request_id, **message}))
+        await self._writer.drain()
+
+        return await future
+
+    async def select(self, agent) :
+        """
+        :return: The arm selected by the named agent.
+        """
+        response = await self.request({'op' : 'select', 'agent' : agent})
+        return response['arm']
+
+    async def update(self, agent, arm, reward) :
+        """
+        Reports the reward received after pulling an arm chosen by the named agent.
+        """
+        await self.request({'op' : 'update', 'agent' : agent, 'arm' : int(arm), 'reward' : float(reward)})
+
+    async def agents(self) :
+        """
+        :return: Dictionary mapping the hosted agent names to their number of arms.
+        """
+        response = await self.request({'op' : 'agents'})
+        return response['agents']
+
+    async def close(self) :
+        self._receiver.cancel()
+        self._writer.close()
+        try :
+            await self._writer.wait_closed()
+        except ConnectionError :
+            pass
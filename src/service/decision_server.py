@@ -0,0 +1,268 @@
+"""
+Local decision service hosting named agents behind an asyncio server.
+
+Usage (from the repository root):
+
+    python -m src.service.decision_server --arms 10 --epsilon 0.1 --port 8765
+    python -m src.service.decision_server --arms 10 --epsilon 0.1 --unix-socket /tmp/bandit.sock
+
+See src.service.protocol for the wire format.
+"""
+import argparse
+import asyncio
+import logging
+
+import numpy as np
+
+from src.algorithm.strategy_registry import get_strategy, strategy_names
+from src.service.protocol import DEFAULT_HOST, DEFAULT_PORT, MAX_LINE_BYTES, encode, decode
+
+# Number of pending requests of one agent that triggers a flush without waiting for the event loop
+DEFAULT_MAX_BATCH_SIZE = 4096
+
+
+def create_agents(no_arm, epsilon) :
+    """
+    :return: Dictionary of the agents hosted by default, one per registered strategy, keyed by the
+             strategy name clients address them with.
+    """
+    return {name : get_strategy(name).create_agent(no_arm, epsilon) for name in strategy_names()}
+
+
+class MicroBatcher :
+    def __init__(self, agent, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_delay=0.0) :
+        """
+        Coalesces the concurrent select and update requests of one agent into micro-batches.
+        :param agent: The hosted agent.
+        :param max_batch_size: Number of pending requests that triggers an immediate flush.
+        :param max_delay: Seconds a request may wait for more requests to join its batch. With 0, a batch
+                          holds every request that arrived during the current turn of the event loop.
+
+        Within a batch, the pending updates are applied first with agent.update_batch, then the pending
+        selections are answered with agent.select_many, so the decisions see every reward received before them.
+        """
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._update_arms = []
+        self._update_rewards = []
+        self._update_futures = []
+        self._select_futures = []
+        self._scheduled = None
+
+        # Counters reported by the server
+        self.num_batches = 0
+        self.num_requests = 0
+
+    def select(self) :
+        """
+        :return: Future resolved with the selected arm when the batch is flushed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._select_futures.append(future)
+        self._schedule()
+        return future
+
+    def update(self, arm, reward) :
+        """
+        :return: Future resolved when the reward has been applied to the agent.
+        """
+        if not (0 <= arm < self.agent.num_arms) :
+            raise ValueError(f"Invalid arm index: {arm}")
+
+        future = asyncio.get_running_loop().create_future()
+        self._update_arms.append(arm)
+        self._update_rewards.append(reward)
+        self._update_futures.append(future)
+        self._schedule()
+        return future
+
+    def _schedule(self) :
+        if len(self._select_futures) + len(self._update_futures) >= self.max_batch_size :
+            if self._scheduled is not None :
+                self._scheduled.cancel()
+            self.flush()
+        elif self._scheduled is None :
+            loop = asyncio.get_running_loop()
+            if self.max_delay > 0 :
+                self._scheduled = loop.call_later(self.max_delay, self.flush)
+            else :
+                self._scheduled = loop.call_soon(self.flush)
+
+    def flush(self) :
+        """
+        Applies the pending updates and answers the pending selections.
+        """
+        self._scheduled = None
+        update_futures, select_futures = self._update_futures, self._select_futures
+        if not update_futures and not select_futures :
+            return
+
+        arms, rewards = self._update_arms, self._update_rewards
+        self._update_arms, self._update_rewards, self._update_futures = [], [], []
+        self._select_futures = []
+
+        self.num_batches += 1
+        self.num_requests += len(update_futures) + len(select_futures)
+
+        try :
+            if arms :
+                self.agent.update_batch(np.asarray(arms, dtype=np.int64), rewards)
+            for future in update_futures :
+                if not future.done() :
+                    future.set_result(None)
+
+            if select_futures :
+                # Every selection of the batch is made against the same snapshot of the statistics
+                selected_arms = self.agent.select_many(len(select_futures)).tolist()
+                for future, arm in zip(select_futures, selected_arms) :
+                    if not future.done() :
+                        future.set_result(arm)
+        except Exception as e :
+            logging.getLogger('staging').error(f"Error during batch of {len(arms)} updates and "
+                                               f"{len(select_futures)} selections due to: {str(e)}")
+            for future in update_futures + select_futures :
+                if not future.done() :
+                    future.set_exception(e)
+
+
+class DecisionServer :
+    def __init__(self, agents, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_delay=0.0) :
+        """
+        Asyncio server answering select and update requests for named agents.
+        :param agents: Dictionary mapping agent names to agents exposing update_batch(arms, rewards),
+                       select_many(k) and num_arms.
+        :param max_batch_size: See MicroBatcher.
+        :param max_delay: See MicroBatcher.
+        """
+        self.logger = logging.getLogger('staging')
+        self.agents = agents
+        self.batchers = {name : MicroBatcher(agent, max_batch_size, max_delay) for name, agent in agents.items()}
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None) :
+        """
+        Starts listening on a TCP port, or on a Unix socket if a path is given.
+        """
+        if unix_socket is not None :
+            self.server = await asyncio.start_unix_server(self._handle_connection, path=unix_socket,
+                                                          limit=MAX_LINE_BYTES)
+            self.logger.info(f"Decision service listening on {unix_socket}")
+        else :
+            self.server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_LINE_BYTES)
+            self.logger.info(f"Decision service listening on {host}:{self.port}")
+
+    @property
+    def port(self) :
+        """
+        :return: TCP port the server listens on (useful when started with port 0).
+        """
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) :
+        async with self.server :
+            await self.server.serve_forever()
+
+    async def close(self) :
+        self.server.close()
+        await self.server.wait_closed()
+        for name, batcher in self.batchers.items() :
+            if batcher.num_batches :
+                self.logger.info(f"Agent {name}: {batcher.num_requests} requests in {batcher.num_batches} "
+                                 f"batches ({batcher.num_requests / batcher.num_batches:.1f} per batch)")
+
+    async def _handle_connection(self, reader, writer) :
+        """
+        Serves one connection. Requests are dispatched as soon as they are read, without waiting for the
+        previous responses, and every response is written when its batch is flushed.
+        """
+        def respond(request_id, future) :
+            if writer.is_closing() :
+                return
+            if future.exception() is not None :
+                writer.write(encode({'id' : request_id, 'error' : str(future.exception())}))
+            elif future.result() is None :
+                writer.write(encode({'id' : request_id, 'ok' : True}))
+            else :
+                writer.write(encode({'id' : request_id, 'arm' : future.result()}))
+
+        try :
+            while True :
+                line = await reader.readline()
+                if not line :
+                    break
+
+                request_id = None
+                try :
+                    request = decode(line)
+                    request_id = request.get('id')
+                    future = self._dispatch(request)
+                except Exception as e :
+                    writer.write(encode({'id' : request_id, 'error' : str(e)}))
+                    continue
+
+                if isinstance(future, dict) :
+                    writer.write(encode({'id' : request_id, **future}))
+                else :
+                    future.add_done_callback(lambda done, request_id=request_id : respond(request_id, done))
+
+                # Only waits when the client does not read its responses fast enough
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e :
+            self.logger.warning(f"Connection closed due to: {str(e)}")
+        finally :
+            writer.close()
+
+    def _dispatch(self, request) :
+        """
+        :return: Future of a select or update request, or the response of an immediate request.
+        """
+        operation = request.get('op')
+        if operation == 'agents' :
+            return {'agents' : {name : agent.num_arms for name, agent in self.agents.items()}}
+
+        name = request.get('agent')
+        batcher = self.batchers.get(name)
+        if batcher is None :
+            raise ValueError(f"Unknown agent: {name}")
+
+        if operation == 'select' :
+            return batcher.select()
+        if operation == 'update' :
+            return batcher.update(int(request['arm']), float(request['reward']))
+
+        raise ValueError(f"Unknown operation: {operation}")
+
+
+async def serve(agents, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None, **batching) :
+    server = DecisionServer(agents, **batching)
+    await server.start(host, port, unix_socket)
+    try :
+        await server.serve_forever()
+    finally :
+        await server.close()
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Serve bandit decisions over a local socket.")
+    parser.add_argument('--arms', type=int, required=True, help="Number of arms of the hosted agents.")
+    parser.add_argument('--epsilon', type=float, default=0.1, help="Exploration rate of the Epsilon-Greedy agent.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Host to listen on.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port to listen on.")
+    parser.add_argument('--unix-socket', default=None, help="Listen on this Unix socket instead of TCP.")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE, help="Batch size limit.")
+    parser.add_argument('--max-delay', type=float, default=0.0, help="Seconds a request may wait for a batch.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try :
+        asyncio.run(serve(create_agents(args.arms, args.epsilon), args.host, args.port, args.unix_socket,
+                          max_batch_size=args.max_batch_size, max_delay=args.max_delay))
+    except KeyboardInterrupt :
+        pass
+
+
+if __name__ == '__main__' :
+    main()
@@ -0,0 +1,120 @@
+"""
+Load generator of the decision service, with a MultiArmedBandit as local stand-in environment.
+
+Usage (from the repository root):
+
+    python -m src.service.load_generator --arms 10 --concurrency 64 --decisions 20000
+
+Without --port or --unix-socket, a server hosting the default agents is started in the same process.
+Every simulated user selects an arm, pulls it on the local bandit and reports the reward, in a loop.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import numpy as np
+
+from src.model.multi_armed_bandit import MultiArmedBandit
+from src.service.client import DecisionClient
+from src.service.decision_server import DecisionServer, create_agents, DEFAULT_MAX_BATCH_SIZE
+from src.service.protocol import DEFAULT_HOST
+
+
+async def _user(client, agent, bandit, stream, num_decisions, latencies) :
+    """
+    Simulated user: num_decisions select / pull / update rounds. Appends the latency of every selection.
+    """
+    for _ in range(num_decisions) :
+        start = time.perf_counter()
+        arm = await client.select(agent)
+        latencies.append(time.perf_counter() - start)
+
+        await client.update(agent, arm, bandit.pull_arm(arm, stream))
+
+
+async def generate_load(client, agents, bandit, concurrency, num_decisions) :
+    """
+    Runs concurrent simulated users against the service.
+    :param client: Connected DecisionClient shared by all users.
+    :param agents: Names of the agents the users are spread across.
+    :param bandit: Local MultiArmedBandit giving the rewards.
+    :param concurrency: Number of simulated users.
+    :param num_decisions: Total number of decisions over all users.
+    :return: Dictionary with the decision latency percentiles (milliseconds) and the throughput.
+    """
+    per_user = max(1, num_decisions // concurrency)
+    latencies = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_user(client, agents[user % len(agents)], bandit, user, per_user, latencies)
+                           for user in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.asarray(latencies) * 1e3
+    return {
+        'concurrency' : concurrency,
+        'decisions' : len(latencies),
+        'elapsed_seconds' : elapsed,
+        # Every decision is one select and one update request
+        'requests_per_second' : 2 * len(latencies) / elapsed,
+        'decisions_per_second' : len(latencies) / elapsed,
+        'p50_ms' : float(np.percentile(latencies_ms, 50)),
+        'p99_ms' : float(np.percentile(latencies_ms, 99)),
+    }
+
+
+async def run(args) :
+    server = None
+    if args.port is None and args.unix_socket is None :
+        server = DecisionServer(create_agents(args.arms, args.epsilon), max_batch_size=args.max_batch_size,
+                                max_delay=args.max_delay)
+        await server.start(DEFAULT_HOST, 0)
+        client = await DecisionClient.connect(DEFAULT_HOST, server.port)
+    else :
+        client = await DecisionClient.connect(args.host, args.port, args.unix_socket)
+
+    try :
+        hosted = await client.agents()
+        agents = args.agents or sorted(hosted)
+        unknown = [name for name in agents if name not in hosted]
+        if unknown :
+            raise ValueError(f"Unknown agents {unknown}; the service hosts {sorted(hosted)}")
+        bandit = MultiArmedBandit(hosted[agents[0]], reward_source='presampled', seed=args.seed)
+
+        return await generate_load(client, agents, bandit, args.concurrency, args.decisions)
+    finally :
+        await client.close()
+        if server is not None :
+            await server.close()
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Measure the latency and throughput of the decision service.")
+    parser.add_argument('--arms', type=int, default=10, help="Number of arms of the in-process agents.")
+    parser.add_argument('--epsilon', type=float, default=0.1, help="Exploration rate of the in-process agent.")
+    parser.add_argument('--agents', nargs='+', default=None, help="Agents to load (default: all hosted).")
+    parser.add_argument('--concurrency', type=int, default=64, help="Number of concurrent simulated users.")
+    parser.add_argument('--decisions', type=int, default=20000, help="Total number of decisions.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the local bandit.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Host of an already running service.")
+    parser.add_argument('--port', type=int, default=None, help="Port of an already running service.")
+    parser.add_argument('--unix-socket', default=None, help="Unix socket of an already running service.")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Batch size limit of the in-process server.")
+    parser.add_argument('--max-delay', type=float, default=0.0, help="Batching delay of the in-process server.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try :
+        report = asyncio.run(run(args))
+    except ValueError as e :
+        # run() rejects the names of --agents that the service does not host before generating any load
+        parser.error(str(e))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__' :
+    main()
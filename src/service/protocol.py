@@ -0,0 +1,37 @@
+import json
+
+# The decision service speaks newline-delimited JSON: every request and every response is one JSON object
+# on its own line. Requests carry an 'id' that is echoed in the response, so a client can pipeline many
+# requests on one connection and match the responses, which may come back in a different order.
+#
+#   {"id": 1, "op": "select", "agent": "ucb1"}                         -> {"id": 1, "arm": 3}
+#   {"id": 2, "op": "update", "agent": "ucb1", "arm": 3, "reward": 0.4} -> {"id": 2, "ok": true}
+#   {"id": 3, "op": "agents"}                                         -> {"id": 3, "agents": {"ucb1": 10}}
+#
+# A request that cannot be served gets {"id": ..., "error": "<message>"}.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Limit of a single request line, far above any valid request
+MAX_LINE_BYTES = 64 * 1024
+
+
+def encode(message) :
+    """
+    :param message: JSON-serializable dictionary.
+    :return: The message as one newline-terminated line of bytes.
+    """
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def decode(line) :
+    """
+    :param line: One line of bytes received from the socket.
+    :return: The decoded dictionary.
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict) :
+        raise ValueError("Messages must be JSON objects")
+
+    return message
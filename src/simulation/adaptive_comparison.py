@@ -0,0 +1,356 @@
+"""
+Adaptive comparison of two strategies over a set of input files, with sequential early stopping.
+
+Usage (from the repository root):
+
+    python -m src.simulation.adaptive_comparison input/ --strategies ucb1 epsilon_greedy --precision 0.01 \
+        --wave-size 50 --max-replications 2000 --budget-seconds 600 --workers 4 --seed 42
+
+Instead of running a fixed number of replications per input file, replications are launched in waves.
+After every wave the running mean and confidence interval of the final average reward and regret of
+both strategies, and of their paired difference, are updated. An input file stops receiving waves as
+soon as the confidence interval of the difference is narrower than the target precision (or, with
+--stop-on-sign, excludes zero), when it reaches --max-replications, or when the global CPU budget is spent.
+At most --workers waves are in flight; whenever one completes, its CPU time is charged to the budget and the
+input file whose difference is the least resolved gets the next wave. No wave is submitted once the CPU time
+spent, plus that of the waves in flight and the projected cost of the next one, reaches the budget.
+
+The replications of a wave face the same true means for both strategies (see VectorizedSimulation), so
+the difference is estimated from paired replications, which is much tighter than comparing two means.
+"""
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+
+import numpy as np
+
+from src.algorithm.strategy_registry import strategy_names
+from src.model.input_file import read_input_file
+from src.simulation.batch_runner import discover_input_files
+from src.simulation.vectorized_engine import VectorizedSimulation
+
+# Per-replication metrics that are estimated, in the order they are reported
+METRICS = ('final_average_reward', 'final_regret')
+
+COMPARISON_FIELDS = ('input_file', 'no_arms', 'num_iterations', 'epsilon', 'strategy', 'num_replications',
+                     'num_waves', 'status', 'cpu_seconds', 'final_mean', 'final_mean_half_width',
+                     'final_regret_mean', 'final_regret_half_width')
+
+# Stopping reasons of a comparison
+RESOLVED = 'resolved'
+MAX_REPLICATIONS = 'max_replications'
+BUDGET = 'budget'
+
+
+class RunningStatistics :
+    def __init__(self) :
+        """
+        Streaming mean and variance of a sample that grows by whole batches, in O(1) memory.
+        """
+        self.count = 0
+        self.mean = 0.0
+        # Sum of the squared deviations from the mean
+        self._m2 = 0.0
+
+    def add(self, values) :
+        """
+        Merges a batch of values into the running statistics (Chan et al. parallel update).
+        :param values: 1-D array of new observations.
+        """
+        values = np.asarray(values, dtype=float)
+        batch_count = len(values)
+        if batch_count == 0 :
+            return
+
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+
+        count = self.count + batch_count
+        delta = batch_mean - self.mean
+        self.mean += delta * batch_count / count
+        self._m2 += batch_m2 + delta * delta * self.count * batch_count / count
+        self.count = count
+
+    @property
+    def variance(self) :
+        """
+        :return: Unbiased sample variance (infinite with fewer than 2 observations).
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else math.inf
+
+    def half_width(self, z) :
+        """
+        :param z: Standard normal quantile of the confidence level.
+        :return: Half width of the normal-approximation confidence interval of the mean.
+        """
+        return z * math.sqrt(self.variance / self.count) if self.count > 1 else math.inf
+
+
+class Comparison :
+    def __init__(self, file_path, seed_sequence, strategies) :
+        """
+        Running estimates of the comparison of two strategies on one input file.
+        :param file_path: Path to the 3-line input file.
+        :param seed_sequence: np.random.SeedSequence dedicated to this input file; wave w uses its w-th child.
+        :param strategies: Pair of strategy names (a, b); the difference is a - b.
+        """
+        self.file_path = file_path
+        self.no_arms, self.num_iterations, self.epsilon = read_input_file(file_path)
+        self.seed_sequence = seed_sequence
+        self.strategies = tuple(strategies)
+
+        self.statistics = {(name, metric) : RunningStatistics() for name in strategies for metric in METRICS}
+        self.differences = {metric : RunningStatistics() for metric in METRICS}
+
+        self.num_waves = 0
+        self.cpu_seconds = 0.0
+        self.status = None
+
+    @property
+    def num_replications(self) :
+        return self.differences[METRICS[0]].count
+
+    def wave_sequence(self, wave) :
+        """
+        :return: Seed of the given wave. Like VectorizedSimulation._child_sequence, it does not change the
+                 state of the parent, so the waves of an input file are the same whatever the scheduling.
+        """
+        return np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=self.seed_sequence.spawn_key + (wave,))
+
+    def add_wave(self, finals, cpu_seconds) :
+        """
+        Merges the results of one wave.
+        :param finals: Dictionary {strategy: {metric: (R,) per-replication values}} returned by run_wave.
+        """
+        first, second = self.strategies
+        for metric in METRICS :
+            for name in self.strategies :
+                self.statistics[(name, metric)].add(finals[name][metric])
+            self.differences[metric].add(finals[first][metric] - finals[second][metric])
+
+        self.num_waves += 1
+        self.cpu_seconds += cpu_seconds
+
+    def uncertainty(self, metric, z, precision) :
+        """
+        :return: Half width of the confidence interval of the difference, relative to the target precision.
+        """
+        return self.differences[metric].half_width(z) / precision
+
+    def is_resolved(self, metric, z, precision, stop_on_sign=False) :
+        """
+        :return: True once the difference is known to the target precision, or with stop_on_sign, once its
+                 confidence interval excludes zero, i.e. the better strategy is known.
+        """
+        difference = self.differences[metric]
+        half_width = difference.half_width(z)
+        if half_width <= precision :
+            return True
+
+        return stop_on_sign and abs(difference.mean) > half_width
+
+
+def run_wave(no_arms, num_iterations, epsilon, strategies, num_replications, seed_sequence) :
+    """
+    Runs one wave of replications of both strategies on the vectorized engine.
+    :return: Tuple (finals, cpu_seconds): finals maps every strategy to its per-replication final metrics,
+             cpu_seconds is the CPU time the wave took in the worker process.
+    """
+    start_time = time.process_time()
+    simulation = VectorizedSimulation(no_arms, num_iterations, epsilon, num_replications=num_replications,
+                                      seed=seed_sequence, strategies=strategies)
+    results = simulation.run()
+    finals = {name : {metric : curves[metric] for metric in METRICS} for name, curves in results.items()}
+
+    return finals, time.process_time() - start_time
+
+
+def run_comparison(files, strategies=('ucb1', 'epsilon_greedy'), metric='final_average_reward', precision=0.01,
+                   confidence=0.95, wave_size=50, min_waves=2, max_replications=2000, budget_seconds=None,
+                   stop_on_sign=False, workers=None, seed=None) :
+    """
+    Compares two strategies on every input file, running waves of replications until each comparison stops.
+    :param files: List of input file paths.
+    :param strategies: Pair of strategy names to compare.
+    :param metric: One of METRICS, the quantity whose difference decides when to stop.
+    :param precision: Target half width of the confidence interval of the difference.
+    :param confidence: Confidence level of the intervals.
+    :param wave_size: Number of replications per wave.
+    :param min_waves: Number of waves run before any stopping decision, so that the variance estimate is sound.
+    :param max_replications: Upper bound of the replications of a single input file.
+    :param budget_seconds: Upper bound of the total CPU seconds spent in the waves, or None for no bound.
+    :param stop_on_sign: Also stop an input file once the confidence interval of the difference excludes zero.
+    :param workers: Number of worker processes (defaults to the number of CPUs).
+    :param seed: Root seed (int or np.random.SeedSequence). Every input file gets its own child stream, and wave w of a file always gets
+                 the same seed, so the estimates only depend on how many waves a file received.
+    :return: List of Comparison objects, one per input file, in file order.
+    """
+    logger = logging.getLogger('staging')
+    if len(strategies) != 2 :
+        raise ValueError(f"Exactly two strategies are compared, got {list(strategies)}")
+    if metric not in METRICS :
+        raise ValueError(f"Invalid metric: {metric}")
+    if wave_size < 2 or min_waves < 1 :
+        raise ValueError("wave_size must be at least 2 and min_waves at least 1.")
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    root_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    child_sequences = root_sequence.spawn(len(files))
+    comparisons = [Comparison(file_path, child, strategies) for file_path, child in zip(files, child_sequences)]
+
+    def priority(comparison) :
+        # Comparisons still in their first waves have no usable variance yet and go before all others
+        return comparison.uncertainty(metric, z, precision) if comparison.num_waves >= min_waves else math.inf
+
+    def projected_seconds(comparison) :
+        # CPU time the next wave is expected to take: the mean of the comparison's own waves, or of all the
+        # waves completed so far while it has none
+        if comparison.num_waves :
+            return comparison.cpu_seconds / comparison.num_waves
+        completed_waves = sum(c.num_waves for c in comparisons)
+        return spent_seconds / completed_waves if completed_waves else 0.0
+
+    max_in_flight = workers or os.cpu_count() or 1
+    active = list(comparisons)
+    # Waves submitted but not completed, with their projected CPU time. A comparison has at most one wave in
+    # flight, since the wave index and the stopping decision depend on all its previous waves
+    in_flight = {}
+    spent_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=max_in_flight) as executor :
+        while True :
+            # Waves are submitted one at a time, the least resolved comparison first, as workers free up; once
+            # the spent and in-flight CPU time plus the projected cost of the next wave reaches the budget,
+            # nothing more is submitted
+            busy = {comparison for comparison, _ in in_flight.values()}
+            waiting = sorted((c for c in active if c not in busy), key=priority, reverse=True)
+            for comparison in waiting[:max_in_flight - len(in_flight)] :
+                projected = projected_seconds(comparison)
+                committed = spent_seconds + sum(seconds for _, seconds in in_flight.values())
+                if budget_seconds is not None and committed + projected >= budget_seconds :
+                    break
+                future = executor.submit(run_wave, comparison.no_arms, comparison.num_iterations, comparison.epsilon,
+                                         comparison.strategies,
+                                         min(wave_size, max_replications - comparison.num_replications),
+                                         comparison.wave_sequence(comparison.num_waves))
+                in_flight[future] = (comparison, projected)
+
+            if not in_flight :
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done :
+                comparison, _ = in_flight.pop(future)
+                finals, cpu_seconds = future.result()
+                comparison.add_wave(finals, cpu_seconds)
+                spent_seconds += cpu_seconds
+
+                if comparison.num_waves >= min_waves and comparison.is_resolved(metric, z, precision, stop_on_sign) :
+                    comparison.status = RESOLVED
+                elif comparison.num_replications >= max_replications :
+                    comparison.status = MAX_REPLICATIONS
+                else :
+                    continue
+                active.remove(comparison)
+                difference = comparison.differences[metric]
+                logger.info(f"{comparison.file_path}: {comparison.status} after {comparison.num_replications} "
+                            f"replications, difference {difference.mean:.4f} +/- {difference.half_width(z):.4f}")
+
+    if active :
+        for comparison in active :
+            comparison.status = BUDGET
+        logger.info(f"CPU budget of {budget_seconds} seconds spent after {spent_seconds:.1f} seconds, "
+                    f"{len(active)} comparisons unresolved")
+
+    return comparisons
+
+
+def comparison_rows(comparisons, confidence=0.95) :
+    """
+    :return: Summary rows, one per input file and strategy, plus one row for the difference of the pair
+             (strategy 'a - b').
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    rows = []
+    for comparison in comparisons :
+        first, second = comparison.strategies
+        estimates = [(name, {metric : comparison.statistics[(name, metric)] for metric in METRICS})
+                     for name in comparison.strategies]
+        estimates.append((f'{first} - {second}', comparison.differences))
+
+        for name, statistics in estimates :
+            rows.append({
+                'input_file' : comparison.file_path,
+                'no_arms' : comparison.no_arms,
+                'num_iterations' : comparison.num_iterations,
+                'epsilon' : comparison.epsilon,
+                'strategy' : name,
+                'num_replications' : comparison.num_replications,
+                'num_waves' : comparison.num_waves,
+                'status' : comparison.status,
+                'cpu_seconds' : comparison.cpu_seconds,
+                'final_mean' : statistics['final_average_reward'].mean,
+                'final_mean_half_width' : statistics['final_average_reward'].half_width(z),
+                'final_regret_mean' : statistics['final_regret'].mean,
+                'final_regret_half_width' : statistics['final_regret'].half_width(z),
+            })
+
+    return rows
+
+
+def write_comparison_summary(rows, output_dir, seed_entropy) :
+    """
+    Writes the comparison summary as CSV and JSON.
+    """
+    with open(os.path.join(output_dir, 'comparison.csv'), 'w', newline='') as csv_file :
+        writer = csv.DictWriter(csv_file, fieldnames=COMPARISON_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(os.path.join(output_dir, 'comparison.json'), 'w') as json_file :
+        json.dump({'seed_entropy' : seed_entropy, 'results' : rows}, json_file, indent=2)
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Compare two strategies over input files with adaptive "
+                                                 "replication and confidence-interval early stopping.")
+    parser.add_argument('source', help="Directory of '.txt' input files or a glob pattern.")
+    parser.add_argument('--strategies', nargs=2, default=['ucb1', 'epsilon_greedy'], choices=strategy_names(),
+                        help="The two strategies to compare.")
+    parser.add_argument('--metric', default='final_average_reward', choices=METRICS,
+                        help="Metric whose difference decides when to stop.")
+    parser.add_argument('--precision', type=float, default=0.01,
+                        help="Target half width of the confidence interval of the difference.")
+    parser.add_argument('--confidence', type=float, default=0.95, help="Confidence level of the intervals.")
+    parser.add_argument('--wave-size', type=int, default=50, help="Replications per wave.")
+    parser.add_argument('--min-waves', type=int, default=2, help="Waves run before any stopping decision.")
+    parser.add_argument('--max-replications', type=int, default=2000, help="Replications per input file at most.")
+    parser.add_argument('--budget-seconds', type=float, default=None, help="Total CPU seconds of the comparison.")
+    parser.add_argument('--stop-on-sign', action='store_true',
+                        help="Also stop once the interval of the difference excludes zero.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--seed', type=int, default=None, help="Root seed for reproducible runs.")
+    parser.add_argument('--output', default=os.path.join('output', 'comparison'), help="Output directory.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    files = discover_input_files(args.source)
+    root_sequence = np.random.SeedSequence(args.seed)
+    comparisons = run_comparison(files, args.strategies, metric=args.metric, precision=args.precision,
+                                 confidence=args.confidence, wave_size=args.wave_size, min_waves=args.min_waves,
+                                 max_replications=args.max_replications, budget_seconds=args.budget_seconds,
+                                 stop_on_sign=args.stop_on_sign, workers=args.workers, seed=root_sequence)
+
+    os.makedirs(args.output, exist_ok=True)
+    write_comparison_summary(comparison_rows(comparisons, args.confidence), args.output, root_sequence.entropy)
+
+
+if __name__ == '__main__' :
+    main()
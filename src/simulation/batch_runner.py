@@ -0,0 +1,166 @@
+"""
+Headless batch mode: runs the simulation for every input file of a directory (or glob) on a process pool.
+
+Usage (from the repository root):
+
+    python -m src.simulation.batch_runner input/ --workers 4 --replications 200 --seed 42
+
+This module only depends on NumPy and the standard library, so it never imports tkinter or matplotlib
+and can run on servers without a display.
+"""
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.model.input_file import read_input_file
+from src.simulation.vectorized_engine import VectorizedSimulation
+
+SUMMARY_FIELDS = ('input_file', 'no_arms', 'num_iterations', 'epsilon', 'num_replications', 'seed_entropy',
+                  'spawn_key', 'strategy', 'final_mean', 'final_p5', 'final_p50', 'final_p95', 'final_regret_mean',
+                  'elapsed_seconds', 'artifact')
+
+
+def discover_input_files(source) :
+    """
+    Resolves the input files of a batch.
+    :param source: Directory holding '.txt' input files, or a glob pattern.
+    :return: Sorted list of input file paths.
+    """
+    if os.path.isdir(source) :
+        pattern = os.path.join(source, '*.txt')
+    else :
+        pattern = source
+
+    files = sorted(glob.glob(pattern))
+    if not files :
+        raise FileNotFoundError(f"No input files found for: {source}")
+
+    return files
+
+
+def run_input_file(file_path, seed_sequence, num_replications, output_dir) :
+    """
+    Runs the vectorized simulation for one input file and writes its results artifact.
+    :param file_path: Path to the 3-line input file.
+    :param seed_sequence: np.random.SeedSequence dedicated to this input file.
+    :param num_replications: Number of independent replications.
+    :param output_dir: Directory in which the '.npz' artifact is written.
+    :return: List of summary rows, one per strategy.
+    """
+    no_arms, num_iterations, epsilon = read_input_file(file_path)
+
+    start_time = time.perf_counter()
+    simulation = VectorizedSimulation(no_arms, num_iterations, epsilon, num_replications=num_replications,
+                                      seed=seed_sequence)
+    results = simulation.run()
+    elapsed = time.perf_counter() - start_time
+
+    # One compressed artifact per input holding every curve of every strategy
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    artifact = os.path.join(output_dir, f'{stem}.npz')
+    arrays = {'percentile_levels' : simulation.percentiles}
+    for name, curves in results.items() :
+        for key, values in curves.items() :
+            arrays[f'{name}_{key}'] = values
+    np.savez_compressed(artifact, **arrays)
+
+    rows = []
+    for name, curves in results.items() :
+        p5, p50, p95 = np.percentile(curves['final_average_reward'], (5, 50, 95))
+        rows.append({
+            'input_file' : file_path,
+            'no_arms' : no_arms,
+            'num_iterations' : num_iterations,
+            'epsilon' : epsilon,
+            'num_replications' : num_replications,
+            'seed_entropy' : seed_sequence.entropy,
+            'spawn_key' : '/'.join(str(key) for key in seed_sequence.spawn_key),
+            'strategy' : name,
+            'final_mean' : float(curves['final_average_reward'].mean()),
+            'final_p5' : float(p5),
+            'final_p50' : float(p50),
+            'final_p95' : float(p95),
+            'final_regret_mean' : float(curves['final_regret'].mean()),
+            'elapsed_seconds' : elapsed,
+            'artifact' : artifact,
+        })
+
+    return rows
+
+
+def run_batch(files, output_dir, workers=None, num_replications=100, seed=None) :
+    """
+    Spreads the simulations of several input files across a process pool.
+    :param files: List of input file paths.
+    :param output_dir: Directory receiving one artifact per input plus the summary files.
+    :param workers: Number of worker processes (defaults to the number of CPUs).
+    :param num_replications: Number of independent replications per input file.
+    :param seed: Root seed. Every input file gets its own child stream, so results only depend on
+                 the seed and the sorted file list, never on the number of workers.
+    :return: List of summary rows.
+    """
+    logger = logging.getLogger('staging')
+    os.makedirs(output_dir, exist_ok=True)
+
+    root_sequence = np.random.SeedSequence(seed)
+    child_sequences = root_sequence.spawn(len(files))
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as executor :
+        futures = [executor.submit(run_input_file, file_path, child, num_replications, output_dir)
+                   for file_path, child in zip(files, child_sequences)]
+
+        for file_path, future in zip(files, futures) :
+            try :
+                file_rows = future.result()
+            except Exception as e :
+                logger.error(f"Simulation of {file_path} failed due to: {str(e)}")
+                continue
+            rows.extend(file_rows)
+            logger.info(f"Finished {file_path} in {file_rows[0]['elapsed_seconds']:.2f} seconds")
+
+    write_summary(rows, output_dir, root_sequence.entropy)
+
+    return rows
+
+
+def write_summary(rows, output_dir, seed_entropy) :
+    """
+    Writes the batch summary as CSV and JSON.
+    :param rows: Summary rows returned by run_input_file.
+    :param output_dir: Output directory of the batch.
+    :param seed_entropy: Entropy of the root SeedSequence, recorded so the batch can be reproduced.
+    """
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', newline='') as csv_file :
+        writer = csv.DictWriter(csv_file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as json_file :
+        json.dump({'seed_entropy' : seed_entropy, 'results' : rows}, json_file, indent=2)
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Run the bandit simulation headless over a set of input files.")
+    parser.add_argument('source', help="Directory of '.txt' input files or a glob pattern.")
+    parser.add_argument('--output', default=os.path.join('output', 'batch'), help="Output directory.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--replications', type=int, default=100, help="Replications per input file.")
+    parser.add_argument('--seed', type=int, default=None, help="Root seed for reproducible runs.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    files = discover_input_files(args.source)
+    run_batch(files, args.output, workers=args.workers, num_replications=args.replications, seed=args.seed)
+
+
+if __name__ == '__main__' :
+    main()
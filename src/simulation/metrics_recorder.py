@@ -0,0 +1,112 @@
+import numpy as np
+
+
+class MetricsRecorder :
+    def __init__(self, num_iterations, true_means, resync_interval=65536) :
+        """
+        Records the per-step metrics of one agent in O(1) per step into preallocated arrays.
+        :param num_iterations: Number of steps of the run, used to size every trajectory buffer.
+        :param true_means: True mean reward of every arm, used for the regret and the optimal arm rate.
+        :param resync_interval: Number of steps after which the running sum of the arm estimates is
+                                recomputed from scratch, to bound the accumulated rounding error.
+
+        Trajectories (one value per step):
+        average_estimate  - mean over arms of total_rewards / (num_pulls + 1e-6), the curve plotted by the GUI
+        average_reward    - running mean of the rewards received so far
+        cumulative_reward - sum of the rewards received so far
+        cumulative_regret - sum over steps of max(true_means) - true_means[arm]
+        optimal_arm_rate  - fraction of the steps so far in which the best arm was pulled
+        elapsed_times     - wall-clock seconds elapsed since the start of the run
+        arms              - the arm pulled at every step
+        rewards           - the reward received at every step
+        step_latency      - seconds spent in the select/pull/update of every step
+        """
+        if num_iterations < 1 :
+            raise ValueError("num_iterations must be at least 1.")
+
+        self.num_iterations = num_iterations
+        self.num_arms = len(true_means)
+        self.resync_interval = resync_interval
+
+        self.average_estimate = np.zeros(num_iterations)
+        self.average_reward = np.zeros(num_iterations)
+        self.cumulative_reward = np.zeros(num_iterations)
+        self.cumulative_regret = np.zeros(num_iterations)
+        self.optimal_arm_rate = np.zeros(num_iterations)
+        self.elapsed_times = np.zeros(num_iterations)
+        self.arms = np.zeros(num_iterations, dtype=np.int32)
+        self.rewards = np.zeros(num_iterations)
+        self.step_latency = np.zeros(num_iterations)
+
+        # Number of steps recorded so far
+        self.step = 0
+
+        # Per-arm state is kept in Python lists, which are faster than NumPy arrays for scalar access
+        self._true_means = np.asarray(true_means, dtype=float).tolist()
+        self._best_mean = max(self._true_means)
+        self._optimal_arms = {arm for arm, mean in enumerate(self._true_means) if mean == self._best_mean}
+        self._totals = [0.0] * self.num_arms
+        self._pulls = [0] * self.num_arms
+        self._estimates = [0.0] * self.num_arms
+
+        # Running aggregates
+        self._estimate_sum = 0.0
+        self._reward_sum = 0.0
+        self._regret_sum = 0.0
+        self._optimal_pulls = 0
+
+    def set_best_arm(self, true_means, best_arm, best_mean) :
+        """
+        Switches to the current best arm after the true means changed, so that the regret and the optimal
+        arm rate of the following steps are measured against it (dynamic regret).
+        :param true_means: Current true mean reward of every arm. The array is kept by reference, not copied,
+                           since the bandits update it in place.
+        :param best_arm: Arm with the highest current true mean, found once by the bandit for all recorders.
+        :param best_mean: True mean of best_arm.
+        """
+        self._true_means = true_means
+        self._best_mean = best_mean
+        self._optimal_arms = {best_arm}
+
+    def record(self, arm, reward, elapsed=0.0, latency=0.0) :
+        """
+        Records the outcome of one step.
+        :param arm: The arm that was pulled.
+        :param reward: The received reward.
+        :param elapsed: Wall-clock seconds elapsed since the start of the run.
+        :param latency: Seconds spent in the step itself.
+
+        Only the estimate of the pulled arm changes, so the mean over arms is kept up to date by
+        adding the change of that single estimate to a running sum instead of averaging all arms.
+        """
+        step = self.step
+        if step >= self.num_iterations :
+            raise IndexError(f"MetricsRecorder is full after {self.num_iterations} steps.")
+
+        total = self._totals[arm] + reward
+        pulls = self._pulls[arm] + 1
+        estimate = total / (pulls + 1e-6)
+        self._totals[arm] = total
+        self._pulls[arm] = pulls
+        self._estimate_sum += estimate - self._estimates[arm]
+        self._estimates[arm] = estimate
+
+        self._reward_sum += reward
+        self._regret_sum += self._best_mean - self._true_means[arm]
+        if arm in self._optimal_arms :
+            self._optimal_pulls += 1
+
+        if (step + 1) % self.resync_interval == 0 :
+            self._estimate_sum = sum(self._estimates)
+
+        self.average_estimate[step] = self._estimate_sum / self.num_arms
+        self.average_reward[step] = self._reward_sum / (step + 1)
+        self.cumulative_reward[step] = self._reward_sum
+        self.cumulative_regret[step] = self._regret_sum
+        self.optimal_arm_rate[step] = self._optimal_pulls / (step + 1)
+        self.elapsed_times[step] = elapsed
+        self.arms[step] = arm
+        self.rewards[step] = reward
+        self.step_latency[step] = latency
+
+        self.step = step + 1
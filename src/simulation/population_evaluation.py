@@ -0,0 +1,55 @@
+import numpy as np
+
+from src.algorithm.batched_agents import BatchedEpsilonGreedyAgent, DEFAULT_SUM_DTYPE
+from src.algorithm.kernels import average_rewards
+from src.model.batched_multi_armed_bandit import BatchedMultiArmedBandit
+
+
+def evaluate_epsilon_population(true_means, epsilons, num_iterations, seed=None, sum_dtype=DEFAULT_SUM_DTYPE) :
+    """
+    Evaluates a population of Epsilon-Greedy configurations against the same bandit in one pass.
+    :param true_means: True mean reward of every arm of the shared bandit (length K).
+    :param epsilons: Exploration rate of every agent of the population (length N).
+    :param num_iterations: Number of steps.
+    :param seed: Seed of the exploration decisions and of the reward noise.
+    :param sum_dtype: Floating point type of the total rewards (np.float32 halves the memory of the sums).
+    :return: Dictionary with, for every agent (arrays of length N):
+             'final_average_reward' - mean over arms of the kernels.average_rewards after the last step,
+             'mean_reward' - average of the rewards received over the run,
+             'cumulative_regret' - sum over steps of max(true_means) - true_means[arm],
+             'optimal_arm_rate' - fraction of the steps in which the best arm was pulled.
+
+    Every agent has its own reward noise; the true means are shared through a broadcast view, so the
+    bandit does not store N copies of them.
+    """
+    true_means = np.asarray(true_means, dtype=float)
+    epsilons = np.asarray(epsilons, dtype=float)
+    num_agents, num_arms = len(epsilons), len(true_means)
+
+    agent_stream, reward_stream = np.random.SeedSequence(seed).spawn(2)
+    population = BatchedEpsilonGreedyAgent(num_agents, num_arms, epsilons, rng=np.random.default_rng(agent_stream),
+                                           sum_dtype=sum_dtype)
+    bandit = BatchedMultiArmedBandit(num_agents, num_arms, rng=np.random.default_rng(reward_stream),
+                                     true_means=np.broadcast_to(true_means, (num_agents, num_arms)))
+
+    best_arm = int(np.argmax(true_means))
+    regrets = true_means.max() - true_means
+    reward_sums = np.zeros(num_agents)
+    regret_sums = np.zeros(num_agents)
+    optimal_pulls = np.zeros(num_agents, dtype=np.int64)
+
+    for _ in range(num_iterations) :
+        arms = population.select_arms()
+        rewards = bandit.pull_arms(arms)
+        population.update(arms, rewards)
+
+        reward_sums += rewards
+        regret_sums += regrets[arms]
+        optimal_pulls += arms == best_arm
+
+    return {
+        'final_average_reward' : average_rewards(population.total_rewards, population.num_pulls).mean(axis=1),
+        'mean_reward' : reward_sums / num_iterations,
+        'cumulative_regret' : regret_sums,
+        'optimal_arm_rate' : optimal_pulls / num_iterations,
+    }
@@ -0,0 +1,207 @@
+"""
+Opt-in per-phase profiler of the simulation loop.
+
+Usage (from the repository root):
+
+    python -m src.simulation.profiler input/input1.txt --sample-interval 10 --trace output/trace.json
+
+Every sample_interval-th iteration, the select_arm, pull_arm, update and record phases of every agent
+are timed separately. The durations are aggregated into per-phase counters and log2 histograms, kept
+as Chrome trace events (open the exported JSON in chrome://tracing or https://ui.perfetto.dev), and
+summarized as a text table at the end of the run. Iterations that are not sampled run the plain loop.
+"""
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+
+# Phases of one step of one agent, in execution order
+STEP_PHASES = ('select_arm', 'pull_arm', 'update', 'record')
+
+# Phases outside the steps, timed whenever they run since they only run every few thousand iterations
+LOOP_PHASES = ('write_results', 'logging')
+
+PHASES = STEP_PHASES + LOOP_PHASES
+
+# Histogram bucket b counts durations in [2^(b-1), 2^b) nanoseconds; 40 buckets reach about 9 minutes
+NUM_BUCKETS = 40
+
+DEFAULT_SAMPLE_INTERVAL = 100
+DEFAULT_MAX_TRACE_EVENTS = 200000
+
+
+class PhaseProfiler :
+    def __init__(self, sample_interval=DEFAULT_SAMPLE_INTERVAL, max_trace_events=DEFAULT_MAX_TRACE_EVENTS) :
+        """
+        Aggregates the durations of the phases of the simulation loop.
+        :param sample_interval: One iteration out of sample_interval is timed phase by phase.
+        :param max_trace_events: Number of trace events kept for the Chrome trace export; later events
+                                 are still aggregated, but not traced.
+        """
+        if sample_interval < 1 :
+            raise ValueError("sample_interval must be at least 1.")
+
+        self.sample_interval = sample_interval
+        self.max_trace_events = max_trace_events
+
+        # Aggregates per phase, indexed like PHASES
+        self.counts = np.zeros(len(PHASES), dtype=np.int64)
+        self.totals_ns = np.zeros(len(PHASES), dtype=np.int64)
+        self.max_ns = np.zeros(len(PHASES), dtype=np.int64)
+        self.histograms = np.zeros((len(PHASES), NUM_BUCKETS), dtype=np.int64)
+
+        # Trace events as (phase index, track, start ns, duration ns), converted only on export
+        self.events = []
+        self.tracks = {}
+
+        self.origin_ns = time.perf_counter_ns()
+        self.sampled_iterations = 0
+
+    def sampled(self, iteration) :
+        """
+        :return: Whether the phases of the given iteration are timed. Called once per iteration.
+        """
+        if iteration % self.sample_interval :
+            return False
+        self.sampled_iterations += 1
+        return True
+
+    def track(self, name) :
+        """
+        :return: Identifier of the trace track (one per agent) with the given name.
+        """
+        track = self.tracks.get(name)
+        if track is None :
+            track = self.tracks[name] = len(self.tracks) + 1
+        return track
+
+    def add(self, phase, start_ns, duration_ns, track=0) :
+        """
+        Adds one timed phase.
+        :param phase: Index of the phase in PHASES.
+        :param start_ns: perf_counter_ns at the start of the phase.
+        :param duration_ns: Duration in nanoseconds.
+        :param track: Trace track, see track().
+        """
+        self.counts[phase] += 1
+        self.totals_ns[phase] += duration_ns
+        if duration_ns > self.max_ns[phase] :
+            self.max_ns[phase] = duration_ns
+        self.histograms[phase, min(int(duration_ns).bit_length(), NUM_BUCKETS - 1)] += 1
+
+        if len(self.events) < self.max_trace_events :
+            self.events.append((phase, track, start_ns, duration_ns))
+
+    def add_step(self, track, timestamps) :
+        """
+        Adds the phases of one step of one agent.
+        :param track: Trace track of the agent.
+        :param timestamps: perf_counter_ns before select_arm and after each of the STEP_PHASES.
+        """
+        for phase in range(len(STEP_PHASES)) :
+            self.add(phase, timestamps[phase], timestamps[phase + 1] - timestamps[phase], track)
+
+    def percentile_ns(self, phase, q) :
+        """
+        :return: Upper bound of the histogram bucket holding the q-th percentile of a phase, in nanoseconds,
+                 capped at the largest duration seen.
+        """
+        if not self.counts[phase] :
+            return 0
+        bucket = int(np.searchsorted(np.cumsum(self.histograms[phase]), q / 100 * self.counts[phase]))
+        return min(2 ** bucket, int(self.max_ns[phase]))
+
+    def summary(self) :
+        """
+        :return: Text table with the count, mean, max and approximate p50/p99 of every phase, and the share
+                 of every step phase in the sampled step time.
+        """
+        step_total = self.totals_ns[:len(STEP_PHASES)].sum()
+        lines = [f"Phase profile ({self.sampled_iterations} sampled iterations, one every {self.sample_interval})",
+                 f"{'phase':<15}{'count':>10}{'mean':>12}{'p50 <=':>12}{'p99 <=':>12}{'max':>12}{'share':>8}"]
+
+        for phase, name in enumerate(PHASES) :
+            count = self.counts[phase]
+            if not count :
+                continue
+            share = f"{100 * self.totals_ns[phase] / step_total:.1f}%" if phase < len(STEP_PHASES) and step_total \
+                else ''
+            lines.append(f"{name:<15}{count:>10}{_format_ns(self.totals_ns[phase] / count):>12}"
+                         f"{_format_ns(self.percentile_ns(phase, 50)):>12}{_format_ns(self.percentile_ns(phase, 99)):>12}"
+                         f"{_format_ns(self.max_ns[phase]):>12}{share:>8}")
+
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, path) :
+        """
+        Writes the trace events in the Chrome trace-event JSON format, with one track per agent.
+        """
+        events = [{'name' : 'thread_name', 'ph' : 'M', 'pid' : 1, 'tid' : track, 'args' : {'name' : name}}
+                  for name, track in self.tracks.items()]
+        events.append({'name' : 'thread_name', 'ph' : 'M', 'pid' : 1, 'tid' : 0, 'args' : {'name' : 'loop'}})
+
+        for phase, track, start_ns, duration_ns in self.events :
+            events.append({
+                'name' : PHASES[phase],
+                'cat' : 'simulation',
+                'ph' : 'X',
+                'pid' : 1,
+                'tid' : track,
+                # Trace timestamps and durations are in microseconds
+                'ts' : (start_ns - self.origin_ns) / 1e3,
+                'dur' : duration_ns / 1e3,
+            })
+
+        with open(path, 'w') as trace_file :
+            json.dump({'traceEvents' : events, 'displayTimeUnit' : 'ns'}, trace_file)
+
+
+def _format_ns(value) :
+    if value >= 1e6 :
+        return f"{value / 1e6:.2f}ms"
+    if value >= 1e3 :
+        return f"{value / 1e3:.1f}us"
+    return f"{value:.0f}ns"
+
+
+def main(argv=None) :
+    # The simulation loop imports this module, so the command line dependencies are imported here
+    from src.algorithm.strategy_registry import get_strategy, strategy_names
+    from src.load_logging_configuration import load_logging_config
+    from src.model.input_file import read_input_file
+    from src.model.multi_armed_bandit import MultiArmedBandit
+    from src.simulation.metrics_recorder import MetricsRecorder
+    from src.simulation.simulation_loop import run_simulation_loop
+
+    parser = argparse.ArgumentParser(description="Profile the phases of a simulation run.")
+    parser.add_argument('input_file', help="3-line input file (arms, iterations, epsilon).")
+    parser.add_argument('--strategies', nargs='+', default=None, choices=strategy_names(),
+                        help="Strategies to run (default: all registered).")
+    parser.add_argument('--sample-interval', type=int, default=DEFAULT_SAMPLE_INTERVAL,
+                        help="Time one iteration out of this many.")
+    parser.add_argument('--trace', default=None, help="Write a Chrome trace-event JSON file.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the bandit.")
+    args = parser.parse_args(argv)
+
+    # Per-step logs would dominate the profile of short steps
+    load_logging_config()
+    logging.getLogger('staging').setLevel(logging.WARNING)
+
+    no_arms, num_iterations, epsilon = read_input_file(args.input_file)
+    bandit = MultiArmedBandit(no_arms, reward_source='common', seed=args.seed)
+    agents = {name : get_strategy(name).create_agent(no_arms, epsilon) for name in args.strategies or strategy_names()}
+    recorders = {name : MetricsRecorder(num_iterations, bandit.true_means) for name in agents}
+
+    profiler = PhaseProfiler(args.sample_interval)
+    run_simulation_loop(bandit, agents, recorders, num_iterations, profiler=profiler)
+
+    print(profiler.summary())
+    if args.trace :
+        profiler.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == '__main__' :
+    main()
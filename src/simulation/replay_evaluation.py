@@ -0,0 +1,374 @@
+"""
+Offline evaluation of agents on logged interactions, with rejection-sampling replay and IPS estimators.
+
+Usage (from the repository root):
+
+    python -m src.simulation.replay_evaluation output/logs/traffic --strategies ucb1 epsilon_greedy \
+        --epsilons 0.05 0.1 0.2 --workers 4
+    python -m src.simulation.replay_evaluation output/logs/traffic --import-csv decisions.csv --arms 10
+    python -m src.simulation.replay_evaluation output/logs/synthetic --generate 10000000 --arms 10
+
+The log (see src.model.interaction_log) is streamed through every agent variant in chunks, so the memory
+used does not depend on the size of the log. Each variant runs in its own worker process; all workers map
+the same log files, which the operating system keeps once in its page cache.
+
+For every variant, one pass over the log gives:
+replay_reward - rejection-sampling replay (Li et al., 2011): the agent only learns from, and is only scored
+                on, the events in which the logged arm is the arm it selects. Unbiased for uniformly random
+                logging policies.
+ips           - inverse propensity scoring: sum over matched events of reward / propensity, divided by the
+                number of events. Unbiased for the value of a policy that does not learn, whatever the
+                (known) logging propensities, since the agent draws a fresh decision for every event; for a
+                learning agent it averages the successive policies the agent goes through during the replay.
+snips         - self-normalized IPS: the same sum divided by the sum of 1 / propensity over matched events,
+                which trades a small bias for a much lower variance.
+"""
+import argparse
+import csv
+import functools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.algorithm.agents import LinUCBAgent
+from src.algorithm.strategy_registry import get_strategy, strategy_names
+from src.model.interaction_log import InteractionLog, InteractionLogWriter, import_csv, DEFAULT_CHUNK_SIZE
+
+REPLAY_FIELDS = ('variant', 'events', 'matches', 'replay_reward', 'ips', 'snips', 'logged_reward',
+                 'elapsed_seconds')
+
+# Upper bound of the (K x d x m) intermediate values when a contextual agent scores m logged contexts at once
+CONTEXT_BLOCK_VALUES = 1 << 22
+
+
+def replay_agent(agent, log, chunk_size=DEFAULT_CHUNK_SIZE) :
+    """
+    Streams a log through one agent.
+    :param agent: Agent exposing select_arm(), select_many(k) and update(arm, reward), or a contextual agent
+                  (contextual = True) exposing select_many(contexts) and update(arm, reward, context).
+    :param log: InteractionLog to replay.
+    :param chunk_size: Number of events held in memory at once.
+    :return: Dictionary with the number of 'events' and 'matches' and the 'replay_reward', 'ips', 'snips'
+             and 'logged_reward' (mean reward of the logging policy) estimates.
+    """
+    totals = {'matches' : 0, 'matched_rewards' : 0.0, 'weighted_rewards' : 0.0, 'weights' : 0.0,
+              'logged_rewards' : 0.0}
+
+    if getattr(agent, 'contextual', False) :
+        if log.dimension is None :
+            raise ValueError("A contextual agent needs a log with contexts.")
+        _replay_contextual(agent, log, chunk_size, totals)
+    else :
+        _replay_context_free(agent, log, chunk_size, totals)
+
+    matches = totals['matches']
+    return {
+        'events' : log.num_events,
+        'matches' : matches,
+        'replay_reward' : totals['matched_rewards'] / matches if matches else float('nan'),
+        'ips' : totals['weighted_rewards'] / log.num_events if log.num_events else float('nan'),
+        'snips' : totals['weighted_rewards'] / totals['weights'] if totals['weights'] else float('nan'),
+        'logged_reward' : totals['logged_rewards'] / log.num_events if log.num_events else float('nan'),
+    }
+
+
+def _match(agent, arm, reward, propensity, totals, *context) :
+    """
+    Feeds a matched event to the agent and adds it to the running sums of the estimators.
+    """
+    agent.update(arm, reward, *context)
+
+    totals['matches'] += 1
+    totals['matched_rewards'] += reward
+    totals['weighted_rewards'] += reward / propensity
+    totals['weights'] += 1.0 / propensity
+
+
+def _replay_context_free(agent, log, chunk_size, totals) :
+    """
+    Replay of an agent that ignores contexts. The agent draws one decision per logged event, except where
+    holding a decision until the next event that logged the same arm is provably equivalent: for agents whose
+    decision only depends on what they learned (deterministic = True), and for logs with uniform propensities,
+    where the logged arm of every event is independent of the decision and equally likely to match any arm.
+    """
+    if getattr(agent, 'deterministic', False) or _uniform_propensities(log, chunk_size) :
+        _replay_held(agent, log, chunk_size, totals)
+    else :
+        _replay_drawn(agent, log, chunk_size, totals)
+
+
+def _uniform_propensities(log, chunk_size) :
+    """
+    :return: True if every event of the log was logged with propensity 1 / num_arms.
+    """
+    propensities = log.columns['propensity']
+    for start in range(0, log.num_events, chunk_size) :
+        if not np.allclose(propensities[start:start + chunk_size], 1.0 / log.num_arms, rtol=1e-9, atol=0) :
+            return False
+    return True
+
+
+def _replay_held(agent, log, chunk_size, totals) :
+    """
+    Holds each decision until the next event that logged the same arm, which is looked up in the per-arm event
+    positions of the chunk. The Python work is then proportional to the number of matches rather than to the
+    number of events.
+    """
+    decision = None
+    for chunk in log.chunks(chunk_size) :
+        arms, rewards, propensities = chunk['arm'], chunk['reward'], chunk['propensity']
+        totals['logged_rewards'] += float(rewards.sum())
+
+        # Positions of the events of every arm, in increasing order
+        order = np.argsort(arms, kind='stable')
+        bounds = np.searchsorted(arms[order], np.arange(log.num_arms + 1)).tolist()
+
+        position = 0
+        while True :
+            if decision is None :
+                decision = int(agent.select_arm())
+
+            events = order[bounds[decision]:bounds[decision + 1]]
+            index = np.searchsorted(events, position)
+            if index == len(events) :
+                # No later event of this arm in the chunk; the decision is carried over to the next one
+                break
+
+            event = int(events[index])
+            _match(agent, decision, float(rewards[event]), float(propensities[event]), totals)
+            position = event + 1
+            decision = None
+
+
+def _replay_drawn(agent, log, chunk_size, totals) :
+    """
+    Draws one decision per event. The agent does not change until it learns from a match, so the decisions of
+    a block of consecutive events are drawn with one select_many call against the frozen statistics; the first
+    event of the block whose logged arm is its decision is fed to the agent, and the next block starts right
+    after it.
+    """
+    block_size = max(1, log.num_arms)
+    for chunk in log.chunks(chunk_size) :
+        arms, rewards, propensities = chunk['arm'], chunk['reward'], chunk['propensity']
+        totals['logged_rewards'] += float(rewards.sum())
+
+        position = 0
+        while position < len(arms) :
+            stop = min(position + block_size, len(arms))
+            matched = np.flatnonzero(agent.select_many(stop - position) == arms[position:stop])
+            if len(matched) == 0 :
+                position = stop
+                continue
+
+            event = position + int(matched[0])
+            _match(agent, int(arms[event]), float(rewards[event]), float(propensities[event]), totals)
+            position = event + 1
+
+
+def _replay_contextual(agent, log, chunk_size, totals) :
+    """
+    Replay of a contextual agent. Its decisions are computed for blocks of consecutive events with one
+    select_many call against the frozen model; the first event of a block whose logged arm is the selected
+    one is fed to the agent, and the next block starts right after it.
+    """
+    block_size = max(1, min(log.num_arms, CONTEXT_BLOCK_VALUES // (log.num_arms * log.dimension)))
+    for chunk in log.chunks(chunk_size) :
+        arms, rewards, propensities = chunk['arm'], chunk['reward'], chunk['propensity']
+        contexts = chunk['context'].astype(float)
+        totals['logged_rewards'] += float(rewards.sum())
+
+        position = 0
+        while position < len(arms) :
+            stop = min(position + block_size, len(arms))
+            matched = np.flatnonzero(agent.select_many(contexts[position:stop]) == arms[position:stop])
+            if len(matched) == 0 :
+                position = stop
+                continue
+
+            event = position + int(matched[0])
+            _match(agent, int(arms[event]), float(rewards[event]), float(propensities[event]), totals,
+                   contexts[event])
+            position = event + 1
+
+
+def _evaluate_variant(log_dir, create_agent, chunk_size, seed_sequence) :
+    """
+    Worker process entry point: opens the log, creates the agent and replays the log through it.
+    :return: Result dictionary of replay_agent, with the 'elapsed_seconds' of the replay.
+    """
+    start_time = time.perf_counter()
+    log = InteractionLog(log_dir)
+    result = replay_agent(create_agent(log.num_arms, np.random.default_rng(seed_sequence)), log, chunk_size)
+    result['elapsed_seconds'] = time.perf_counter() - start_time
+
+    return result
+
+
+def evaluate_variants(log_dir, variants, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=None) :
+    """
+    Replays one log through several agent variants, one worker process per variant.
+    :param log_dir: Directory of the interaction log.
+    :param variants: Dictionary mapping variant names to picklable functions creating the agent from the
+                     number of arms and the np.random.Generator it draws from (e.g. functools.partial
+                     objects, see strategy_variants).
+    :param workers: Number of worker processes (defaults to the number of CPUs).
+    :param chunk_size: Number of events every worker holds in memory at once.
+    :param seed: Root seed. Every variant gets the Generator of its own child stream, in the order of the
+                 dictionary, so its replay does not depend on the worker process it runs in.
+    :return: Dictionary mapping every variant name to its result dictionary.
+    """
+    logger = logging.getLogger('staging')
+    child_sequences = np.random.SeedSequence(seed).spawn(len(variants))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor :
+        futures = {name : executor.submit(_evaluate_variant, log_dir, create_agent, chunk_size, child)
+                   for (name, create_agent), child in zip(variants.items(), child_sequences)}
+
+        for name, future in futures.items() :
+            try :
+                results[name] = future.result()
+            except Exception as e :
+                logger.error(f"Replay of {name} failed due to: {str(e)}")
+                continue
+            logger.info(f"Replayed {name} in {results[name]['elapsed_seconds']:.2f} seconds: "
+                        f"{results[name]['matches']} matches")
+
+    return results
+
+
+def _registered_agent(strategy, epsilon, no_arm, rng) :
+    return get_strategy(strategy).create_agent(no_arm, epsilon, rng)
+
+
+def _linucb_agent(dimension, alpha, no_arm, rng) :
+    # LinUCB is deterministic, so the Generator is not needed
+    return LinUCBAgent(no_arm, dimension, alpha=alpha)
+
+
+def strategy_variants(strategies, epsilons=(0.1,), linucb_alphas=(), dimension=None) :
+    """
+    :param strategies: Names of registered strategies.
+    :param epsilons: Exploration rates; the strategies that use one get one variant per value.
+    :param linucb_alphas: Exploration widths of LinUCB variants (requires the context dimension).
+    :param dimension: Context dimension of the log.
+    :return: Dictionary mapping variant names to picklable agent factories, for evaluate_variants.
+    """
+    variants = {}
+    for strategy in strategies :
+        if get_strategy(strategy).uses_epsilon :
+            for epsilon in epsilons :
+                variants[f'{strategy}(epsilon={epsilon})'] = functools.partial(_registered_agent, strategy, epsilon)
+        else :
+            variants[strategy] = functools.partial(_registered_agent, strategy, 0.0)
+
+    for alpha in linucb_alphas :
+        if dimension is None :
+            raise ValueError("LinUCB variants need a log with contexts.")
+        variants[f'linucb(alpha={alpha})'] = functools.partial(_linucb_agent, dimension, alpha)
+
+    return variants
+
+
+def generate_uniform_log(log_dir, num_arms, num_events, dimension=None, seed=None, chunk_size=DEFAULT_CHUNK_SIZE) :
+    """
+    Writes a synthetic log of a uniformly random logging policy, for trying the evaluator out.
+    The rewards follow MultiArmedBandit (true means from N(0, 1)) or, with a dimension, ContextualBandit
+    (linear rewards theta_a . x with theta_a from N(0, I / d) and x from N(0, I)), plus N(0, 1) noise.
+    :return: The number of written events.
+    """
+    rng = np.random.default_rng(seed)
+    if dimension is None :
+        true_means = rng.normal(0, 1, num_arms)
+    else :
+        theta = rng.normal(0, 1 / np.sqrt(dimension), (num_arms, dimension))
+
+    writer = InteractionLogWriter(log_dir, num_arms, dimension=dimension,
+                                  metadata={'source' : 'uniform logging policy', 'seed' : seed})
+    for start in range(0, num_events, chunk_size) :
+        count = min(chunk_size, num_events - start)
+        arms = rng.integers(0, num_arms, count)
+        contexts = None
+        if dimension is None :
+            means = true_means[arms]
+        else :
+            contexts = rng.standard_normal((count, dimension))
+            means = np.einsum('nd,nd->n', theta[arms], contexts)
+        writer.append(arms, means + rng.standard_normal(count), np.full(count, 1.0 / num_arms), contexts)
+        writer.flush()
+    writer.close()
+
+    return writer.num_events
+
+
+def write_replay_summary(results, output_dir, log_dir) :
+    """
+    Writes one CSV row and JSON entry per variant.
+    """
+    rows = [dict(variant=name, **{field : result[field] for field in REPLAY_FIELDS[1:]})
+            for name, result in results.items()]
+
+    with open(os.path.join(output_dir, 'replay.csv'), 'w', newline='') as csv_file :
+        writer = csv.DictWriter(csv_file, fieldnames=REPLAY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(os.path.join(output_dir, 'replay.json'), 'w') as json_file :
+        json.dump({'log_dir' : os.path.abspath(log_dir), 'results' : rows}, json_file, indent=2)
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Evaluate agents offline on a log of past decisions.")
+    parser.add_argument('log_dir', help="Directory of the interaction log.")
+    parser.add_argument('--import-csv', default=None,
+                        help="First convert this CSV log (arm, reward, propensity, context_*) into log_dir.")
+    parser.add_argument('--generate', type=int, default=None,
+                        help="First write a synthetic log with this many events of a uniform logging policy.")
+    parser.add_argument('--arms', type=int, default=None, help="Number of arms, for --import-csv and --generate.")
+    parser.add_argument('--dimension', type=int, default=None, help="Context dimension, for --generate.")
+    parser.add_argument('--strategies', nargs='+', default=None, choices=strategy_names(),
+                        help="Strategies to evaluate (default: all registered).")
+    parser.add_argument('--epsilons', type=float, nargs='+', default=[0.1],
+                        help="Exploration rates of the strategies that use one.")
+    parser.add_argument('--linucb-alphas', type=float, nargs='*', default=[],
+                        help="Also evaluate LinUCB with these exploration widths (logs with contexts).")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes.")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Events per chunk.")
+    parser.add_argument('--seed', type=int, default=None, help="Root seed for reproducible runs.")
+    parser.add_argument('--output', default=os.path.join('output', 'replay'), help="Output directory.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if (args.import_csv is not None or args.generate is not None) and args.arms is None :
+        parser.error("--arms is required with --import-csv and --generate")
+    if args.import_csv is not None :
+        import_csv(args.import_csv, args.log_dir, args.arms, chunk_size=args.chunk_size)
+    elif args.generate is not None :
+        generate_uniform_log(args.log_dir, args.arms, args.generate, dimension=args.dimension, seed=args.seed,
+                             chunk_size=args.chunk_size)
+
+    log = InteractionLog(args.log_dir)
+    variants = strategy_variants(args.strategies or strategy_names(), args.epsilons, args.linucb_alphas,
+                                 log.dimension)
+    results = evaluate_variants(args.log_dir, variants, workers=args.workers, chunk_size=args.chunk_size,
+                                seed=args.seed)
+
+    os.makedirs(args.output, exist_ok=True)
+    write_replay_summary(results, args.output, args.log_dir)
+
+    print(f"{'variant':<32}{'matches':>10}{'replay':>10}{'ips':>10}{'snips':>10}")
+    for name, result in results.items() :
+        print(f"{name:<32}{result['matches']:>10}{result['replay_reward']:>10.4f}{result['ips']:>10.4f}"
+              f"{result['snips']:>10.4f}")
+    if results :
+        print(f"logging policy: {next(iter(results.values()))['logged_reward']:.4f} average reward over "
+              f"{log.num_events} events")
+
+
+if __name__ == '__main__' :
+    main()
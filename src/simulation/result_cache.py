@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Default upper bound of the cache size on disk
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Source files whose content determines the results of a cached run
+_VERSIONED_MODULES = (
+    os.path.join('algorithm', 'kernels.py'),
+    os.path.join('algorithm', 'batched_agents.py'),
+    os.path.join('algorithm', 'strategy_registry.py'),
+    os.path.join('model', 'batched_multi_armed_bandit.py'),
+    os.path.join('simulation', 'vectorized_engine.py'),
+)
+
+_code_version = None
+
+
+def code_version() :
+    """
+    :return: Hash of the source files that produce the cached trajectories, so that any change to the
+             simulation code invalidates the cache entries computed with the previous code.
+    """
+    global _code_version
+
+    if _code_version is None :
+        package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha256()
+        for module in _VERSIONED_MODULES :
+            with open(os.path.join(package_dir, module), 'rb') as source :
+                digest.update(source.read())
+        _code_version = digest.hexdigest()[:16]
+
+    return _code_version
+
+
+class ResultCache :
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES) :
+        """
+        Content-addressed cache of finished trajectories on disk, with size-bounded LRU eviction.
+        :param directory: Directory holding one '.npz' file per entry.
+        :param max_bytes: Upper bound of the total size of the entries; the least recently used
+                          entries are evicted when it is exceeded.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        # A cache opened with a lower limit than it was written with shrinks right away
+        self.evict()
+
+    @staticmethod
+    def key(parameters) :
+        """
+        :param parameters: JSON-serializable description of a run (agent type, parameters, seed).
+        :return: Hex digest of the parameters together with the code version.
+        """
+        payload = json.dumps({'parameters' : parameters, 'code_version' : code_version()}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key) :
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key) :
+        """
+        :return: Dictionary of the cached arrays, or None on a miss.
+        """
+        path = self._path(key)
+        try :
+            with np.load(path) as entry :
+                arrays = {name : entry[name] for name in entry.files}
+        except (FileNotFoundError, OSError, ValueError) :
+            return None
+
+        # The modification time records the last use and drives the LRU eviction
+        os.utime(path)
+        return arrays
+
+    def put(self, key, arrays) :
+        """
+        Stores the arrays of a run and evicts the least recently used entries if the cache is too big.
+        """
+        path = self._path(key)
+
+        # Written under a temporary name and renamed, so readers never see a partial entry
+        temporary_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(temporary_path, **arrays)
+        os.replace(temporary_path, path)
+
+        self.evict()
+
+    def evict(self) :
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        for name in os.listdir(self.directory) :
+            if not name.endswith('.npz') or '.tmp.' in name :
+                continue
+            try :
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError :
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries) :
+            if total <= self.max_bytes :
+                break
+            try :
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError :
+                pass
+            total -= size
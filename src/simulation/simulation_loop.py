@@ -0,0 +1,134 @@
+import logging
+import time
+
+from src.load_logging_configuration import DEFAULT_LOG_INTERVAL
+from src.simulation.profiler import PHASES
+
+
+def run_simulation_loop(bandit, agents, recorders, num_iterations, progress_callback=None,
+                        progress_interval=1000, cancel_event=None, results_writer=None, flush_interval=65536,
+                        profiler=None) :
+    """
+    Runs several single agents against the same bandit, one step of every agent per iteration.
+    :param bandit: The MultiArmedBandit (or ContextualBandit) the agents pull from.
+    :param agents: Dictionary mapping agent names to agents exposing select_arm() and update(arm, reward).
+                   Contextual agents (contextual = True, e.g. LinUCBAgent) are given the context of the
+                   bandit as select_arm(context); the other agents ignore it.
+                   The position of an agent in the dictionary is used as its reward stream, so that with
+                   common random numbers every agent sees the same noise for the same (arm, pull count).
+    :param recorders: Dictionary mapping the same names to their MetricsRecorder.
+    :param num_iterations: Number of iterations to simulate.
+    :param progress_callback: Optional callable invoked with the number of completed iterations every
+                              progress_interval iterations and once at the end.
+    :param progress_interval: Number of iterations between two progress callbacks.
+    :param cancel_event: Optional threading.Event; the loop stops after the current iteration once it is set.
+    :param results_writer: Optional ResultsWriter the recorded trajectories are streamed to.
+    :param flush_interval: Number of iterations written to the results_writer per chunk.
+    :param profiler: Optional PhaseProfiler (see src.simulation.profiler). On its sampled iterations the
+                     select_arm, pull_arm, update and record phases of every agent are timed separately.
+    :return: Number of completed iterations (smaller than num_iterations if the run was cancelled).
+
+    A non-stationary bandit (a drifting MultiArmedBandit or a ContextualBandit) is advanced after every
+    iteration, and the recorders are given the new true means whenever they change.
+
+    Every recorder receives, per step, the time elapsed since the start of the run (cumulative, measured
+    when the iteration starts) and the latency of the step itself (select, pull and update of that agent only).
+    """
+    logger = logging.getLogger('staging')
+    streams = [(stream, _select_function(agent, bandit), agent, recorders[name])
+               for stream, (name, agent) in enumerate(agents.items())]
+    tracks = [profiler.track(name) for name in agents] if profiler is not None else None
+    drifting = not getattr(bandit, 'stationary', True)
+    clock = time.perf_counter
+    clock_ns = time.perf_counter_ns
+
+    start_time = clock()
+    completed = 0
+    written = 0
+    for i in range(num_iterations) :
+        if cancel_event is not None and cancel_event.is_set() :
+            logger.info(f"Simulation cancelled after {completed} iterations")
+            break
+
+        elapsed = clock() - start_time
+        if profiler is not None and profiler.sampled(i) :
+            for stream, select_arm, agent, recorder in streams :
+                # Same step as below, with a timestamp between every phase
+                t0 = clock_ns()
+                arm = select_arm()
+                t1 = clock_ns()
+                reward = bandit.pull_arm(arm, stream=stream)
+                t2 = clock_ns()
+                agent.update(arm, reward)
+                t3 = clock_ns()
+                recorder.record(arm, reward, elapsed, (t3 - t0) / 1e9)
+                profiler.add_step(tracks[stream], (t0, t1, t2, t3, clock_ns()))
+        else :
+            for stream, select_arm, agent, recorder in streams :
+                # Select an arm, pull it, update the agent and record the metrics in O(1)
+                step_start = clock()
+                arm = select_arm()
+                reward = bandit.pull_arm(arm, stream=stream)
+                agent.update(arm, reward)
+                recorder.record(arm, reward, elapsed, clock() - step_start)
+
+        completed = i + 1
+
+        if drifting and bandit.advance() :
+            for recorder in recorders.values() :
+                recorder.set_best_arm(bandit.true_means, bandit.best_arm, bandit.best_mean)
+
+        if results_writer is not None and completed - written == flush_interval :
+            written = _timed(profiler, 'write_results', _write_results, results_writer, recorders, written, completed)
+
+        # Log the elapsed time every DEFAULT_LOG_INTERVAL iterations
+        if completed % DEFAULT_LOG_INTERVAL == 0 :
+            _timed(profiler, 'logging', logger.info, f"Iteration {completed} reached after {elapsed:.6f} seconds")
+
+        if progress_callback is not None and completed % progress_interval == 0 :
+            progress_callback(completed)
+
+    if results_writer is not None :
+        _timed(profiler, 'write_results', _write_results, results_writer, recorders, written, completed)
+
+    if progress_callback is not None and completed % progress_interval != 0 :
+        progress_callback(completed)
+
+    return completed
+
+
+def _select_function(agent, bandit) :
+    """
+    :return: Callable without arguments returning the next arm of the agent: its select_arm method, or for
+             contextual agents a function passing the current context of the bandit.
+    """
+    if not getattr(agent, 'contextual', False) :
+        return agent.select_arm
+
+    return lambda : agent.select_arm(bandit.context)
+
+
+def _timed(profiler, phase, function, *args) :
+    """
+    Calls function(*args), timing it as the given loop phase when a profiler is attached.
+    :return: The result of the call.
+    """
+    if profiler is None :
+        return function(*args)
+
+    start = time.perf_counter_ns()
+    result = function(*args)
+    profiler.add(PHASES.index(phase), start, time.perf_counter_ns() - start)
+    return result
+
+
+def _write_results(results_writer, recorders, start, stop) :
+    """
+    Streams the steps [start, stop) of every recorder to the results writer.
+    :return: The new number of written steps.
+    """
+    for name, recorder in recorders.items() :
+        results_writer.write_recorder(name, recorder, start, stop)
+    results_writer.flush(stop)
+
+    return stop
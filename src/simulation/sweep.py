@@ -0,0 +1,185 @@
+"""
+Parameter sweeps over arms, iterations, epsilon and seeds, backed by a persistent result cache.
+
+Usage (from the repository root):
+
+    python -m src.simulation.sweep --arms 10 --iterations 1000 --epsilons 0.05 0.1 0.2 0.5 --seeds 1 2 3
+
+The strategies whose registry entry does not use epsilon are run once per (arms, iterations, seed) and
+shared by every epsilon of the grid. Finished runs are stored in the cache directory, so re-running an
+overlapping sweep only computes the cells that were not run before.
+"""
+import argparse
+import csv
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from src.simulation.result_cache import ResultCache, DEFAULT_MAX_BYTES
+from src.algorithm.strategy_registry import get_strategy, strategy_names
+from src.simulation.vectorized_engine import VectorizedSimulation
+
+DEFAULT_CACHE_DIR = os.path.join('output', 'cache')
+
+SWEEP_FIELDS = ('no_arms', 'num_iterations', 'epsilon', 'seed', 'num_replications', 'strategy', 'final_mean',
+                'final_regret_mean')
+
+
+def run_parameters(strategy, no_arms, num_iterations, epsilon, seed, num_replications) :
+    """
+    :return: Parameters that fully determine the results of one strategy run. Epsilon is dropped for
+             the strategies that do not use it, so their runs are shared by every epsilon of a sweep.
+    """
+    parameters = {
+        'strategy' : strategy,
+        'no_arms' : no_arms,
+        'num_iterations' : num_iterations,
+        'seed' : seed,
+        'num_replications' : num_replications,
+    }
+    if get_strategy(strategy).uses_epsilon :
+        parameters['epsilon'] = epsilon
+
+    return parameters
+
+
+def run_strategy(parameters) :
+    """
+    Runs a single strategy of the vectorized engine.
+    :param parameters: Dictionary returned by run_parameters.
+    :return: Dictionary of result arrays, as returned by VectorizedSimulation.run for that strategy.
+    """
+    strategy = parameters['strategy']
+    simulation = VectorizedSimulation(parameters['no_arms'], parameters['num_iterations'],
+                                      parameters.get('epsilon', 0.0),
+                                      num_replications=parameters['num_replications'],
+                                      seed=parameters['seed'], strategies=(strategy,))
+
+    return simulation.run()[strategy]
+
+
+def run_sweep(arms_grid, iterations_grid, epsilon_grid, seeds, num_replications=1, cache=None, workers=1,
+              strategies=None) :
+    """
+    Runs every combination of the grids, computing each distinct agent run at most once.
+    :param arms_grid: Numbers of arms.
+    :param iterations_grid: Numbers of iterations.
+    :param epsilon_grid: Exploration rates of the Epsilon-Greedy agent.
+    :param seeds: Integer seeds. Runs with the same seed face the same true means.
+    :param num_replications: Number of replications of every run.
+    :param cache: ResultCache holding finished runs, or None to compute everything.
+    :param workers: Number of worker processes used for the runs missing from the cache.
+    :param strategies: Names of the strategies to run (all registered strategies by default).
+    :return: Tuple (results, stats):
+             results - dictionary mapping every cell (no_arms, num_iterations, epsilon, seed) to a
+                       dictionary {strategy: result arrays},
+             stats - dictionary with the number of 'cells', distinct 'runs', 'cached' and 'computed' runs.
+    """
+    logger = logging.getLogger('staging')
+    if strategies is None :
+        strategies = strategy_names()
+
+    # Works out the distinct runs of the grid and which of them every cell needs
+    cells = {}
+    runs = {}
+    for no_arms, num_iterations, epsilon, seed in itertools.product(arms_grid, iterations_grid, epsilon_grid,
+                                                                     seeds) :
+        keys = {}
+        for strategy in strategies :
+            parameters = run_parameters(strategy, no_arms, num_iterations, epsilon, seed, num_replications)
+            key = ResultCache.key(parameters)
+            runs[key] = parameters
+            keys[strategy] = key
+        cells[(no_arms, num_iterations, epsilon, seed)] = keys
+
+    arrays = {}
+    if cache is not None :
+        for key in runs :
+            cached = cache.get(key)
+            if cached is not None :
+                arrays[key] = cached
+    num_cached = len(arrays)
+
+    missing = [key for key in runs if key not in arrays]
+    logger.info(f"Sweep of {len(cells)} cells: {len(runs)} distinct runs, {num_cached} cached, "
+                f"{len(missing)} to compute")
+
+    def store(key, result) :
+        arrays[key] = result
+        if cache is not None :
+            cache.put(key, result)
+
+    if workers == 1 :
+        for key in missing :
+            store(key, run_strategy(runs[key]))
+    else :
+        with ProcessPoolExecutor(max_workers=workers) as executor :
+            futures = {key : executor.submit(run_strategy, runs[key]) for key in missing}
+            for key, future in futures.items() :
+                store(key, future.result())
+
+    results = {cell : {strategy : arrays[key] for strategy, key in keys.items()} for cell, keys in cells.items()}
+    stats = {'cells' : len(cells), 'runs' : len(runs), 'cached' : num_cached, 'computed' : len(missing)}
+
+    return results, stats
+
+
+def write_sweep_summary(results, num_replications, output_path) :
+    """
+    Writes one CSV row per cell and strategy with the final average reward and regret.
+    """
+    with open(output_path, 'w', newline='') as csv_file :
+        writer = csv.DictWriter(csv_file, fieldnames=SWEEP_FIELDS)
+        writer.writeheader()
+        for (no_arms, num_iterations, epsilon, seed), strategies in results.items() :
+            for strategy, curves in strategies.items() :
+                writer.writerow({
+                    'no_arms' : no_arms,
+                    'num_iterations' : num_iterations,
+                    'epsilon' : epsilon,
+                    'seed' : seed,
+                    'num_replications' : num_replications,
+                    'strategy' : strategy,
+                    'final_mean' : float(np.mean(curves['final_average_reward'])),
+                    'final_regret_mean' : float(np.mean(curves['final_regret'])),
+                })
+
+
+def main(argv=None) :
+    parser = argparse.ArgumentParser(description="Sweep the simulation over grids of parameters.")
+    parser.add_argument('--arms', type=int, nargs='+', required=True, help="Numbers of arms.")
+    parser.add_argument('--iterations', type=int, nargs='+', required=True, help="Numbers of iterations.")
+    parser.add_argument('--epsilons', type=float, nargs='+', required=True, help="Exploration rates.")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0], help="Seeds of the runs.")
+    parser.add_argument('--replications', type=int, default=1, help="Replications of every run.")
+    parser.add_argument('--strategies', nargs='+', default=None, choices=strategy_names(),
+                        help="Strategies to run (default: all registered).")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for the uncached runs.")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR, help="Cache directory.")
+    parser.add_argument('--max-cache-bytes', type=int, default=DEFAULT_MAX_BYTES, help="Cache size limit.")
+    parser.add_argument('--no-cache', action='store_true', help="Compute every run without the cache.")
+    parser.add_argument('--output', default=os.path.join('output', 'sweep.csv'), help="Summary CSV file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('staging')
+
+    cache = None if args.no_cache else ResultCache(args.cache, max_bytes=args.max_cache_bytes)
+
+    start_time = time.perf_counter()
+    results, stats = run_sweep(args.arms, args.iterations, args.epsilons, args.seeds,
+                               num_replications=args.replications, cache=cache, workers=args.workers,
+                               strategies=args.strategies)
+    logger.info(f"Sweep finished in {time.perf_counter() - start_time:.2f} seconds: {stats['computed']} runs "
+                f"computed, {stats['cached']} read from the cache")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    write_sweep_summary(results, args.replications, args.output)
+
+
+if __name__ == '__main__' :
+    main()
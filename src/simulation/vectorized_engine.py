@@ -0,0 +1,173 @@
+import numpy as np
+
+from src.algorithm.kernels import average_rewards, accumulate
+from src.algorithm.strategy_registry import get_strategy, strategy_names, strategy_index
+from src.model.batched_multi_armed_bandit import BatchedMultiArmedBandit
+
+# Percentiles reported for every per-step curve
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+class VectorizedSimulation :
+    def __init__(self, no_arm, num_iterations, epsilon, num_replications=100, seed=None,
+                 percentiles=DEFAULT_PERCENTILES, chunk_size=256, strategies=None) :
+        """
+        Headless engine that runs R independent replications of the simulation of every strategy at once.
+        :param no_arm: Number of arms in the bandit.
+        :param num_iterations: Number of steps of every replication.
+        :param epsilon: Exploration rate of the strategies that use one (Epsilon-Greedy).
+        :param num_replications: Number of independent replications R.
+        :param seed: Seed (int or np.random.SeedSequence) from which every RNG stream is derived.
+        :param percentiles: Percentiles of the per-step curves to report across replications.
+        :param chunk_size: Number of steps buffered before the per-step statistics are reduced.
+        :param strategies: Names of the registered strategies to run (all of them by default, see
+                           src.algorithm.strategy_registry). Every strategy keeps the same RNG stream whichever
+                           other strategies are run, so the results of a strategy only depend on the seed.
+
+        Replication r of every strategy faces the same true means, while each strategy samples its
+        reward noise and exploration decisions from its own stream, exactly as if a MultiArmedBandit
+        and one single agent per strategy had been created and run R times one after the other.
+        """
+        if num_iterations < 1 :
+            raise ValueError("num_iterations must be at least 1.")
+        if not (0 <= epsilon <= 1) :
+            raise ValueError(f"Invalid value for epsilon: {epsilon}")
+        if strategies is None :
+            strategies = strategy_names()
+        unknown = set(strategies) - set(strategy_names())
+        if unknown :
+            raise ValueError(f"Unknown strategies: {sorted(unknown)}")
+
+        self.no_arms = no_arm
+        self.num_iterations = num_iterations
+        self.epsilon = epsilon
+        self.num_replications = num_replications
+        self.percentiles = np.asarray(percentiles, dtype=float)
+        self.chunk_size = chunk_size
+        self.strategies = tuple(strategies)
+
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+    def _child_sequence(self, index) :
+        """
+        :return: The index-th child of the seed sequence. Unlike SeedSequence.spawn, this does not change
+                 the state of the parent, so running the engine twice gives the same results.
+        """
+        return np.random.SeedSequence(self.seed_sequence.entropy,
+                                      spawn_key=self.seed_sequence.spawn_key + (index,))
+
+    def _create_agents(self) :
+        """
+        Creates the batched bandits and agents, one pair per strategy.
+        :return: Dictionary mapping each strategy name to its (bandit, agent) pair.
+        """
+        shared_bandit = BatchedMultiArmedBandit(self.num_replications, self.no_arms,
+                                                rng=np.random.default_rng(self._child_sequence(0)))
+
+        pairs = {}
+        for name in self.strategies :
+            # The reward noise and the decisions of a strategy share the stream given by its registration order
+            rng = np.random.default_rng(self._child_sequence(1 + strategy_index(name)))
+            agent = get_strategy(name).create_batched_agent(self.num_replications, self.no_arms, self.epsilon, rng)
+            pairs[name] = (BatchedMultiArmedBandit(self.num_replications, self.no_arms, rng=rng,
+                                                   true_means=shared_bandit.true_means), agent)
+
+        return pairs
+
+    def run(self) :
+        """
+        Runs all replications for num_iterations steps.
+        :return: Dictionary mapping each strategy name to a dictionary with:
+                 'mean' - (T,) mean over replications of the average reward at every step,
+                 'percentiles' - (P, T) percentiles over replications of the average reward at every step,
+                 'regret_mean' - (T,) mean over replications of the cumulative regret at every step,
+                 'regret_percentiles' - (P, T) percentiles over replications of the cumulative regret,
+                 'optimal_arm_rate_mean' - (T,) mean over replications of the fraction of optimal pulls so far,
+                 'final_average_reward' - (R,) average reward of every replication after the last step,
+                 'final_regret' - (R,) cumulative regret of every replication after the last step.
+
+        The average reward of a replication is the same quantity the GUI plots: the mean over arms of
+        total_rewards / (num_pulls + 1e-6) over all the rewards received so far. The engine keeps these
+        cumulative sums itself (the statistics of the windowed and discounted agents forget old rewards),
+        and since only the pulled arm of every replication changes per step, the mean is maintained
+        incrementally, like the regret and the optimal arm count.
+        """
+        pairs = self._create_agents()
+        num_steps = self.num_iterations
+        num_percentiles = len(self.percentiles)
+        rows = np.arange(self.num_replications)
+
+        results = {
+            name : {
+                'mean' : np.empty(num_steps),
+                'percentiles' : np.empty((num_percentiles, num_steps)),
+                'regret_mean' : np.empty(num_steps),
+                'regret_percentiles' : np.empty((num_percentiles, num_steps)),
+                'optimal_arm_rate_mean' : np.empty(num_steps),
+            }
+            for name in pairs
+        }
+
+        # Cumulative per-replication statistics of every arm, as recorded by MetricsRecorder
+        shape = (self.num_replications, self.no_arms)
+        total_rewards = {name : np.zeros(shape) for name in pairs}
+        num_pulls = {name : np.zeros(shape) for name in pairs}
+
+        # Running per-replication aggregates of every strategy
+        estimate_sums = {name : np.zeros(self.num_replications) for name in pairs}
+        regret_sums = {name : np.zeros(self.num_replications) for name in pairs}
+        optimal_pulls = {name : np.zeros(self.num_replications) for name in pairs}
+
+        # Per-step values of every replication are buffered so that the reductions across
+        # replications run on whole chunks instead of once per step
+        shape = (self.chunk_size, self.num_replications)
+        reward_buffers = {name : np.empty(shape) for name in pairs}
+        regret_buffers = {name : np.empty(shape) for name in pairs}
+        optimal_buffers = {name : np.empty(shape) for name in pairs}
+
+        true_means = next(iter(pairs.values()))[0].true_means
+        best_means = true_means.max(axis=1)
+        best_arms = true_means.argmax(axis=1)
+
+        for chunk_start in range(0, num_steps, self.chunk_size) :
+            chunk_length = min(self.chunk_size, num_steps - chunk_start)
+
+            for offset in range(chunk_length) :
+                for name, (bandit, agent) in pairs.items() :
+                    arms = agent.select_arms()
+                    rewards = bandit.pull_arms(arms)
+
+                    agent.update(arms, rewards)
+
+                    totals, pulls = total_rewards[name], num_pulls[name]
+                    old_estimates = average_rewards(totals[rows, arms], pulls[rows, arms])
+                    accumulate(totals, pulls, rows, arms, rewards)
+                    new_estimates = average_rewards(totals[rows, arms], pulls[rows, arms])
+
+                    estimate_sums[name] += new_estimates - old_estimates
+                    regret_sums[name] += best_means - true_means[rows, arms]
+                    optimal_pulls[name] += arms == best_arms
+
+                    reward_buffers[name][offset] = estimate_sums[name] / self.no_arms
+                    regret_buffers[name][offset] = regret_sums[name]
+                    optimal_buffers[name][offset] = optimal_pulls[name]
+
+            chunk = slice(chunk_start, chunk_start + chunk_length)
+            steps_done = np.arange(chunk_start + 1, chunk_start + chunk_length + 1)
+            for name in pairs :
+                values = reward_buffers[name][:chunk_length]
+                results[name]['mean'][chunk] = values.mean(axis=1)
+                results[name]['percentiles'][:, chunk] = np.percentile(values, self.percentiles, axis=1)
+
+                regrets = regret_buffers[name][:chunk_length]
+                results[name]['regret_mean'][chunk] = regrets.mean(axis=1)
+                results[name]['regret_percentiles'][:, chunk] = np.percentile(regrets, self.percentiles, axis=1)
+
+                results[name]['optimal_arm_rate_mean'][chunk] = (optimal_buffers[name][:chunk_length].mean(axis=1)
+                                                                 / steps_done)
+
+        for name in pairs :
+            results[name]['final_average_reward'] = estimate_sums[name] / self.no_arms
+            results[name]['final_regret'] = regret_sums[name].copy()
+
+        return results
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from src.algorithm.agents import UCB1Agent, SlidingWindowUCBAgent, DiscountedUCBAgent
+from src.algorithm.batched_agents import BatchedUCB1Agent, BatchedSlidingWindowUCBAgent, BatchedDiscountedUCBAgent
+
+NUM_AGENTS = 8
+NUM_ARMS = 10
+NUM_STEPS = 3000
+# Keeps the sampled decision logs of the single agents out of the test output
+LOG_INTERVAL = 10 * NUM_STEPS
+
+
+class BatchedAgentsTest(unittest.TestCase) :
+    """
+    The vectorized engine relies on every row of a batched agent making the same decisions as an
+    independent single agent that receives the same rewards.
+    """
+
+    def assert_same_arms(self, batched_agent, single_agents) :
+        rng = np.random.default_rng(0)
+        true_means = rng.normal(0, 1, (NUM_AGENTS, NUM_ARMS))
+        noise = rng.standard_normal((NUM_STEPS, NUM_AGENTS))
+        rows = np.arange(NUM_AGENTS)
+
+        for step in range(NUM_STEPS) :
+            arms = batched_agent.select_arms()
+            expected = [int(agent.select_arm()) for agent in single_agents]
+            np.testing.assert_array_equal(arms, expected, err_msg=f"Different arms at step {step}")
+
+            rewards = true_means[rows, arms] + noise[step]
+            batched_agent.update(arms, rewards)
+            for agent, arm, reward in zip(single_agents, arms, rewards) :
+                agent.update(int(arm), float(reward))
+
+    def test_ucb1(self) :
+        self.assert_same_arms(BatchedUCB1Agent(NUM_AGENTS, NUM_ARMS),
+                              [UCB1Agent(NUM_ARMS, log_interval=LOG_INTERVAL) for _ in range(NUM_AGENTS)])
+
+    def test_sliding_window_ucb(self) :
+        self.assert_same_arms(BatchedSlidingWindowUCBAgent(NUM_AGENTS, NUM_ARMS, window_size=200),
+                              [SlidingWindowUCBAgent(NUM_ARMS, window_size=200, log_interval=LOG_INTERVAL)
+                               for _ in range(NUM_AGENTS)])
+
+    def test_discounted_ucb(self) :
+        self.assert_same_arms(BatchedDiscountedUCBAgent(NUM_AGENTS, NUM_ARMS, discount=0.99),
+                              [DiscountedUCBAgent(NUM_ARMS, discount=0.99, log_interval=LOG_INTERVAL)
+                               for _ in range(NUM_AGENTS)])
+
+
+if __name__ == '__main__' :
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from src.algorithm.agents import SlidingWindowUCBAgent, DiscountedUCBAgent, LinUCBAgent
+
+NUM_ARMS = 6
+WINDOW_SIZE = 50
+DIMENSION = 4
+# Batch sizes of the delayed feedback, including batches of exactly and of more than one window, and one long
+# enough for the discounted agent to fold its scale into the statistics
+BATCH_SIZES = (1, 3, 17, WINDOW_SIZE, 7, 3 * WINDOW_SIZE, 1, WINDOW_SIZE - 1, 2, 5000, 64)
+# Decisions drawn between two batches
+NUM_DECISIONS = 9
+# Keeps the sampled decision logs out of the test output
+LOG_INTERVAL = 1 << 20
+
+
+class BatchedFeedbackTest(unittest.TestCase) :
+    """
+    update_batch must give the same statistics as update() called for every event in order, and
+    select_many(k) the same arms as k calls of select_arm() without any update in between.
+    """
+
+    def assert_batches_match_updates(self, reference, agent) :
+        rng = np.random.default_rng(0)
+        for batch_size in BATCH_SIZES :
+            arms = rng.integers(0, NUM_ARMS, batch_size)
+            rewards = rng.normal(arms / NUM_ARMS, 1.0)
+
+            for arm, reward in zip(arms.tolist(), rewards.tolist()) :
+                reference.update(arm, reward)
+            agent.update_batch(arms, rewards)
+
+            np.testing.assert_allclose(agent.total_rewards, reference.total_rewards, rtol=1e-9, atol=1e-9)
+            np.testing.assert_allclose(agent.num_pulls, reference.num_pulls, rtol=1e-9, atol=1e-9)
+            np.testing.assert_array_equal(agent.select_many(NUM_DECISIONS),
+                                          [int(reference.select_arm()) for _ in range(NUM_DECISIONS)],
+                                          err_msg=f"Different arms after a batch of {batch_size}")
+
+    def test_sliding_window_ucb(self) :
+        self.assert_batches_match_updates(SlidingWindowUCBAgent(NUM_ARMS, WINDOW_SIZE, log_interval=LOG_INTERVAL),
+                                          SlidingWindowUCBAgent(NUM_ARMS, WINDOW_SIZE, log_interval=LOG_INTERVAL))
+
+    def test_discounted_ucb(self) :
+        self.assert_batches_match_updates(DiscountedUCBAgent(NUM_ARMS, discount=0.95, log_interval=LOG_INTERVAL),
+                                          DiscountedUCBAgent(NUM_ARMS, discount=0.95, log_interval=LOG_INTERVAL))
+
+    def test_linucb(self) :
+        rng = np.random.default_rng(0)
+        reference = LinUCBAgent(NUM_ARMS, DIMENSION, log_interval=LOG_INTERVAL)
+        agent = LinUCBAgent(NUM_ARMS, DIMENSION, log_interval=LOG_INTERVAL)
+
+        for batch_size in BATCH_SIZES :
+            contexts = rng.standard_normal((batch_size, DIMENSION))
+            arms = rng.integers(0, NUM_ARMS, batch_size)
+            rewards = rng.normal(arms / NUM_ARMS, 1.0)
+
+            for arm, reward, context in zip(arms.tolist(), rewards.tolist(), contexts) :
+                reference.update(arm, reward, context)
+            agent.update_batch(arms, rewards, contexts)
+
+            np.testing.assert_allclose(agent.inverse_design, reference.inverse_design, rtol=1e-9, atol=1e-12)
+            np.testing.assert_allclose(agent.theta, reference.theta, rtol=1e-9, atol=1e-12)
+
+            decision_contexts = rng.standard_normal((NUM_DECISIONS, DIMENSION))
+            np.testing.assert_array_equal(agent.select_many(decision_contexts),
+                                          [int(reference.select_arm(context)) for context in decision_contexts],
+                                          err_msg=f"Different arms after a batch of {batch_size}")
+
+
+if __name__ == '__main__' :
+    unittest.main()
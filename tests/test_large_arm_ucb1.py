@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from src.algorithm.agents import UCB1Agent, LargeArmUCB1Agent
+
+NUM_STEPS = 20000
+BATCH_SIZE = 16
+# Keeps the sampled decision logs out of the test output
+LOG_INTERVAL = 10 * NUM_STEPS
+
+
+class LargeArmUCB1AgentTest(unittest.TestCase) :
+    """
+    LargeArmUCB1Agent only changes how the UCB values are searched, so it must pull the same arms as
+    UCB1Agent for the same rewards, for small and large numbers of arms.
+    """
+
+    def agents_and_rewards(self, num_arms) :
+        rng = np.random.default_rng(num_arms)
+        true_means = rng.normal(0, 1, num_arms)
+        rewards = true_means + rng.standard_normal((NUM_STEPS, num_arms))
+        return UCB1Agent(num_arms, log_interval=LOG_INTERVAL), LargeArmUCB1Agent(num_arms, log_interval=LOG_INTERVAL), \
+            rewards
+
+    def test_select_arm(self) :
+        for num_arms in (5, 300, 3000) :
+            with self.subTest(num_arms=num_arms) :
+                reference, agent, rewards = self.agents_and_rewards(num_arms)
+                for step in range(NUM_STEPS) :
+                    arm = int(agent.select_arm())
+                    self.assertEqual(arm, int(reference.select_arm()), f"Different arms at step {step}")
+                    reference.update(arm, rewards[step, arm])
+                    agent.update(arm, rewards[step, arm])
+
+    def test_select_many(self) :
+        for num_arms in (5, 300, 3000) :
+            with self.subTest(num_arms=num_arms) :
+                reference, agent, rewards = self.agents_and_rewards(num_arms)
+                for start in range(0, NUM_STEPS, BATCH_SIZE) :
+                    arms = agent.select_many(BATCH_SIZE)
+                    np.testing.assert_array_equal(arms, reference.select_many(BATCH_SIZE),
+                                                  err_msg=f"Different arms in the batch at step {start}")
+                    batch_rewards = rewards[np.arange(start, start + BATCH_SIZE), arms]
+                    reference.update_batch(arms, batch_rewards)
+                    agent.update_batch(arms, batch_rewards)
+
+
+if __name__ == '__main__' :
+    unittest.main()